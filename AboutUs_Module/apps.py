@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class AboutusModuleConfig(AppConfig):
     name = 'AboutUs_Module'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,39 @@
+"""
+ساخت و حذف نسخه‌های واکنش‌گرای تصاویر صفحه درباره ما
+"""
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from Products_Module import image_variants
+from .models import AboutPage, Brand, TeamMember, Testimonial
+
+IMAGE_FIELDS = {
+    AboutPage: ('who_we_are_image_front', 'who_we_are_image_back'),
+    Brand: ('logo',),
+    TeamMember: ('photo',),
+    Testimonial: ('photo',),
+}
+
+
+@receiver(pre_save, sender=AboutPage, dispatch_uid='image_variants_replaced_about_page')
+@receiver(pre_save, sender=Brand, dispatch_uid='image_variants_replaced_about_brand')
+@receiver(pre_save, sender=TeamMember, dispatch_uid='image_variants_replaced_team_member')
+@receiver(pre_save, sender=Testimonial, dispatch_uid='image_variants_replaced_testimonial')
+def note_replaced_images(sender, instance, update_fields=None, **kwargs):
+    image_variants.note_replaced_files(instance, IMAGE_FIELDS[sender], update_fields)
+
+
+@receiver(post_save, sender=AboutPage, dispatch_uid='image_variants_about_page')
+@receiver(post_save, sender=Brand, dispatch_uid='image_variants_about_brand')
+@receiver(post_save, sender=TeamMember, dispatch_uid='image_variants_team_member')
+@receiver(post_save, sender=Testimonial, dispatch_uid='image_variants_testimonial')
+def generate_image_variants(sender, instance, **kwargs):
+    image_variants.schedule_variants(instance, *IMAGE_FIELDS[sender])
+
+
+@receiver(post_delete, sender=AboutPage, dispatch_uid='image_variants_delete_about_page')
+@receiver(post_delete, sender=Brand, dispatch_uid='image_variants_delete_about_brand')
+@receiver(post_delete, sender=TeamMember, dispatch_uid='image_variants_delete_team_member')
+@receiver(post_delete, sender=Testimonial, dispatch_uid='image_variants_delete_testimonial')
+def delete_image_variants(sender, instance, **kwargs):
+    image_variants.schedule_cleanup(instance, *IMAGE_FIELDS[sender])
@@ -3,7 +3,6 @@
 """
 from django.shortcuts import render, redirect
 from django.contrib.auth import login, logout, get_user_model
-from Cart_Module.services import sync_cart_to_db, load_cart_from_db
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.views import (
     PasswordResetView,
@@ -48,7 +47,6 @@ class LoginRegisterView(View):
                 # CRITICAL: Regenerate session to prevent session fixation attacks
                 request.session.cycle_key()
                 login(request, user, backend='Accounts_Module.backends.EmailOrUsernameBackend')
-                load_cart_from_db(request)
                 messages.success(request, _('با موفقیت وارد شدید.'))
                 next_url = request.GET.get('next', reverse_lazy('index'))
                 return redirect(next_url)
@@ -65,7 +63,6 @@ class LoginRegisterView(View):
                 # CRITICAL: Regenerate session after registration
                 request.session.cycle_key()
                 login(request, user, backend='Accounts_Module.backends.EmailOrUsernameBackend')
-                load_cart_from_db(request)
                 messages.success(request, _('ثبت‌نام با موفقیت انجام شد. به فروشگاه خوش آمدید.'))
                 return redirect('index')
             return render(request, 'accounts/login_register.html', {
@@ -81,7 +78,6 @@ class LogoutView(View):
     """خروج از حساب کاربری"""
 
     def get(self, request):
-        sync_cart_to_db(request)
         logout(request)
         messages.info(request, _('از حساب خود خارج شدید.'))
         return redirect('index')
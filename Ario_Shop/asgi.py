@@ -14,3 +14,13 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'Ario_Shop.settings')
 
 application = get_asgi_application()
+
+# Optional cache warm-up before the first request (CACHE_WARM_ON_STARTUP)
+from Products_Module.cache_warmup import warm_on_startup  # noqa: E402
+
+warm_on_startup()
+
+# Write buffered product views to the database when the process exits
+from Products_Module.view_counter import flush_on_exit  # noqa: E402
+
+flush_on_exit()
@@ -0,0 +1,147 @@
+"""
+کش چند لایه: مسیریابی کلیدها بین لایه‌های کش بر اساس پیشوند کلید
+
+لایه‌ها کش‌های معمولی CACHES هستند (settings.py):
+    shared: کش مشترک همه workerها (Redis در پروفایل production)
+    persistent: کش پایدار روی SQLite (sqlite_cache) برای HTML حجیم کارت‌ها (بعد از ری‌استارت می‌ماند)
+    local: کش کوچک داخل پروسه (L1) با TTL کوتاه جلوی لایه‌های دیگر
+
+کش default یک TieredCache است و بقیه کد همچنان فقط با django.core.cache.cache
+کار می‌کند. هر مسیر زنجیره‌ای از نام کش‌هاست: آخرین کش مرجع است و کش‌های قبلی
+read-through هستند (روی hit کش بعدی با TTL خودشان پر می‌شوند). نوشتن و حذف از
+همین پروسه به همه کش‌های زنجیره می‌رسد؛ L1 بقیه workerها حداکثر به اندازه TTL
+خودش کهنه می‌ماند، پس کلیدهای مخصوص کاربر (سبد، محدودیت‌ها) L1 ندارند.
+
+OPTIONS کش default:
+    ROUTES: [(پیشوندهای کلید, زنجیره نام کش‌ها)] - اولین پیشوند منطبق برنده است
+    DEFAULT_ROUTE: زنجیره کلیدهایی که با هیچ پیشوندی منطبق نیستند
+"""
+from collections import defaultdict
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+
+class TieredCache(BaseCache):
+    """backend کش default: هر کلید به زنجیره کش مسیر خودش فرستاده می‌شود"""
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self._routes = [(tuple(prefixes), tuple(chain)) for prefixes, chain in options.get('ROUTES', ())]
+        self._default_route = tuple(options.get('DEFAULT_ROUTE', ('shared',)))
+
+    # ── مسیریابی ──────────────────────────────────────────────────────────────
+
+    def route(self, key):
+        """زنجیره نام کش‌های یک کلید"""
+        for prefixes, chain in self._routes:
+            if key.startswith(prefixes):
+                return chain
+        return self._default_route
+
+    def _tiers(self, key):
+        """(کش‌های جلویی، کش مرجع)"""
+        chain = [caches[alias] for alias in self.route(key)]
+        return chain[:-1], chain[-1]
+
+    def _group(self, keys):
+        groups = defaultdict(list)
+        for key in keys:
+            groups[self.route(key)].append(key)
+        return groups
+
+    @staticmethod
+    def _front_timeout(front, timeout):
+        """TTL کش جلویی: کمتر از TTL خودش و TTL درخواست شده"""
+        limit = front.default_timeout
+        if timeout is DEFAULT_TIMEOUT or timeout is None:
+            return limit
+        return timeout if limit is None else min(timeout, limit)
+
+    # ── خواندن ────────────────────────────────────────────────────────────────
+
+    def get(self, key, default=None, version=None):
+        fronts, backing = self._tiers(key)
+        for index, front in enumerate(fronts):
+            value = front.get(key, self._missing_key, version=version)
+            if value is not self._missing_key:
+                self._fill(fronts[:index], {key: value}, version)
+                return value
+        value = backing.get(key, self._missing_key, version=version)
+        if value is self._missing_key:
+            return default
+        self._fill(fronts, {key: value}, version)
+        return value
+
+    def get_many(self, keys, version=None):
+        found = {}
+        for chain, group in self._group(keys).items():
+            tiers = [caches[alias] for alias in chain]
+            missing = group
+            for index, tier in enumerate(tiers):
+                hits = tier.get_many(missing, version=version)
+                if hits:
+                    self._fill(tiers[:index], hits, version)
+                    found.update(hits)
+                    missing = [key for key in missing if key not in hits]
+                if not missing:
+                    break
+        return found
+
+    def _fill(self, fronts, data, version):
+        for front in fronts:
+            front.set_many(data, self._front_timeout(front, DEFAULT_TIMEOUT), version=version)
+
+    # ── نوشتن ─────────────────────────────────────────────────────────────────
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        fronts, backing = self._tiers(key)
+        backing.set(key, value, timeout, version=version)
+        for front in fronts:
+            front.set(key, value, self._front_timeout(front, timeout), version=version)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        failed = []
+        for chain, group in self._group(data).items():
+            *fronts, backing = [caches[alias] for alias in chain]
+            values = {key: data[key] for key in group}
+            failed.extend(backing.set_many(values, timeout, version=version))
+            for front in fronts:
+                front.set_many(values, self._front_timeout(front, timeout), version=version)
+        return failed
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        fronts, backing = self._tiers(key)
+        added = backing.add(key, value, timeout, version=version)
+        if added:
+            for front in fronts:
+                front.set(key, value, self._front_timeout(front, timeout), version=version)
+        return added
+
+    def incr(self, key, delta=1, version=None):
+        """افزایش در کش مرجع؛ کش‌های جلویی همین پروسه مقدار جدید را می‌گیرند"""
+        fronts, backing = self._tiers(key)
+        value = backing.incr(key, delta, version=version)
+        self._fill(fronts, {key: value}, version)
+        return value
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        _, backing = self._tiers(key)
+        return backing.touch(key, timeout, version=version)
+
+    def delete(self, key, version=None):
+        fronts, backing = self._tiers(key)
+        for front in fronts:
+            front.delete(key, version=version)
+        return backing.delete(key, version=version)
+
+    def delete_many(self, keys, version=None):
+        for chain, group in self._group(keys).items():
+            for alias in chain:
+                caches[alias].delete_many(group, version=version)
+
+    def clear(self):
+        aliases = {alias for _, chain in self._routes for alias in chain} | set(self._default_route)
+        for alias in aliases:
+            caches[alias].clear()
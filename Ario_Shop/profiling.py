@@ -0,0 +1,300 @@
+"""
+پروفایل درخواست‌ها (اختیاری؛ با PERF_PROFILING_ENABLED فعال می‌شود)
+
+برای هر درخواست این مقادیر جمع می‌شوند:
+    total: کل زمان پاسخ
+    sql: تعداد و زمان کوئری‌ها (execute_wrapper روی همه اتصال‌ها؛ بدون نیاز به DEBUG)
+    cache: تعداد hit و miss خواندن‌های کش (get و get_many؛ get_or_set از طریق get)
+    template: زمان رندر قالب‌ها (فقط رندر بیرونی؛ include و قالب‌های تو در تو دوباره شمرده نمی‌شوند)
+
+خروجی‌ها:
+    - هدر Server-Timing (در DevTools مرورگر، تب Network ← Timing)
+    - یک خط JSON در لاگر Ario_Shop.profiling برای هر درخواست
+    - بافر حلقوی آخرین PERF_BUFFER_SIZE درخواست در حافظه پروسه که صفحه
+      /admin/perf/ صدک‌های آن را به تفکیک نام URL نشان می‌دهد. بافر مال همان
+      پروسه است؛ با چند worker هر صفحه فقط درخواست‌های worker خودش را می‌بیند.
+
+کش و قالب‌ها هوک عمومی ندارند: با اولین استفاده از میدل‌ور، متدهای خواندن هر
+backend کش و Template.render موتور قالب جنگو یک بار پوشانده می‌شوند. پوشش‌ها
+بیرون از درخواستِ در حال پروفایل فقط یک ContextVar را می‌خوانند.
+
+تنظیمات (settings.py):
+    PERF_PROFILING_ENABLED: فعال بودن میدل‌ور (در غیر این صورت MiddlewareNotUsed)
+    PERF_SERVER_TIMING: افزودن هدر Server-Timing به پاسخ‌ها
+    PERF_BUFFER_SIZE: تعداد درخواست‌های نگهداری شده برای /admin/perf/
+"""
+import json
+import logging
+import math
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import ExitStack
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.admin.views.decorators import staff_member_required
+from django.core.cache import caches
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.shortcuts import render
+from django.template.backends.django import Template as DjangoTemplate
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUFFER_SIZE = 5000
+_MISSING = object()
+
+_current = ContextVar('perf_request_stats', default=None)
+
+
+def percentile(values, pct):
+    """صدک به روش nearest-rank (صفحه /admin/perf/ و دستور run_benchmarks)"""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    rank = max(math.ceil(pct / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+class RequestStats:
+    """آمار یک درخواست در حال اجرا"""
+
+    def __init__(self):
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.template_time = 0.0
+        # عمق فراخوانی‌های تو در تو (get_many پایه، get را صدا می‌زند؛ قالب‌ها include دارند)
+        self.cache_depth = 0
+        self.template_depth = 0
+
+    def sql_wrapper(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_time += time.perf_counter() - started
+            self.sql_count += 1
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# پوشش کش و قالب
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _outermost(stats, attr, func, *args, **kwargs):
+    """اجرای func با افزایش عمق؛ برمی‌گرداند: (نتیجه، آیا فراخوانی بیرونی بود)"""
+    depth = getattr(stats, attr)
+    setattr(stats, attr, depth + 1)
+    try:
+        return func(*args, **kwargs), depth == 0
+    finally:
+        setattr(stats, attr, depth)
+
+
+def _wrap_cache_get(original):
+    @wraps(original)
+    def get(key, default=None, version=None):
+        stats = _current.get()
+        if stats is None:
+            return original(key, default, version=version)
+        value, outer = _outermost(stats, 'cache_depth', original, key, _MISSING, version=version)
+        if outer:
+            if value is _MISSING:
+                stats.cache_misses += 1
+            else:
+                stats.cache_hits += 1
+        return default if value is _MISSING else value
+    return get
+
+
+def _wrap_cache_get_many(original):
+    @wraps(original)
+    def get_many(keys, version=None):
+        stats = _current.get()
+        if stats is None:
+            return original(keys, version=version)
+        keys = list(keys)
+        found, outer = _outermost(stats, 'cache_depth', original, keys, version=version)
+        if outer:
+            stats.cache_hits += len(found)
+            stats.cache_misses += len(keys) - len(found)
+        return found
+    return get_many
+
+
+def instrument_cache(backend):
+    """پوشاندن متدهای خواندن یک نمونه backend کش (یک بار برای هر نمونه)"""
+    if getattr(backend, '_perf_instrumented', False):
+        return
+    backend.get = _wrap_cache_get(backend.get)
+    backend.get_many = _wrap_cache_get_many(backend.get_many)
+    backend._perf_instrumented = True
+
+
+_original_template_render = DjangoTemplate.render
+
+
+def _template_render(self, context=None, request=None):
+    stats = _current.get()
+    if stats is None:
+        return _original_template_render(self, context, request)
+    started = time.perf_counter()
+    html, outer = _outermost(stats, 'template_depth', _original_template_render, self, context, request)
+    if outer:
+        stats.template_time += time.perf_counter() - started
+    return html
+
+
+def instrument_templates():
+    DjangoTemplate.render = _template_render
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# بافر حلقوی
+# ─────────────────────────────────────────────────────────────────────────────
+
+class PerfBuffer:
+    """آخرین رکوردهای درخواست (thread-safe)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._records = deque(maxlen=self.size)
+
+    @property
+    def size(self):
+        return getattr(settings, 'PERF_BUFFER_SIZE', DEFAULT_BUFFER_SIZE)
+
+    def add(self, record):
+        with self._lock:
+            if self._records.maxlen != self.size:
+                self._records = deque(self._records, maxlen=self.size)
+            self._records.append(record)
+
+    def records(self):
+        with self._lock:
+            return list(self._records)
+
+    def clear(self):
+        with self._lock:
+            self._records.clear()
+
+    def summary(self):
+        """آمار تجمیعی به تفکیک نام URL، مرتب بر اساس p95 نزولی"""
+        groups = defaultdict(list)
+        for record in self.records():
+            groups[record['view']].append(record)
+        rows = []
+        for view, records in groups.items():
+            totals = [record['total_ms'] for record in records]
+            count = len(records)
+            lookups = sum(record['cache_hits'] + record['cache_misses'] for record in records)
+            rows.append({
+                'view': view,
+                'count': count,
+                'p50_ms': percentile(totals, 50),
+                'p95_ms': percentile(totals, 95),
+                'p99_ms': percentile(totals, 99),
+                'sql_count': round(sum(record['sql_count'] for record in records) / count, 1),
+                'sql_count_max': max(record['sql_count'] for record in records),
+                'sql_ms': round(sum(record['sql_ms'] for record in records) / count, 2),
+                'template_ms': round(sum(record['template_ms'] for record in records) / count, 2),
+                'cache_hit_ratio': round(sum(record['cache_hits'] for record in records) / lookups * 100) if lookups else None,
+            })
+        rows.sort(key=lambda row: row['p95_ms'], reverse=True)
+        return rows
+
+
+perf_buffer = PerfBuffer()
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# میدل‌ور
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return '<unresolved>'
+    return match.view_name or match._func_path
+
+
+def server_timing(record):
+    """مقدار هدر Server-Timing از یک رکورد"""
+    return ', '.join((
+        f'total;dur={record["total_ms"]}',
+        f'sql;dur={record["sql_ms"]};desc="{record["sql_count"]} queries"',
+        f'tpl;dur={record["template_ms"]}',
+        f'cache;desc="{record["cache_hits"]} hit {record["cache_misses"]} miss"',
+    ))
+
+
+class ProfilingMiddleware:
+    """
+    ثبت تعداد و زمان کوئری، hit/miss کش، زمان قالب و زمان کل هر درخواست.
+    باید اولین میدل‌ور باشد تا زمان میدل‌ورهای دیگر هم در total بیاید.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'PERF_PROFILING_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.server_timing = getattr(settings, 'PERF_SERVER_TIMING', True)
+        instrument_templates()
+
+    def __call__(self, request):
+        for backend in caches.all():
+            instrument_cache(backend)
+
+        stats = RequestStats()
+        token = _current.set(stats)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(stats.sql_wrapper))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        total = time.perf_counter() - started
+
+        record = {
+            'view': _view_name(request),
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'total_ms': round(total * 1000, 2),
+            'sql_count': stats.sql_count,
+            'sql_ms': round(stats.sql_time * 1000, 2),
+            'cache_hits': stats.cache_hits,
+            'cache_misses': stats.cache_misses,
+            'template_ms': round(stats.template_time * 1000, 2),
+            'timestamp': round(time.time(), 3),
+        }
+        perf_buffer.add(record)
+        logger.info(json.dumps(record, ensure_ascii=False))
+        if self.server_timing:
+            response['Server-Timing'] = server_timing(record)
+        return response
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# صفحه ادمین
+# ─────────────────────────────────────────────────────────────────────────────
+
+@staff_member_required
+def perf_view(request):
+    """صدک‌های زمان پاسخ و میانگین کوئری هر ویو از بافر همین پروسه"""
+    if request.method == 'POST' and request.POST.get('action') == 'clear':
+        perf_buffer.clear()
+    return render(request, 'admin/perf.html', {
+        **admin.site.each_context(request),
+        'title': 'کارایی درخواست‌ها',
+        'rows': perf_buffer.summary(),
+        'records': len(perf_buffer.records()),
+        'buffer_size': perf_buffer.size,
+        'enabled': getattr(settings, 'PERF_PROFILING_ENABLED', False),
+    })
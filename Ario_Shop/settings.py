@@ -75,6 +75,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Opt-in request profiling (PERF_PROFILING_ENABLED); first so its total covers every middleware
+    'Ario_Shop.profiling.ProfilingMiddleware',
     # Security middleware - order matters!
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -99,9 +101,8 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
-                'Menu_Module.context_processors.menu_items',
+                'Home_Module.context_processors.layout',
                 'Cart_Module.context_processors.cart_context',
-                'Products_Module.context_processors.navbar_categories',
             ],
         },
     },
@@ -117,33 +118,103 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # File-backed test database: threaded tests (parallel payments) need connections that
+        # share one database, which in-memory SQLite does not give them
+        'TEST': {'NAME': BASE_DIR / 'test_db.sqlite3'},
     }
 }
 
-# Cache configuration - use Redis in production, LocMem for development
+# =============================================================================
+# CACHE TIERS (Ario_Shop/cache_tiers.py)
+# =============================================================================
+
+# 'local' (default): every tier is an in-process LocMemCache - one process, no services
+# 'production': Redis shared tier (REDIS_URL), SQLite persistent tier, LocMem L1
+CACHE_PROFILE = os.environ.get('ARIO_CACHE_PROFILE', 'local')
+# Seconds a value stays in the in-process L1; bounds cross-worker staleness of L1 keys
+CACHE_L1_TIMEOUT = 5
+
+# Key prefix -> chain of cache aliases; the last alias is authoritative, earlier ones are
+# read-through. First matching prefix wins; unmatched keys go to CACHE_DEFAULT_ROUTE.
+CACHE_ROUTES = [
+    # Version counters: bumped on invalidation, so every worker must see the new value at once.
+    # Listed first because their prefixes overlap the L1 routes below.
+    ((
+        'product_listing_version', 'fragment_version', 'category_tree_version', 'discount_codes_version',
+        'cart_version',
+    ), ('shared',)),
+    # Rendered product cards: large and numerous, kept out of the shared tier
+    (('product_card_',), ('local', 'persistent')),
+    # Hot catalog keys (home lists, sidebar, navbar, menus, listings, fragments, discount rules)
+    ((
+        'home_', 'all_active_', 'active_products_price_range', 'category_', 'navbar_categories',
+        'main_menu_items', 'footer_menu_items', 'product_listing_', 'fragment_', 'discount_code',
+    ), ('local', 'shared')),
+]
+# Per-user keys (cart summaries, review cooldowns) and the search/facet index versions
+CACHE_DEFAULT_ROUTE = ('shared',)
+
+# Catalog keys filled through Products_Module/cache_fill.py (single-flight + XFetch):
+# seconds an expired value may still be served while one request rebuilds it
+CACHE_STALE_TTL = 60 * 10
+# Seconds a rebuild lock lives if its holder dies, and seconds a cold read waits for it
+CACHE_FILL_LOCK_TIMEOUT = 30
+CACHE_FILL_WAIT = 2.0
+# XFetch early-refresh aggressiveness (1.0 = standard; larger refreshes earlier)
+CACHE_XFETCH_BETA = 1.0
+
+# Cache warm-up (Products_Module/cache_warmup.py, `manage.py warm_caches`):
+# warm every worker while the WSGI/ASGI application loads, before its first request
+CACHE_WARM_ON_STARTUP = False
+# Most viewed products whose reviews and cards are pre-built
+CACHE_WARM_TOP_PRODUCTS = 50
+CACHE_WARM_WORKERS = 4
+
+if CACHE_PROFILE == 'production':
+    CACHE_TIERS = {
+        'shared': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ.get('REDIS_URL', 'redis://127.0.0.1:6379/1'),
+            'KEY_PREFIX': 'ario_shop',
+        },
+        'persistent': {
+            # Ario_Shop/sqlite_cache.py: FileBasedCache globs the whole directory on every set
+            'BACKEND': 'Ario_Shop.sqlite_cache.SQLiteCache',
+            'LOCATION': os.environ.get('CACHE_SQLITE_PATH', str(BASE_DIR / 'cache' / 'persistent.sqlite3')),
+            'TIMEOUT': 60 * 60 * 24,
+            # Expired rows, then the soonest-expiring overflow, are culled every CULL_EVERY writes
+            'OPTIONS': {'MAX_ENTRIES': 50_000, 'CULL_EVERY': 500},
+        },
+    }
+else:
+    CACHE_TIERS = {
+        'shared': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'ario-shared',
+            'OPTIONS': {'MAX_ENTRIES': 5000},
+        },
+        'persistent': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'ario-persistent',
+            'TIMEOUT': 60 * 60 * 24,
+            'OPTIONS': {'MAX_ENTRIES': 5000},
+        },
+    }
+
 CACHES = {
     'default': {
+        'BACKEND': 'Ario_Shop.cache_tiers.TieredCache',
+        'OPTIONS': {'ROUTES': CACHE_ROUTES, 'DEFAULT_ROUTE': CACHE_DEFAULT_ROUTE},
+    },
+    'local': {
         'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-        'LOCATION': 'unique-snowflake',
-        'OPTIONS': {
-            'MAX_ENTRIES': 1000,
-        }
-    }
+        'LOCATION': 'ario-l1',
+        'TIMEOUT': CACHE_L1_TIMEOUT,
+        'OPTIONS': {'MAX_ENTRIES': 1000},
+    },
+    **CACHE_TIERS,
 }
 
-# For production, use Redis cache:
-# CACHES = {
-#     'default': {
-#         'BACKEND': 'django.core.cache.backends.redis.RedisCache',
-#         'LOCATION': os.environ.get('REDIS_URL', 'redis://127.0.0.1:6379/1'),
-#         'OPTIONS': {
-#             'CLIENT_CLASS': 'django.core.cache.backends.redis.RedisCacheClient',
-#         },
-#         'KEY_PREFIX': 'ario_shop',
-#         'TIMEOUT': 300,  # 5 minutes default
-#     }
-# }
-
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
@@ -322,7 +393,8 @@ else:
 # =============================================================================
 
 # Rate limiting configuration using django-ratelimit
-RATELIMIT_USE_CACHE = 'default'
+# Counters must be shared by all workers, or every limit multiplies by the worker count
+RATELIMIT_USE_CACHE = 'shared'
 RATELIMIT_CACHE_PREFIX = 'rl'
 
 # Rate limit defaults (can be overridden per-view)
@@ -338,12 +410,50 @@ LOGIN_RATE_LIMIT_USER = '10/m'  # Per user limit
 
 # Session configuration
 SESSION_COOKIE_AGE = 60 * 60 * 24 * 7  # 7 days in seconds
-SESSION_SAVE_EVERY_REQUEST = True
+# Sessions are written only when modified: logged-in carts live in the database, so
+# page views do not touch the session store (expiry is refreshed on the next change)
+SESSION_SAVE_EVERY_REQUEST = False
 SESSION_EXPIRE_AT_BROWSER_CLOSE = False
 
 # Regenerate session key on login for session fixation protection
 SESSION_KEY_REGENERATE = True
 
+# =============================================================================
+# PRODUCT VIEW COUNTER
+# =============================================================================
+
+# Product page views are buffered in memory and flushed with one batched UPDATE
+PRODUCT_VIEWS_FLUSH_INTERVAL = 30  # seconds between flushes (0 = write on every view)
+PRODUCT_VIEWS_MAX_PENDING = 500  # forced flush threshold = max views lost if a worker dies
+
+# =============================================================================
+# PRODUCT SEARCH
+# =============================================================================
+
+# 'auto' uses the SQLite FTS5 table when present, otherwise the in-memory inverted index
+PRODUCT_SEARCH_BACKEND = 'auto'
+PRODUCT_SEARCH_MAX_RESULTS = 1000
+
+# =============================================================================
+# PRODUCT FACETS
+# =============================================================================
+
+# Lower bounds of the price buckets counted in the shop sidebar
+PRODUCT_FACET_PRICE_BUCKETS = (0, 500_000, 1_000_000, 2_000_000, 5_000_000, 10_000_000)
+# Filtered results up to this size are fetched with pk__in; larger ones fall back to SQL joins
+PRODUCT_FACET_MAX_IDS = 2000
+
+# =============================================================================
+# PRODUCT LIST PAGINATION
+# =============================================================================
+
+# Seconds a listing's total result count is cached (keyset pages skip COUNT(*))
+PRODUCT_LIST_COUNT_TIMEOUT = 60 * 5
+# Seconds a rendered listing page (products + sidebar counts) is cached per filter/sort/cursor
+PRODUCT_LISTING_CACHE_TIMEOUT = 60 * 5
+# Seconds a rendered product card is cached (keyed on product id + updated_at; bounds views_count staleness)
+PRODUCT_CARD_CACHE_TIMEOUT = 60 * 15
+
 # =============================================================================
 # FILE UPLOAD SECURITY
 # =============================================================================
@@ -354,6 +464,69 @@ DATA_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024
 # File upload permissions
 FILE_UPLOAD_PERMISSIONS = 0o644
 
+# =============================================================================
+# RESPONSIVE IMAGE VARIANTS (Products_Module/image_variants.py)
+# =============================================================================
+
+# Widths (px) of the resized copies generated on upload and by `generate_image_variants`
+IMAGE_VARIANT_WIDTHS = (300, 600, 1200)
+# Output formats in browser preference order; add 'avif' on Pillow >= 11.2 built with libavif
+IMAGE_VARIANT_FORMATS = ('webp', 'jpeg')
+IMAGE_VARIANT_QUALITY = 80
+
+# =============================================================================
+# STOCK RESERVATION (Cart_Module/inventory.py)
+# =============================================================================
+
+# Seconds the stock of a placed (unpaid) order stays held; expired holds are released
+# on the next checkout or by `manage.py release_stock_reservations`
+STOCK_RESERVATION_TIMEOUT = 60 * 15
+
+# =============================================================================
+# CART (Cart_Module/storage.py)
+# =============================================================================
+
+# Seconds the header cart summary is cached; keyed on the cart and catalogue versions
+CART_SUMMARY_CACHE_TIMEOUT = 60 * 10
+
+# =============================================================================
+# DISCOUNT CODES (Cart_Module/services.py)
+# =============================================================================
+
+# Seconds a code's rule fields are cached; saving any code invalidates all of them
+DISCOUNT_CODE_CACHE_TIMEOUT = 60 * 60
+
+# =============================================================================
+# BENCHMARKS (Products_Module/benchmarks.py, `manage.py run_benchmarks`)
+# =============================================================================
+
+# Machine-local baseline the benchmark run is compared against; not committed, since latency
+# depends on the machine. Created and refreshed with `run_benchmarks --update-baseline`
+BENCHMARK_BASELINE_PATH = BASE_DIR / 'benchmarks' / 'baseline.json'
+
+# =============================================================================
+# REQUEST PROFILING (Ario_Shop/profiling.py, /admin/perf/)
+# =============================================================================
+
+# Per-request SQL count/time, cache hits/misses, template and total time
+PERF_PROFILING_ENABLED = False
+# Expose the numbers as a Server-Timing response header (visible in browser DevTools)
+PERF_SERVER_TIMING = True
+# Requests kept per process for the /admin/perf/ percentiles
+PERF_BUFFER_SIZE = 5000
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        # One JSON line per profiled request
+        'Ario_Shop.profiling': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+    },
+}
+
 # =============================================================================
 # CACHE KEY PREFIX (to avoid conflicts)
 # =============================================================================
@@ -0,0 +1,208 @@
+"""
+کش پایدار روی یک فایل SQLite (لایه persistent پروفایل production)
+
+FileBasedCache جنگو در هر set کل پوشه کش را glob می‌کند (_cull)؛ با ده‌ها هزار
+کارت کش شده هر نوشتن O(تعداد کلیدها) می‌شود. این backend همه کلیدها را در یک
+جدول با کلید اصلی نگه می‌دارد:
+    - خواندن و نوشتن هر کلید یک دستور روی ایندکس کلید اصلی است
+    - پاک‌سازی هر CULL_EVERY نوشتن یک بار انجام می‌شود: اول کلیدهای منقضی، سپس
+      اگر تعداد از MAX_ENTRIES بیشتر باشد کلیدهایی که زودتر منقضی می‌شوند تا
+      1/CULL_FREQUENCY زیر سقف (MAX_ENTRIES تقریبی است و بین دو پاک‌سازی رد می‌شود)
+    - فایل از دیتابیس اصلی جداست و در حالت WAL باز می‌شود؛ نوشتن کش قفل نوشتن
+      دیتابیس فروشگاه را نمی‌گیرد و workerها همزمان از آن می‌خوانند
+    - هر thread اتصال sqlite3 خودش را دارد
+
+LOCATION: مسیر فایل SQLite
+OPTIONS: MAX_ENTRIES و CULL_FREQUENCY (مثل بقیه backendهای جنگو) و CULL_EVERY
+"""
+import pickle
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+DEFAULT_CULL_EVERY = 500
+BUSY_TIMEOUT = 5.0
+# حداکثر پارامتر هر دستور IN (...)
+BATCH_SIZE = 500
+
+SCHEMA = (
+    # expires: زمان انقضا (unix time)؛ NULL بدون انقضا
+    'CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value BLOB NOT NULL, expires REAL)',
+    'CREATE INDEX IF NOT EXISTS cache_expires ON cache (expires)',
+)
+LIVE = '(expires IS NULL OR expires > ?)'
+
+
+def _batches(items):
+    items = list(items)
+    for start in range(0, len(items), BATCH_SIZE):
+        yield items[start:start + BATCH_SIZE]
+
+
+class SQLiteCache(BaseCache):
+    """backend کش روی یک فایل SQLite با پاک‌سازی دوره‌ای"""
+
+    pickle_protocol = pickle.HIGHEST_PROTOCOL
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        self._path = location
+        options = params.get('OPTIONS', {})
+        self._cull_every = int(options.get('CULL_EVERY', DEFAULT_CULL_EVERY))
+        self._local = threading.local()
+        self._writes = 0
+        self._writes_lock = threading.Lock()
+
+    # ── اتصال ─────────────────────────────────────────────────────────────────
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            Path(self._path).parent.mkdir(parents=True, exist_ok=True)
+            # isolation_level=None: autocommit؛ تراکنش‌ها با _transaction صریح هستند
+            connection = sqlite3.connect(self._path, timeout=BUSY_TIMEOUT, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            for statement in SCHEMA:
+                connection.execute(statement)
+            self._local.connection = connection
+        return connection
+
+    @contextmanager
+    def _transaction(self):
+        connection = self._connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            yield connection
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        connection.execute('COMMIT')
+
+    def _dumps(self, value):
+        return pickle.dumps(value, self.pickle_protocol)
+
+    # ── خواندن ────────────────────────────────────────────────────────────────
+
+    def get(self, key, default=None, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        row = self._connection().execute(
+            f'SELECT value FROM cache WHERE key = ? AND {LIVE}', [key, time.time()],
+        ).fetchone()
+        return default if row is None else pickle.loads(row[0])
+
+    def get_many(self, keys, version=None):
+        by_key = {self.make_and_validate_key(key, version=version): key for key in keys}
+        found = {}
+        now = time.time()
+        for batch in _batches(by_key):
+            rows = self._connection().execute(
+                f'SELECT key, value FROM cache WHERE key IN ({", ".join("?" * len(batch))}) AND {LIVE}',
+                [*batch, now],
+            )
+            for key, value in rows:
+                found[by_key[key]] = pickle.loads(value)
+        return found
+
+    def has_key(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        return self._connection().execute(
+            f'SELECT 1 FROM cache WHERE key = ? AND {LIVE}', [key, time.time()],
+        ).fetchone() is not None
+
+    # ── نوشتن ─────────────────────────────────────────────────────────────────
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        self._connection().execute(
+            'INSERT OR REPLACE INTO cache (key, value, expires) VALUES (?, ?, ?)',
+            [key, self._dumps(value), self.get_backend_timeout(timeout)],
+        )
+        self._written(1)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        expires = self.get_backend_timeout(timeout)
+        rows = [
+            (self.make_and_validate_key(key, version=version), self._dumps(value), expires)
+            for key, value in data.items()
+        ]
+        with self._transaction() as connection:
+            connection.executemany('INSERT OR REPLACE INTO cache (key, value, expires) VALUES (?, ?, ?)', rows)
+        self._written(len(rows))
+        return []
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        """درج فقط اگر کلید زنده‌ای نباشد (کلید منقضی جایگزین می‌شود)"""
+        key = self.make_and_validate_key(key, version=version)
+        added = self._connection().execute(
+            'INSERT INTO cache (key, value, expires) VALUES (?, ?, ?) '
+            'ON CONFLICT (key) DO UPDATE SET value = excluded.value, expires = excluded.expires '
+            'WHERE cache.expires IS NOT NULL AND cache.expires <= ?',
+            [key, self._dumps(value), self.get_backend_timeout(timeout), time.time()],
+        ).rowcount
+        if added:
+            self._written(1)
+        return bool(added)
+
+    def incr(self, key, delta=1, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        with self._transaction() as connection:
+            row = connection.execute(
+                f'SELECT value FROM cache WHERE key = ? AND {LIVE}', [key, time.time()],
+            ).fetchone()
+            if row is None:
+                raise ValueError(f"Key '{key}' not found.")
+            value = pickle.loads(row[0]) + delta
+            connection.execute('UPDATE cache SET value = ? WHERE key = ?', [self._dumps(value), key])
+        return value
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        return self._connection().execute(
+            f'UPDATE cache SET expires = ? WHERE key = ? AND {LIVE}',
+            [self.get_backend_timeout(timeout), key, time.time()],
+        ).rowcount == 1
+
+    def delete(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        return self._connection().execute('DELETE FROM cache WHERE key = ?', [key]).rowcount > 0
+
+    def delete_many(self, keys, version=None):
+        keys = [self.make_and_validate_key(key, version=version) for key in keys]
+        with self._transaction() as connection:
+            for batch in _batches(keys):
+                connection.execute(f'DELETE FROM cache WHERE key IN ({", ".join("?" * len(batch))})', batch)
+
+    def clear(self):
+        self._connection().execute('DELETE FROM cache')
+
+    # ── پاک‌سازی ──────────────────────────────────────────────────────────────
+
+    def _written(self, count):
+        with self._writes_lock:
+            self._writes += count
+            if self._writes < self._cull_every:
+                return
+            self._writes = 0
+        self.cull()
+
+    def cull(self):
+        """حذف کلیدهای منقضی و در صورت عبور از MAX_ENTRIES کلیدهایی که زودتر منقضی می‌شوند"""
+        with self._transaction() as connection:
+            connection.execute('DELETE FROM cache WHERE expires IS NOT NULL AND expires <= ?', [time.time()])
+            count, = connection.execute('SELECT COUNT(*) FROM cache').fetchone()
+            if count <= self._max_entries:
+                return
+            if self._cull_frequency == 0:
+                connection.execute('DELETE FROM cache')
+                return
+            excess = count - self._max_entries + self._max_entries // self._cull_frequency
+            connection.execute(
+                'DELETE FROM cache WHERE key IN '
+                '(SELECT key FROM cache ORDER BY expires IS NULL, expires LIMIT ?)',
+                [excess],
+            )
@@ -0,0 +1,220 @@
+import json
+import tempfile
+import time
+from pathlib import Path
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache, caches
+from django.test import Client, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from Ario_Shop.cache_tiers import TieredCache
+from Ario_Shop.profiling import perf_buffer, server_timing
+from Ario_Shop.sqlite_cache import SQLiteCache
+from Cart_Module.services import DISCOUNT_CODES_VERSION
+from Cart_Module.storage import cart_version_key
+from Products_Module import cache_keys, facets, search_index
+from Products_Module.models import Category, Product
+
+
+@override_settings(PERF_PROFILING_ENABLED=True)
+class ProfilingMiddlewareTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        perf_buffer.clear()
+        category = Category.objects.create(name='کفش', slug='shoes')
+        Product.objects.create(
+            name='کفش ورزشی', slug='runner', category=category,
+            description='desc', price=Decimal('2000'), stock=5,
+        )
+        self.client = Client()
+
+    def test_request_is_recorded_and_logged(self):
+        with self.assertLogs('Ario_Shop.profiling', 'INFO') as logs:
+            response = self.client.get(reverse('products:list'))
+
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['view'], 'products:list')
+        self.assertEqual(record['status'], 200)
+        self.assertGreater(record['sql_count'], 0)
+        self.assertGreater(record['template_ms'], 0)
+        self.assertGreater(record['cache_misses'], 0)
+        self.assertEqual(response['Server-Timing'], server_timing(record))
+        self.assertEqual(perf_buffer.records(), [record])
+
+    def test_cached_page_counts_hits(self):
+        with self.assertLogs('Ario_Shop.profiling', 'INFO'):
+            self.client.get(reverse('products:list'))
+            self.client.get(reverse('products:list'))
+
+        self.assertGreater(perf_buffer.records()[1]['cache_hits'], 0)
+
+    def test_perf_page_aggregates_per_view(self):
+        with self.assertLogs('Ario_Shop.profiling', 'INFO'):
+            for _ in range(3):
+                self.client.get(reverse('products:list'))
+        staff = get_user_model().objects.create_user('admin', password='pass', is_staff=True)
+        self.client.force_login(staff)
+
+        with self.assertLogs('Ario_Shop.profiling', 'INFO'):
+            response = self.client.get(reverse('admin_perf'))
+
+        rows = {row['view']: row for row in response.context['rows']}
+        self.assertEqual(rows['products:list']['count'], 3)
+
+
+class ProfilingDisabledTests(TestCase):
+    def test_no_header_when_disabled(self):
+        response = self.client.get(reverse('index'))
+
+        self.assertNotIn('Server-Timing', response)
+
+    def test_perf_page_requires_staff(self):
+        response = self.client.get(reverse('admin_perf'))
+
+        self.assertEqual(response.status_code, 302)
+
+
+def tier_caches(shared=None):
+    locmem = 'django.core.cache.backends.locmem.LocMemCache'
+    return {
+        'default': {'BACKEND': 'Ario_Shop.cache_tiers.TieredCache', 'OPTIONS': {
+            'ROUTES': [(('card_',), ('local', 'persistent')), (('catalog_',), ('local', 'shared'))],
+            'DEFAULT_ROUTE': ('shared',),
+        }},
+        'local': {'BACKEND': locmem, 'LOCATION': 'tier-l1', 'TIMEOUT': 5},
+        'shared': shared or {'BACKEND': locmem, 'LOCATION': 'tier-shared'},
+        'persistent': {'BACKEND': locmem, 'LOCATION': 'tier-persistent'},
+    }
+
+
+class CacheRouteSettingsTests(SimpleTestCase):
+    def test_version_counters_skip_the_l1(self):
+        version_keys = [
+            cache_keys.LISTING_VERSION, cache_keys.CATEGORY_TREE_VERSION, DISCOUNT_CODES_VERSION,
+            cart_version_key('user_1'), facets.VERSION_CACHE_KEY, search_index.VERSION_CACHE_KEY,
+            *(cache_keys.fragment_version_key(name) for name in cache_keys.FRAGMENT_DEPENDENCIES),
+        ]
+        for key in version_keys:
+            with self.subTest(key=key):
+                self.assertEqual(caches['default'].route(key), ('shared',))
+
+
+@override_settings(CACHES=tier_caches())
+class TieredCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_keys_are_routed_by_prefix(self):
+        cache.set_many({'catalog_menu': 1, 'card_1': 2, 'cart_user_1': 3})
+
+        self.assertEqual(caches['local'].get_many(['catalog_menu', 'card_1', 'cart_user_1']), {'catalog_menu': 1, 'card_1': 2})
+        self.assertEqual(caches['shared'].get_many(['catalog_menu', 'card_1', 'cart_user_1']), {'catalog_menu': 1, 'cart_user_1': 3})
+        self.assertEqual(caches['persistent'].get('card_1'), 2)
+        self.assertEqual(cache.get_many(['catalog_menu', 'card_1', 'cart_user_1', 'absent']),
+                         {'catalog_menu': 1, 'card_1': 2, 'cart_user_1': 3})
+
+    def test_l1_is_filled_on_read_and_served_first(self):
+        caches['shared'].set('catalog_menu', 'shared value')
+
+        self.assertEqual(cache.get('catalog_menu'), 'shared value')
+        caches['shared'].set('catalog_menu', 'changed by another worker')
+        self.assertEqual(cache.get('catalog_menu'), 'shared value')
+
+    def test_l1_timeout_is_capped(self):
+        cache.set('catalog_menu', 1, 3600)
+
+        local = caches['local']
+        expiry = local._expire_info[local.make_and_validate_key('catalog_menu')]
+        shared = caches['shared']
+        self.assertLess(expiry, shared._expire_info[shared.make_and_validate_key('catalog_menu')] - 3000)
+
+    def test_writes_and_deletes_reach_every_tier(self):
+        cache.set('catalog_version', 1, None)
+        self.assertEqual(cache.incr('catalog_version'), 2)
+        self.assertEqual(caches['local'].get('catalog_version'), 2)
+
+        cache.delete('catalog_version')
+        self.assertIsNone(caches['local'].get('catalog_version'))
+        self.assertIsNone(caches['shared'].get('catalog_version'))
+
+    def test_route_lookup(self):
+        self.assertIsInstance(caches['default'], TieredCache)
+        self.assertEqual(caches['default'].route('catalog_x'), ('local', 'shared'))
+        self.assertEqual(caches['default'].route('other'), ('shared',))
+
+
+class RedisSharedTierTests(TestCase):
+    def test_shared_tier_on_redis_protocol(self):
+        import fakeredis
+
+        shared = {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': 'redis://localhost:6379/0',
+            'OPTIONS': {'connection_class': fakeredis.FakeConnection},
+        }
+        with self.settings(CACHES=tier_caches(shared)):
+            cache.set('cart_user_1', {'count': 2})
+            cache.set('catalog_menu', ['shop'])
+
+            self.assertEqual(caches['shared'].get('cart_user_1'), {'count': 2})
+            self.assertEqual(cache.get_many(['cart_user_1', 'catalog_menu']),
+                             {'cart_user_1': {'count': 2}, 'catalog_menu': ['shop']})
+            cache.clear()
+
+
+class SQLiteCacheTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = str(Path(directory.name) / 'cache' / 'persistent.sqlite3')
+        self.cache = self._cache()
+
+    def _cache(self, **options):
+        return SQLiteCache(self.path, {'TIMEOUT': 60, 'OPTIONS': options})
+
+    def test_set_get_and_delete(self):
+        self.cache.set('card_1', '<div>1</div>')
+        self.cache.set_many({'card_2': 2, 'card_3': [3]})
+
+        self.assertEqual(self.cache.get('card_1'), '<div>1</div>')
+        self.assertEqual(self.cache.get_many(['card_2', 'card_3', 'missing']), {'card_2': 2, 'card_3': [3]})
+        self.assertTrue(self.cache.delete('card_1'))
+        self.cache.delete_many(['card_2', 'card_3'])
+        self.assertEqual(self.cache.get_many(['card_1', 'card_2', 'card_3']), {})
+
+    def test_values_survive_a_new_instance(self):
+        self.cache.set('card_1', 'html', timeout=None)
+
+        self.assertEqual(self._cache().get('card_1'), 'html')
+
+    def test_expired_keys_are_misses_and_can_be_added(self):
+        self.cache.set('card_1', 'old', timeout=0.01)
+        time.sleep(0.02)
+
+        self.assertIsNone(self.cache.get('card_1'))
+        self.assertFalse(self.cache.has_key('card_1'))
+        self.assertTrue(self.cache.add('card_1', 'new'))
+        self.assertFalse(self.cache.add('card_1', 'newer'))
+        self.assertEqual(self.cache.get('card_1'), 'new')
+
+    def test_incr(self):
+        self.cache.set('version', 1)
+
+        self.assertEqual(self.cache.incr('version'), 2)
+        self.assertEqual(self.cache.get('version'), 2)
+        with self.assertRaises(ValueError):
+            self.cache.incr('missing')
+
+    def test_cull_drops_expired_then_soonest_expiring(self):
+        cache = self._cache(MAX_ENTRIES=10, CULL_FREQUENCY=2, CULL_EVERY=5)
+        cache.set('expired', 1, timeout=0.01)
+        time.sleep(0.02)
+        cache.set('forever', 1, timeout=None)
+        # 15 نوشتن: سه پاک‌سازی؛ آخری 14 کلید را تا 1/2 زیر سقف کم می‌کند
+        for i in range(13):
+            cache.set(f'card_{i}', i, timeout=100 + i)
+
+        keys = {key for key, in cache._connection().execute('SELECT key FROM cache')}
+        self.assertEqual(keys, {cache.make_key(key) for key in ('forever', 'card_9', 'card_10', 'card_11', 'card_12')})
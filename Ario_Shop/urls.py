@@ -19,9 +19,12 @@ from django.urls import path,include
 from django.conf import settings
 from django.conf.urls.static import static
 
+from Ario_Shop import profiling
 from Products_Module import views
 
 urlpatterns = [
+    # قبل از admin.site.urls تا catch-all ادمین آن را نگیرد
+    path('admin/perf/', profiling.perf_view, name='admin_perf'),
     path('admin/', admin.site.urls),
     path('', include('Home_Module.urls')),
     path('Contact_us/', include('Contact_Module.urls')),
@@ -5,3 +5,6 @@ class CartConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'Cart_Module'
     verbose_name = 'سبد خرید و سفارش'
+
+    def ready(self):
+        from . import signals  # noqa: F401
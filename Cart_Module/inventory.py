@@ -0,0 +1,190 @@
+"""
+موجودی انبار: کسر اتمیک موجودی و رزرو موقت سفارش‌ها
+
+کسر موجودی همه اقلام با یک UPDATE شرطی انجام می‌شود:
+    UPDATE product SET stock = stock - CASE id WHEN ? THEN qty ... END
+    WHERE id IN (...) AND stock >= CASE id WHEN ? THEN qty ... END
+بررسی و کسر در یک دستور است و دو پرداخت همزمان نمی‌توانند هر دو از یک موجودی
+رد شوند (در هر دیتابیسی، بدون select_for_update). اگر تعداد ردیف‌های به‌روز شده
+کمتر از تعداد محصولات باشد، موجودی یکی از آن‌ها کافی نبوده و کل تراکنش برمی‌گردد.
+
+رزرو: ثبت سفارش (orders.place_order) موجودی اقلام را همان لحظه کسر و reserved_until سفارش
+را تنظیم می‌کند تا کاربر در حین پرداخت با خریدار دیگری رقابت نکند. رزرو منقضی
+شده (release_expired) موجودی را برمی‌گرداند؛ سفارش در انتظار پرداخت می‌ماند و
+پرداخت بعدی دوباره موجودی را کسر می‌کند. صاحب موجودی رزرو شده همیشه کسی است که
+reserved_until را با UPDATE شرطی خالی کند (پرداخت یا آزادسازی، نه هر دو).
+
+تنظیمات (settings.py):
+    STOCK_RESERVATION_TIMEOUT: مدت رزرو موجودی سفارش ثبت شده به ثانیه
+"""
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Value, When
+from django.utils import timezone
+
+from Products_Module import cache_keys, facets
+from Products_Module.models import Product
+from .models import Order
+
+DEFAULT_RESERVATION_TIMEOUT = 60 * 15
+
+
+class InsufficientStock(Exception):
+    """موجودی یکی از اقلام کافی نیست؛ product_id و product_name را نگه می‌دارد"""
+
+    def __init__(self, product_id, product_name=''):
+        self.product_id = product_id
+        self.product_name = product_name
+        super().__init__(f'Insufficient stock for product {product_id}')
+
+
+def reservation_timeout():
+    return getattr(settings, 'STOCK_RESERVATION_TIMEOUT', DEFAULT_RESERVATION_TIMEOUT)
+
+
+def reservation_deadline():
+    """پایان مهلت رزرو موجودی سفارشی که همین حالا ثبت می‌شود"""
+    return timezone.now() + timedelta(seconds=reservation_timeout())
+
+
+def order_lines(order):
+    """[(product_id, quantity)] اقلام سفارش (محصولات حذف شده کنار گذاشته می‌شوند)"""
+    return list(order.items.filter(product__isnull=False).values_list('product_id', 'quantity'))
+
+
+def _merge(lines):
+    """جمع تعداد اقلام تکراری یک محصول؛ مرتب بر اساس شناسه تا ترتیب قفل ردیف‌ها ثابت باشد"""
+    merged = Counter()
+    for product_id, quantity in lines:
+        merged[product_id] += quantity
+    return sorted(merged.items())
+
+
+def _set_availability(products, is_available):
+    """
+    تغییر is_available محصولات داده شده که هنوز مقدار دیگری دارند؛ sold_out علامت
+    می‌زند که ناموجود شدن از اتمام موجودی بوده (و برگشت موجودی آن را برمی‌گرداند).
+    UPDATE سیگنال ندارد: فقط برای محصولاتی که واقعاً موجود/ناموجود شده‌اند فیلتر
+    موجودی بازخوانی و کش‌های کاتالوگ پس از commit باطل می‌شوند؛ تغییر عدد موجودی
+    به تنهایی کلیدهای کاتالوگ را دست نمی‌زند.
+    """
+    flipped = list(products.exclude(is_available=is_available).values_list('pk', flat=True))
+    if not flipped:
+        return
+    Product.objects.filter(pk__in=flipped).update(is_available=is_available, sold_out=not is_available)
+
+    def refresh():
+        facets.reindex_products(flipped)
+        cache_keys.invalidate_model('Product')
+
+    transaction.on_commit(refresh)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# کسر و برگشت موجودی
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _quantity_case(lines):
+    """CASE id WHEN ... THEN quantity END برای به‌روزرسانی همه اقلام در یک دستور"""
+    return Case(
+        *(When(pk=product_id, then=Value(quantity)) for product_id, quantity in lines),
+        output_field=IntegerField(),
+    )
+
+
+def decrement_stock(lines):
+    """
+    کسر موجودی همه اقلام با یک UPDATE شرطی (تعداد کوئری مستقل از تعداد اقلام).
+    lines: [(product_id, quantity)]
+    محصولی که موجودی‌اش به صفر برسد ناموجود (is_available=False، sold_out=True) می‌شود.
+    در کمبود موجودی InsufficientStock می‌دهد و هیچ موجودی کسر نمی‌شود.
+    """
+    lines = _merge(lines)
+    if not lines:
+        return
+    product_ids = [pk for pk, _ in lines]
+    quantity = _quantity_case(lines)
+    try:
+        with transaction.atomic():
+            updated = Product.objects.filter(pk__in=product_ids, stock__gte=quantity).update(
+                stock=F('stock') - quantity, updated_at=timezone.now(),
+            )
+            if updated != len(lines):
+                raise InsufficientStock(None)
+            _set_availability(Product.objects.filter(pk__in=product_ids, stock__lte=0), False)
+    except InsufficientStock:
+        # کسر برگشت خورده؛ اولین محصولی که موجودی کافی ندارد (برای پیام خطا)
+        current = {pk: (stock, name) for pk, stock, name in
+                   Product.objects.filter(pk__in=product_ids).values_list('pk', 'stock', 'name')}
+        for product_id, qty in lines:
+            stock, name = current.get(product_id, (0, ''))
+            if stock < qty:
+                raise InsufficientStock(product_id, name) from None
+        # موجودی بین دو کوئری برگشته؛ پیام بدون نام محصول
+        raise
+
+
+def increment_stock(lines):
+    """
+    برگرداندن موجودی (آزادسازی رزرو) با یک UPDATE. فقط محصولی که decrement_stock
+    با تمام شدن موجودی ناموجود کرده بود (sold_out) دوباره موجود می‌شود؛ محصولی که
+    ادمین ناموجود کرده ناموجود می‌ماند.
+    """
+    lines = _merge(lines)
+    if not lines:
+        return
+    product_ids = [pk for pk, _ in lines]
+    quantity = _quantity_case(lines)
+    with transaction.atomic():
+        Product.objects.filter(pk__in=product_ids).update(stock=F('stock') + quantity, updated_at=timezone.now())
+        _set_availability(Product.objects.filter(pk__in=product_ids, stock__gt=0, sold_out=True), True)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# رزرو سفارش
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _claim_reservation(order_id, **filters):
+    """خالی کردن شرطی reserved_until؛ برمی‌گرداند: آیا موجودی رزرو شده به این فراخوان رسید"""
+    return bool(Order.objects.filter(pk=order_id, reserved_until__isnull=False, **filters).update(reserved_until=None))
+
+
+def commit_order(order):
+    """
+    پرداخت سفارش: رزرو معتبر به فروش قطعی تبدیل می‌شود؛ اگر رزرو منقضی و آزاد شده
+    (یا هرگز رزرو نشده) باشد موجودی همین حالا کسر می‌شود.
+    برمی‌گرداند: آیا سفارش پرداخت شد (False: سفارش دیگر در انتظار پرداخت نیست)
+    در کمبود موجودی InsufficientStock می‌دهد و سفارش در انتظار پرداخت می‌ماند.
+    """
+    with transaction.atomic():
+        if not _claim_reservation(order.pk, status='pending'):
+            if not Order.objects.filter(pk=order.pk, status='pending').exists():
+                return False
+            decrement_stock(order_lines(order))
+        paid = Order.objects.filter(pk=order.pk, status='pending').update(status='paid', updated_at=timezone.now())
+        if not paid:
+            # پرداخت همزمان دیگری زودتر ثبت شد؛ کسر موجودی این فراخوان برگردانده می‌شود
+            transaction.set_rollback(True)
+            return False
+    order.status = 'paid'
+    order.reserved_until = None
+    return True
+
+
+def release_order(order_id):
+    """آزادسازی رزرو یک سفارش؛ برمی‌گرداند: آیا موجودی برگردانده شد"""
+    with transaction.atomic():
+        if not _claim_reservation(order_id):
+            return False
+        increment_stock(order_lines(Order(pk=order_id)))
+    return True
+
+
+def release_expired(now=None):
+    """آزادسازی همه رزروهای منقضی شده؛ برمی‌گرداند: تعداد سفارش‌های آزاد شده"""
+    now = now or timezone.now()
+    expired = Order.objects.filter(reserved_until__lt=now).values_list('pk', flat=True)
+    return sum(release_order(order_id) for order_id in expired)
@@ -0,0 +1,15 @@
+"""
+آزادسازی رزرو موجودی سفارش‌های پرداخت نشده‌ای که مهلتشان تمام شده
+استفاده (مثلاً هر چند دقیقه با cron): python manage.py release_stock_reservations
+"""
+from django.core.management.base import BaseCommand
+
+from Cart_Module import inventory
+
+
+class Command(BaseCommand):
+    help = 'برگرداندن موجودی رزرو شده سفارش‌های منقضی به انبار'
+
+    def handle(self, *args, **options):
+        released = inventory.release_expired()
+        self.stdout.write(self.style.SUCCESS(f'رزرو {released} سفارش آزاد شد.'))
@@ -0,0 +1,22 @@
+# Generated manually - رزرو موجودی سفارش (Cart_Module/inventory.py)
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Cart_Module', '0004_discountcode_scope_discountcode_product'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='reserved_until',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='رزرو موجودی تا'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['reserved_until'], name='order_reserved_until_idx'),
+        ),
+    ]
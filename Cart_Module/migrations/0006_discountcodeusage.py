@@ -0,0 +1,47 @@
+# Generated manually - شمارنده استفاده هر کاربر از کد تخفیف (به جای شمارش سفارش‌ها)
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_usages(apps, schema_editor):
+    """مقدار اولیه شمارنده‌ها از سفارش‌های ثبت شده با کد تخفیف"""
+    Order = apps.get_model('Cart_Module', 'Order')
+    DiscountCodeUsage = apps.get_model('Cart_Module', 'DiscountCodeUsage')
+    rows = (
+        Order.objects.filter(discount_code__isnull=False, user__isnull=False)
+        .values('discount_code_id', 'user_id').annotate(count=Count('id')).order_by()
+    )
+    DiscountCodeUsage.objects.bulk_create(
+        [DiscountCodeUsage(discount_code_id=row['discount_code_id'], user_id=row['user_id'], count=row['count'])
+         for row in rows],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Cart_Module', '0005_order_reserved_until'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DiscountCodeUsage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='تعداد استفاده')),
+                ('discount_code', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='usages', to='Cart_Module.discountcode', verbose_name='کد تخفیف')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='discount_usages', to=settings.AUTH_USER_MODEL, verbose_name='کاربر')),
+            ],
+            options={
+                'verbose_name': 'استفاده از کد تخفیف',
+                'verbose_name_plural': 'استفاده‌های کد تخفیف',
+                'unique_together': {('discount_code', 'user')},
+            },
+        ),
+        migrations.RunPython(backfill_usages, migrations.RunPython.noop),
+    ]
@@ -191,12 +191,16 @@ class DiscountCode(models.Model):
             return False
         return True
 
-    def user_can_use(self, user):
-        """آیا این کاربر می‌تواند از این کد استفاده کند؟"""
+    def user_can_use(self, user, user_usage=None):
+        """
+        آیا این کاربر می‌تواند از این کد استفاده کند؟
+        user_usage: تعداد استفاده‌های قبلی کاربر اگر از قبل خوانده شده (پیش‌فرض: از DiscountCodeUsage)
+        """
         if not user or not user.is_authenticated:
             return True  # کاربر مهمان - بررسی per_user اعمال نمی‌شود
         if self.usage_limit_per_user is not None:
-            user_usage = self.orders.filter(user=user).count()
+            if user_usage is None:
+                user_usage = self.usages.filter(user=user).values_list('count', flat=True).first() or 0
             if user_usage >= self.usage_limit_per_user:
                 return False
         return True
@@ -229,6 +233,31 @@ class DiscountCode(models.Model):
             return Decimal('0'), Decimal('0'), None
 
 
+class DiscountCodeUsage(models.Model):
+    """تعداد استفاده هر کاربر از هر کد تخفیف - هنگام ثبت سفارش افزایش می‌یابد (orders.py)"""
+    discount_code = models.ForeignKey(
+        DiscountCode,
+        on_delete=models.CASCADE,
+        related_name='usages',
+        verbose_name='کد تخفیف',
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='discount_usages',
+        verbose_name='کاربر',
+    )
+    count = models.PositiveIntegerField(default=0, verbose_name='تعداد استفاده')
+
+    class Meta:
+        verbose_name = 'استفاده از کد تخفیف'
+        verbose_name_plural = 'استفاده‌های کد تخفیف'
+        unique_together = ('discount_code', 'user')
+
+    def __str__(self):
+        return f'{self.discount_code.code} - {self.user} ({self.count})'
+
+
 class Order(models.Model):
     """سفارش - برای فاکتور و پرداخت"""
 
@@ -274,6 +303,9 @@ class Order(models.Model):
     shipping_cost = models.DecimalField(max_digits=12, decimal_places=0, default=0, verbose_name='هزینه ارسال')
     tax = models.DecimalField(max_digits=12, decimal_places=0, default=0, verbose_name='مالیات')
 
+    # موجودی اقلام تا این زمان برای سفارش کسر و نگه داشته شده (inventory.py)
+    reserved_until = models.DateTimeField(null=True, blank=True, verbose_name='رزرو موجودی تا')
+
     created_at = models.DateTimeField(default=timezone.now, verbose_name='تاریخ ثبت')
     updated_at = models.DateTimeField(auto_now=True, verbose_name='تاریخ به‌روزرسانی')
 
@@ -288,6 +320,8 @@ class Order(models.Model):
             models.Index(fields=['status', '-created_at'], name='order_status_idx'),
             # Index for order number lookup
             models.Index(fields=['order_number'], name='order_number_idx'),
+            # Index for expired stock reservations
+            models.Index(fields=['reserved_until'], name='order_reserved_until_idx'),
         ]
 
     def __str__(self):
@@ -0,0 +1,92 @@
+"""
+ثبت سفارش (checkout) در یک تراکنش
+
+ثبت هر سفارش، مستقل از تعداد اقلام، تعداد ثابتی نوشتن دارد:
+    1. INSERT سفارش (همراه با reserved_until رزرو موجودی)
+    2. bulk_create همه OrderItem ها با جمع از پیش محاسبه شده
+    3. کسر موجودی همه اقلام با یک UPDATE شرطی (inventory.decrement_stock)
+    4. رزرو یک بار استفاده از کد تخفیف با UPDATE شرطی روی used_count و شمارنده
+       استفاده کاربر (DiscountCodeUsage)
+
+اعتبارسنجی کد تخفیف (validate_discount_code) و افزایش شمارنده‌ها جدا هستند و دو
+checkout همزمان می‌توانند هر دو از بررسی رد شوند؛ برای همین افزایش فقط وقتی انجام
+می‌شود که شمارنده هنوز کمتر از سقف (usage_limit_total / usage_limit_per_user)
+باشد. شکست هر مرحله کل سفارش را برمی‌گرداند.
+"""
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import F, Q
+
+from . import inventory
+from .models import DiscountCode, DiscountCodeUsage, Order, OrderItem
+from .services import calculate_cart_with_discount
+
+
+class DiscountUnavailable(Exception):
+    """ظرفیت کد تخفیف در فاصله اعتبارسنجی تا ثبت سفارش تمام شد"""
+
+    def __init__(self, code):
+        self.code = code
+        super().__init__(f'Discount code {code} has no usage left')
+
+
+def reserve_discount_usage(discount_code, user=None):
+    """
+    افزایش شرطی used_count و شمارنده استفاده کاربر (DiscountCodeUsage).
+    برمی‌گرداند: آیا ظرفیت کل و ظرفیت کاربر باقی بود
+    """
+    reserved = (
+        DiscountCode.objects.filter(pk=discount_code.pk, is_active=True)
+        .filter(Q(usage_limit_total__isnull=True) | Q(used_count__lt=F('usage_limit_total')))
+        .update(used_count=F('used_count') + 1)
+    )
+    if not reserved or not user or not user.is_authenticated:
+        return bool(reserved)
+
+    usage, _ = DiscountCodeUsage.objects.get_or_create(discount_code_id=discount_code.pk, user=user)
+    usages = DiscountCodeUsage.objects.filter(pk=usage.pk)
+    if discount_code.usage_limit_per_user is not None:
+        usages = usages.filter(count__lt=discount_code.usage_limit_per_user)
+    return bool(usages.update(count=F('count') + 1))
+
+
+def place_order(user, items, contact, discount_code=None):
+    """
+    ثبت سفارش از اقلام قیمت‌گذاری شده سبد (price_cart) و رزرو موجودی آن.
+    contact: فیلدهای تحویل سفارش (full_name، phone، email، address، postal_code، city)
+    discount_code: کد تخفیف اعتبارسنجی شده (اختیاری)
+    برمی‌گرداند: سفارش ثبت شده
+    خطاها: inventory.InsufficientStock یا DiscountUnavailable (هیچ چیز ذخیره نمی‌شود)
+    """
+    amounts = calculate_cart_with_discount(items, discount_code)
+    order = Order(
+        user=user,
+        subtotal=amounts['subtotal'],
+        discount_code=discount_code,
+        discount_amount=amounts['discount_amount'],
+        total=amounts['total_payable'],
+        shipping_cost=Decimal('0'),
+        tax=Decimal('0'),
+        status='pending',
+        reserved_until=inventory.reservation_deadline(),
+        **contact,
+    )
+    with transaction.atomic():
+        order.save()
+        OrderItem.objects.bulk_create([
+            OrderItem(
+                order=order,
+                product=item['product'],
+                product_name=item['product'].name,
+                quantity=item['quantity'],
+                price=item['price'],
+                total=item['total'],
+            )
+            for item in items
+        ])
+        # موجودی اقلام تا پایان مهلت پرداخت برای این سفارش نگه داشته می‌شود
+        inventory.decrement_stock([(item['product'].pk, item['quantity']) for item in items])
+        if discount_code and not reserve_discount_usage(discount_code, user):
+            raise DiscountUnavailable(discount_code.code)
+    return order
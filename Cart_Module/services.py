@@ -1,85 +1,215 @@
 """
 سرویس‌های سبد خرید و کد تخفیف
+
+تنظیمات (settings.py):
+    DISCOUNT_CODE_CACHE_TIMEOUT: مدت کش قواعد هر کد تخفیف به ثانیه
 """
 from decimal import Decimal
 
+from django.conf import settings
+from django.core.cache import cache
 from django.db import transaction
+from django.db.models import OuterRef, Subquery
 from django.utils import timezone
 
+from Products_Module import cache_keys
+from Products_Module.models import Product, ProductImage
 from .models import CartItem
 
 CART_SESSION_KEY = 'cart'
 DISCOUNT_SESSION_KEY = 'discount_code'
+DISCOUNT_CODES_VERSION = 'discount_codes_version'
+DEFAULT_DISCOUNT_CACHE_TIMEOUT = 60 * 60
+
+# ستون‌هایی از محصول که قالب‌های سبد، هدر و checkout لازم دارند
+CART_PRODUCT_FIELDS = ('id', 'name', 'slug', 'price', 'stock')
 
 
 # ─────────────────────────────────────────────────────────────────────────────
-# سرویس‌های سبد خرید (DB sync)
+# سرویس قیمت‌گذاری سبد خرید
 # ─────────────────────────────────────────────────────────────────────────────
 
-def load_cart_from_db(request):
-    """وقتی کاربر وارد شد، سبد ذخیره شده را به سشن منتقل می‌کند."""
-    if not request.user.is_authenticated:
-        return
-
-    session_cart = request.session.get(CART_SESSION_KEY) or {}
-    items = CartItem.objects.filter(user=request.user).select_related('product')
-    if not items.exists():
-        return
-
-    for item in items:
-        pid = str(item.product_id)
-        session_cart[pid] = max(session_cart.get(pid, 0), item.quantity)
+def _parse_cart(cart):
+    """تبدیل سبد سشن به لیست (product_id, quantity) معتبر با حفظ ترتیب."""
+    lines = []
+    for product_id_str, qty in cart.items():
+        try:
+            product_id = int(product_id_str)
+            qty = int(qty)
+        except (ValueError, TypeError):
+            continue
+        if qty > 0:
+            lines.append((product_id, qty))
+    return lines
+
+
+def price_cart(cart):
+    """
+    قیمت‌گذاری کل سبد با یک کوئری.
 
-    request.session[CART_SESSION_KEY] = session_cart
-    request.session.modified = True
+    همه محصولات سبد به همراه مسیر تصویر اصلی (با Subquery) در یک کوئری
+    خوانده می‌شوند؛ فقط ستون‌های لازم برای قالب‌ها بارگذاری می‌شوند.
 
+    برمی‌گرداند: (items, total)
+        items: لیست دیکشنری‌های
+            {'product', 'quantity', 'price', 'total', 'image_url'}
+        total: جمع کل سبد
+    """
+    lines = _parse_cart(cart)
+    if not lines:
+        return [], Decimal('0')
+
+    main_image = ProductImage.objects.filter(
+        product=OuterRef('pk'),
+    ).order_by('-is_main', 'order', 'created_at').values('image')[:1]
+
+    products = Product.objects.filter(
+        pk__in=[product_id for product_id, _ in lines],
+        is_active=True,
+        is_available=True,
+    ).only(*CART_PRODUCT_FIELDS).annotate(main_image_path=Subquery(main_image))
+    products_by_id = {product.pk: product for product in products}
+
+    image_storage = ProductImage._meta.get_field('image').storage
+    items = []
+    total = Decimal('0')
+    for product_id, qty in lines:
+        product = products_by_id.get(product_id)
+        if product is None:
+            continue
+        price = product.price
+        line_total = price * qty
+        total += line_total
+        items.append({
+            'product': product,
+            'quantity': qty,
+            'price': price,
+            'total': line_total,
+            'image_url': image_storage.url(product.main_image_path) if product.main_image_path else '',
+        })
+    return items, total
 
-def sync_cart_to_db(request):
-    """سبد سشن را در خروج/ورود در دیتابیس ذخیره می‌کند."""
-    if not request.user.is_authenticated:
-        return
 
-    session_cart = request.session.get(CART_SESSION_KEY) or {}
-    if not session_cart:
-        CartItem.objects.filter(user=request.user).delete()
-        return
+# ─────────────────────────────────────────────────────────────────────────────
+# سرویس‌های سبد خرید (DB sync)
+# ─────────────────────────────────────────────────────────────────────────────
 
+def sync_cart_to_db(user, cart, existing=None):
+    """
+    ذخیره کل سبد کاربر ({product_id: quantity}) در CartItem با تعداد کوئری ثابت:
+    ردیف‌های جدید و تغییر کرده با یک INSERT ... ON CONFLICT DO UPDATE
+    (bulk_create با update_conflicts) و ردیف‌های حذف شده با یک DELETE.
+    existing: سبد فعلی دیتابیس اگر از قبل خوانده شده باشد (پیش‌فرض: یک SELECT)
+    """
+    cart = {int(product_id): quantity for product_id, quantity in cart.items() if quantity >= 1}
     with transaction.atomic():
-        for pid, qty in session_cart.items():
-            if qty < 1:
-                continue
-            CartItem.objects.update_or_create(
-                user=request.user,
-                product_id=int(pid),
-                defaults={'quantity': qty},
+        if existing is None:
+            existing = dict(CartItem.objects.filter(user=user).values_list('product_id', 'quantity'))
+        upserts = [
+            CartItem(user=user, product_id=product_id, quantity=quantity)
+            for product_id, quantity in cart.items() if existing.get(product_id) != quantity
+        ]
+        removed = [product_id for product_id in existing if product_id not in cart]
+
+        if upserts:
+            CartItem.objects.bulk_create(
+                upserts, update_conflicts=True,
+                unique_fields=['user', 'product'], update_fields=['quantity', 'updated_at'],
             )
-
-        CartItem.objects.filter(user=request.user).exclude(
-            product_id__in=list(session_cart.keys())
-        ).delete()
+        if removed:
+            CartItem.objects.filter(user=user, product_id__in=removed).delete()
 
 
 # ─────────────────────────────────────────────────────────────────────────────
 # سرویس‌های کد تخفیف
 # ─────────────────────────────────────────────────────────────────────────────
+# قواعد هر کد (فیلدهای زیر) با کلید کد نرمال شده کش می‌شوند و صفحات سبد بدون
+# کوئری اعتبارسنجی می‌شوند. سقف استفاده کل و هر کاربر فقط در اعمال کد و checkout
+# خوانده می‌شود؛ ثبت سفارش آن‌ها را با UPDATE شرطی رزرو می‌کند (orders.py).
+DISCOUNT_RULE_FIELDS = (
+    'id', 'code', 'title', 'discount_type', 'scope', 'product_id', 'value', 'max_discount_amount',
+    'min_order_amount', 'starts_at', 'ends_at', 'usage_limit_total', 'usage_limit_per_user', 'is_active',
+)
 
-def get_active_discount_code(request):
+
+def discount_cache_timeout():
+    return getattr(settings, 'DISCOUNT_CODE_CACHE_TIMEOUT', DEFAULT_DISCOUNT_CACHE_TIMEOUT)
+
+
+def _discount_cache_key(code_str):
+    version = cache.get(DISCOUNT_CODES_VERSION, 0)
+    return f'discount_code_{version}_{code_str}'
+
+
+def invalidate_discount_codes():
+    """باطل کردن قواعد کش شده همه کدها (ذخیره/حذف کد تخفیف یا محصول مرتبط)"""
+    cache_keys.bump_version(DISCOUNT_CODES_VERSION)
+
+
+def get_discount_code(code_str):
     """
-    کد تخفیف فعال در سشن را برمی‌گرداند.
-    اگر کدی در سشن نباشد یا کد دیگر معتبر نباشد، None برمی‌گرداند.
+    کد تخفیف با قواعد کش شده (بدون کوئری در صورت وجود در کش).
+    فقط فیلدهای DISCOUNT_RULE_FIELDS و نام محصول مرتبط کش می‌شوند؛ used_count
+    که با هر سفارش تغییر می‌کند در نمونه برگشتی معتبر نیست (validate_discount_code
+    با final=True آن را از دیتابیس می‌خواند). کد ناموجود هم کش می‌شود.
+    برمی‌گرداند: DiscountCode ذخیره نشده یا None
     """
     from .models import DiscountCode
 
+    code_str = (code_str or '').strip().upper()
+    if not code_str:
+        return None
+    key = _discount_cache_key(code_str)
+    rules = cache.get(key)
+    if rules is None:
+        code = DiscountCode.objects.select_related('product').filter(code=code_str).first()
+        rules = {}
+        if code is not None:
+            rules = {field: getattr(code, field) for field in DISCOUNT_RULE_FIELDS}
+            rules['product_name'] = code.product.name if code.product else ''
+        cache.set(key, rules, discount_cache_timeout())
+    if not rules:
+        return None
+
+    rules = dict(rules)
+    product_name = rules.pop('product_name')
+    code = DiscountCode(**rules)
+    code._state.adding = False
+    if code.product_id:
+        code.product = Product(pk=code.product_id, name=product_name)
+    return code
+
+
+def discount_usage(code, user):
+    """
+    (used_count فعلی کد، تعداد استفاده‌های کاربر) با یک کوئری - فقط برای اعتبارسنجی نهایی
+    """
+    from .models import DiscountCode, DiscountCodeUsage
+
+    user_usage = Subquery(
+        DiscountCodeUsage.objects.filter(
+            discount_code=OuterRef('pk'), user_id=user.pk if user and user.is_authenticated else None,
+        ).values('count')[:1]
+    )
+    row = DiscountCode.objects.filter(pk=code.pk).annotate(user_usage=user_usage).values_list(
+        'used_count', 'user_usage',
+    ).first()
+    if row is None:
+        return None, 0
+    return row[0], row[1] or 0
+
+
+def get_active_discount_code(request):
+    """
+    کد تخفیف فعال در سشن را برمی‌گرداند (از کش؛ بدون کوئری در صفحات سبد).
+    اگر کدی در سشن نباشد یا کد دیگر فعال یا در بازه زمانی نباشد، None برمی‌گرداند.
+    """
     code_str = request.session.get(DISCOUNT_SESSION_KEY)
     if not code_str:
         return None
 
-    try:
-        code = DiscountCode.objects.select_related('product').get(
-            code=code_str.upper(),
-            is_active=True,
-        )
-    except DiscountCode.DoesNotExist:
+    code = get_discount_code(code_str)
+    if code is None or not code.is_active or not code.is_valid_now():
         # کد دیگر وجود ندارد یا غیرفعال شده - از سشن پاک کن
         request.session.pop(DISCOUNT_SESSION_KEY, None)
         request.session.modified = True
@@ -88,7 +218,7 @@ def get_active_discount_code(request):
     return code
 
 
-def validate_discount_code(code_str, cart_items, user, request=None):
+def validate_discount_code(code_str, cart_items, user, request=None, final=False):
     """
     اعتبارسنجی کامل یک کد تخفیف.
 
@@ -97,6 +227,8 @@ def validate_discount_code(code_str, cart_items, user, request=None):
         cart_items: لیست آیتم‌های سبد (از _cart_item_list)
         user: شیء کاربر
         request: درخواست HTTP (اختیاری)
+        final: بررسی سقف استفاده کل و هر کاربر با یک کوئری (اعمال کد و checkout)؛
+            در غیر این صورت فقط قواعد کش شده بررسی می‌شوند
 
     برمی‌گرداند:
         (discount_code_obj, error_message)
@@ -108,11 +240,8 @@ def validate_discount_code(code_str, cart_items, user, request=None):
     if not code_str:
         return None, 'کد تخفیف وارد نشده است.'
 
-    code_str = code_str.strip().upper()
-
-    try:
-        code = DiscountCode.objects.select_related('product').get(code=code_str)
-    except DiscountCode.DoesNotExist:
+    code = get_discount_code(code_str)
+    if code is None:
         return None, 'کد تخفیف وارد شده معتبر نیست.'
 
     # بررسی فعال بودن
@@ -128,13 +257,19 @@ def validate_discount_code(code_str, cart_items, user, request=None):
     if code.ends_at and now > code.ends_at:
         return None, 'این کد تخفیف منقضی شده است.'
 
-    # بررسی سقف کل استفاده
-    if not code.has_usage_remaining():
-        return None, 'ظرفیت استفاده از این کد تخفیف تمام شده است.'
+    if final and (code.usage_limit_total is not None or code.usage_limit_per_user is not None):
+        used_count, user_usage = discount_usage(code, user)
+        if used_count is None:
+            return None, 'کد تخفیف وارد شده معتبر نیست.'
+        code.used_count = used_count
+
+        # بررسی سقف کل استفاده
+        if not code.has_usage_remaining():
+            return None, 'ظرفیت استفاده از این کد تخفیف تمام شده است.'
 
-    # بررسی سقف استفاده هر کاربر
-    if not code.user_can_use(user):
-        return None, 'شما قبلاً از این کد تخفیف استفاده کرده‌اید.'
+        # بررسی سقف استفاده هر کاربر
+        if not code.user_can_use(user, user_usage):
+            return None, 'شما قبلاً از این کد تخفیف استفاده کرده‌اید.'
 
     # بررسی حداقل مبلغ سفارش
     cart_total = sum(item['total'] for item in cart_items)
@@ -148,7 +283,7 @@ def validate_discount_code(code_str, cart_items, user, request=None):
     if code.scope == DiscountCode.SCOPE_PRODUCT:
         product_ids_in_cart = {item['product'].id for item in cart_items}
         if code.product_id not in product_ids_in_cart:
-            product_name = code.product.name if code.product else 'محصول مورد نظر'
+            product_name = code.product.name if code.product_id else 'محصول مورد نظر'
             return None, f'این کد تخفیف فقط برای «{product_name}» معتبر است و آن محصول در سبد شما نیست.'
 
     return code, None
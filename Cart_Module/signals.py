@@ -0,0 +1,33 @@
+"""
+ابطال قواعد کش شده کدهای تخفیف (services.get_discount_code) و ادغام سبد مهمان هنگام ورود
+"""
+from django.contrib.auth.signals import user_logged_in
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from Products_Module.models import Product
+from .models import DiscountCode
+from .services import invalidate_discount_codes
+from .storage import merge_session_cart
+
+
+@receiver([post_save, post_delete], sender=DiscountCode, dispatch_uid='discount_code_cache')
+def invalidate_discount_code_cache(sender, **kwargs):
+    """تغییر کد (شامل تغییر خود کد): همه قواعد کش شده کنار گذاشته می‌شوند"""
+    invalidate_discount_codes()
+
+
+@receiver(post_save, sender=Product, dispatch_uid='discount_code_cache_product')
+def invalidate_discount_code_product(sender, instance, update_fields=None, **kwargs):
+    """از محصول فقط نامش در قواعد کش می‌شود؛ فقط محصولی که کدی به آن اشاره کند ابطال می‌کند"""
+    if update_fields is not None and 'name' not in update_fields:
+        return
+    if DiscountCode.objects.filter(product_id=instance.pk).exists():
+        invalidate_discount_codes()
+
+
+@receiver(user_logged_in, dispatch_uid='merge_session_cart')
+def merge_cart_on_login(sender, request, user, **kwargs):
+    """سبد سشن مهمان یک بار در سبد دیتابیس کاربر ادغام می‌شود"""
+    if request is not None and hasattr(request, 'session'):
+        merge_session_cart(request, user)
@@ -0,0 +1,204 @@
+"""
+محل نگهداری سبد خرید
+
+سبد کاربر وارد شده فقط در دیتابیس (CartItem) است و سبد مهمان در سشن؛ ویوها فقط
+با رابط CartStorage کار می‌کنند (get_cart_storage). سبد سشن مهمان هنگام ورود یک
+بار با سبد دیتابیس ادغام می‌شود (merge_session_cart، سیگنال user_logged_in).
+
+خواندن سبد هیچ نوشتنی ندارد: نه در سشن و نه در دیتابیس. خلاصه سبد هدر
+(cart_summary) زیر کلیدی با نسخه سبد و نسخه کاتالوگ کش می‌شود و هر تغییر سبد
+فقط نسخه را بالا می‌برد؛ کلید قبلی دیگر خوانده نمی‌شود و با TTL از بین می‌رود.
+
+تنظیمات (settings.py):
+    CART_SUMMARY_CACHE_TIMEOUT: مدت کش خلاصه سبد به ثانیه
+"""
+from abc import ABC, abstractmethod
+
+from django.conf import settings
+from django.core.cache import cache
+
+from Products_Module import cache_keys
+from .models import CartItem
+from .services import CART_SESSION_KEY, price_cart, sync_cart_to_db
+
+DEFAULT_SUMMARY_CACHE_TIMEOUT = 60 * 10
+# تعداد آیتم‌های دراپ‌داون سبد در هدر
+SUMMARY_PREVIEW_ITEMS = 3
+
+
+class CartStorage(ABC):
+    """
+    رابط سبد خرید: {product_id: quantity}
+    زیرکلاس‌ها _load و _save را پیاده می‌کنند؛ سبد در هر درخواست یک بار خوانده می‌شود.
+    """
+
+    def __init__(self, request):
+        self.request = request
+        self._items = None
+
+    # ── پیاده‌سازی ────────────────────────────────────────────────────────────
+
+    @abstractmethod
+    def _load(self):
+        """{product_id: quantity} ذخیره شده"""
+
+    @abstractmethod
+    def _save(self, items):
+        """ذخیره کل سبد"""
+
+    @property
+    @abstractmethod
+    def owner(self):
+        """شناسه صاحب سبد برای کلیدهای کش (None: هنوز سشنی ساخته نشده)"""
+
+    # ── خواندن ────────────────────────────────────────────────────────────────
+
+    def items(self):
+        """کپی سبد: {product_id (int): quantity}"""
+        if self._items is None:
+            self._items = self._load()
+        return dict(self._items)
+
+    def quantity(self, product_id):
+        return self.items().get(product_id, 0)
+
+    # ── تغییر ─────────────────────────────────────────────────────────────────
+
+    def update(self, quantities):
+        """تنظیم تعداد چند محصول با یک نوشتن؛ تعداد کمتر از ۱ محصول را حذف می‌کند"""
+        items = self.items()
+        for product_id, quantity in quantities.items():
+            if quantity < 1:
+                items.pop(product_id, None)
+            else:
+                items[product_id] = quantity
+        if items != self._items:
+            self._save(items)
+            self._items = items
+            self.changed()
+
+    def set(self, product_id, quantity):
+        self.update({product_id: quantity})
+
+    def remove(self, product_id):
+        self.update({product_id: 0})
+
+    def clear(self):
+        self.update({product_id: 0 for product_id in self.items()})
+
+    def changed(self):
+        """نسخه سبد بالا می‌رود تا خلاصه کش شده قبلی خوانده نشود"""
+        if self.owner is not None:
+            cache_keys.bump_version(cart_version_key(self.owner))
+
+
+class SessionCartStorage(CartStorage):
+    """سبد مهمان در سشن؛ کلیدها رشته‌ای ذخیره می‌شوند (سریال‌سازی JSON سشن)"""
+
+    def _load(self):
+        items = {}
+        for product_id, quantity in (self.request.session.get(CART_SESSION_KEY) or {}).items():
+            try:
+                items[int(product_id)] = int(quantity)
+            except (TypeError, ValueError):
+                continue
+        return items
+
+    def _save(self, items):
+        if items:
+            self.request.session[CART_SESSION_KEY] = {str(pk): quantity for pk, quantity in items.items()}
+        else:
+            self.request.session.pop(CART_SESSION_KEY, None)
+
+    @property
+    def owner(self):
+        session_key = self.request.session.session_key
+        return f'session_{session_key}' if session_key else None
+
+
+class DatabaseCartStorage(CartStorage):
+    """سبد کاربر وارد شده در جدول CartItem (مرجع اصلی سبد)"""
+
+    def __init__(self, request, user=None):
+        super().__init__(request)
+        self.user = user or request.user
+
+    def _load(self):
+        return dict(CartItem.objects.filter(user=self.user).values_list('product_id', 'quantity'))
+
+    def _save(self, items):
+        # سبد خوانده شده همین درخواست وضعیت فعلی دیتابیس است؛ SELECT دوباره لازم نیست
+        sync_cart_to_db(self.user, items, existing=self._items)
+
+    @property
+    def owner(self):
+        return f'user_{self.user.pk}'
+
+
+def get_cart_storage(request):
+    """سبد درخواست جاری (یک نمونه برای هر درخواست)"""
+    storage = getattr(request, '_cart_storage', None)
+    if storage is None:
+        if request.user.is_authenticated:
+            storage = DatabaseCartStorage(request)
+        else:
+            storage = SessionCartStorage(request)
+        request._cart_storage = storage
+    return storage
+
+
+def merge_session_cart(request, user):
+    """
+    ادغام سبد مهمان سشن با سبد دیتابیس کاربر هنگام ورود (بیشینه تعداد هر محصول)؛
+    پس از آن سبد سشن حذف می‌شود.
+    """
+    guest = SessionCartStorage(request).items()
+    request.session.pop(CART_SESSION_KEY, None)
+    request.__dict__.pop('_cart_storage', None)
+    if not guest:
+        return
+    storage = DatabaseCartStorage(request, user)
+    current = storage.items()
+    storage.update({pk: max(current.get(pk, 0), quantity) for pk, quantity in guest.items()})
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# خلاصه سبد (هدر)
+# ─────────────────────────────────────────────────────────────────────────────
+
+def cart_version_key(owner):
+    return f'cart_version_{owner}'
+
+
+def cart_summary_key(owner):
+    """
+    کلید خلاصه سبد با نسخه فعلی سبد و نسخه کاتالوگ (تغییر قیمت، نام یا موجودی
+    محصولات نسخه لیست محصولات را بالا می‌برد) - هر دو با یک get_many
+    """
+    version_key = cart_version_key(owner)
+    versions = cache.get_many([version_key, cache_keys.LISTING_VERSION])
+    return f'cart_summary_{owner}_{versions.get(version_key, 0)}_{versions.get(cache_keys.LISTING_VERSION, 0)}'
+
+
+def summary_cache_timeout():
+    return getattr(settings, 'CART_SUMMARY_CACHE_TIMEOUT', DEFAULT_SUMMARY_CACHE_TIMEOUT)
+
+
+def cart_summary(request):
+    """تعداد آیتم، جمع کل و چند آیتم اول سبد برای هدر - کش شده با نسخه سبد"""
+    storage = get_cart_storage(request)
+    key = cart_summary_key(storage.owner) if storage.owner is not None else None
+    if key is not None:
+        summary = cache.get(key)
+        if summary is not None:
+            return summary
+
+    items, total = price_cart(storage.items())
+    summary = {
+        'cart_count': sum(item['quantity'] for item in items),
+        'cart_total': total,
+        'cart_items_preview': items[:SUMMARY_PREVIEW_ITEMS],
+    }
+    if key is not None:
+        cache.set(key, summary, summary_cache_timeout())
+    return summary
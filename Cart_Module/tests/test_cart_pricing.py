@@ -0,0 +1,79 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from Cart_Module.models import CartItem
+from Cart_Module.services import price_cart
+from Products_Module.models import Category, Product, ProductImage
+
+
+class CartPricingServiceTests(TestCase):
+    def setUp(self):
+        self.category = Category.objects.create(name='Category', slug='category')
+        self.products = [
+            Product.objects.create(
+                name=f'Product {index}',
+                slug=f'product-{index}',
+                category=self.category,
+                description='Test product',
+                price=Decimal('1000') * (index + 1),
+                stock=10,
+            )
+            for index in range(5)
+        ]
+        ProductImage.objects.create(product=self.products[0], image='products/second.jpg', order=2)
+        ProductImage.objects.create(product=self.products[0], image='products/main.jpg', order=5, is_main=True)
+
+    def test_price_cart_uses_single_query_for_any_cart_size(self):
+        cart = {str(product.id): 2 for product in self.products}
+
+        with self.assertNumQueries(1):
+            items, total = price_cart(cart)
+
+        self.assertEqual(len(items), 5)
+        self.assertEqual(total, Decimal('30000'))
+        self.assertEqual([item['product'].id for item in items], [product.id for product in self.products])
+
+    def test_price_cart_prefers_main_image(self):
+        items, _ = price_cart({str(self.products[0].id): 1, str(self.products[1].id): 1})
+
+        self.assertTrue(items[0]['image_url'].endswith('products/main.jpg'))
+        self.assertEqual(items[1]['image_url'], '')
+
+    def test_price_cart_skips_invalid_and_unavailable_lines(self):
+        self.products[1].is_available = False
+        self.products[1].save()
+        cart = {
+            str(self.products[0].id): 1,
+            str(self.products[1].id): 1,
+            str(self.products[2].id): 0,
+            'not-a-number': 3,
+            '999999': 1,
+        }
+
+        items, total = price_cart(cart)
+
+        self.assertEqual([item['product'].id for item in items], [self.products[0].id])
+        self.assertEqual(total, Decimal('1000'))
+
+    def test_cart_page_query_count_does_not_grow_with_cart_lines(self):
+        user = get_user_model().objects.create_user(username='pricing', password='StrongPass123!')
+        self.client.force_login(user)
+        CartItem.objects.create(user=user, product=self.products[0], quantity=1)
+        cache.clear()
+        with CaptureQueriesContext(connection) as small_cart:
+            self.client.get(reverse('cart:detail'))
+
+        CartItem.objects.bulk_create(
+            CartItem(user=user, product=product, quantity=1) for product in self.products[1:]
+        )
+        cache.clear()
+        with CaptureQueriesContext(connection) as large_cart:
+            self.client.get(reverse('cart:detail'))
+
+        self.assertEqual(len(small_cart), len(large_cart))
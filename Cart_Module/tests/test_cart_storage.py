@@ -0,0 +1,140 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from Cart_Module.models import CartItem
+from Cart_Module.services import CART_SESSION_KEY, sync_cart_to_db
+from Cart_Module.storage import CartStorage, cart_summary_key
+from Products_Module.models import Category, Product
+
+WRITE_STATEMENTS = ('INSERT', 'UPDATE', 'DELETE')
+
+
+def create_products(count):
+    category = Category.objects.create(name='Category', slug='category')
+    return [
+        Product.objects.create(
+            name=f'product {index}', slug=f'product-{index}', category=category,
+            description='desc', price=Decimal('1000'), stock=10,
+        )
+        for index in range(count)
+    ]
+
+
+def cart_of(user):
+    return dict(CartItem.objects.filter(user=user).values_list('product_id', 'quantity'))
+
+
+class CartStorageInterfaceTests(SimpleTestCase):
+    def test_missing_override_fails_at_construction(self):
+        class NoOwnerStorage(CartStorage):
+            def _load(self):
+                return {}
+
+            def _save(self, items):
+                pass
+
+        with self.assertRaises(TypeError):
+            NoOwnerStorage(None)
+
+
+class SyncCartTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user('buyer', password='pass')
+        self.products = create_products(6)
+
+    def test_applies_only_the_difference(self):
+        first, second, third = (product.pk for product in self.products[:3])
+        sync_cart_to_db(self.user, {first: 1, second: 2})
+
+        sync_cart_to_db(self.user, {second: 5, third: 1})
+
+        self.assertEqual(cart_of(self.user), {second: 5, third: 1})
+
+    def test_query_count_does_not_grow_with_cart_lines(self):
+        def sync(products):
+            CartItem.objects.filter(user=self.user).delete()
+            sync_cart_to_db(self.user, {product.pk: 1 for product in products[::2]})
+            with CaptureQueriesContext(connection) as queries:
+                sync_cart_to_db(self.user, {product.pk: 2 for product in products[1:]})
+            return len(queries)
+
+        self.assertEqual(sync(self.products[:3]), sync(self.products))
+
+    def test_known_rows_skip_the_select(self):
+        first, second = (product.pk for product in self.products[:2])
+        sync_cart_to_db(self.user, {first: 1})
+
+        with CaptureQueriesContext(connection) as queries:
+            sync_cart_to_db(self.user, {first: 2, second: 1}, existing={first: 1})
+
+        self.assertFalse([query for query in queries if query['sql'].lstrip().upper().startswith('SELECT')])
+        self.assertEqual(cart_of(self.user), {first: 2, second: 1})
+
+    def test_stale_existing_rows_are_upserted(self):
+        first = self.products[0].pk
+        sync_cart_to_db(self.user, {first: 1})
+
+        sync_cart_to_db(self.user, {first: 4}, existing={})
+
+        self.assertEqual(cart_of(self.user), {first: 4})
+
+
+@override_settings(RATELIMIT_ENABLE=False)
+class CartStorageViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user('buyer', password='pass')
+        self.products = create_products(3)
+
+    def test_guest_cart_is_merged_once_at_login(self):
+        first, second, third = (product.pk for product in self.products)
+        CartItem.objects.create(user=self.user, product_id=first, quantity=3)
+        CartItem.objects.create(user=self.user, product_id=second, quantity=1)
+        session = self.client.session
+        session[CART_SESSION_KEY] = {str(first): 1, str(second): 2, str(third): 1}
+        session.save()
+
+        self.client.force_login(self.user)
+        self.client.force_login(self.user)
+
+        self.assertEqual(cart_of(self.user), {first: 3, second: 2, third: 1})
+        self.assertNotIn(CART_SESSION_KEY, self.client.session)
+
+    def test_page_views_do_not_write(self):
+        CartItem.objects.create(user=self.user, product=self.products[0], quantity=1)
+        self.client.force_login(self.user)
+
+        for url in (reverse('cart:detail'), reverse('index')):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            writes = [query['sql'] for query in queries if query['sql'].lstrip().upper().startswith(WRITE_STATEMENTS)]
+            self.assertEqual(writes, [], url)
+            self.assertNotIn('sessionid', response.cookies)
+
+    def test_mutation_changes_cached_summary_key(self):
+        self.client.force_login(self.user)
+        self.client.get(reverse('index'))
+        key = cart_summary_key(f'user_{self.user.pk}')
+        self.assertEqual(cache.get(key)['cart_count'], 0)
+
+        self.client.post(reverse('cart:add', args=[self.products[0].pk]), {'quantity': 2})
+
+        self.assertNotEqual(cart_summary_key(f'user_{self.user.pk}'), key)
+        self.client.get(reverse('index'))
+        self.assertEqual(cache.get(cart_summary_key(f'user_{self.user.pk}'))['cart_count'], 2)
+
+    def test_cart_update_writes_all_lines_together(self):
+        first, second, third = (product.pk for product in self.products)
+        sync_cart_to_db(self.user, {first: 1, second: 1})
+        self.client.force_login(self.user)
+
+        self.client.post(reverse('cart:update'), {f'qty_{first}': 0, f'qty_{second}': 4, f'qty_{third}': 2})
+
+        self.assertEqual(cart_of(self.user), {second: 4, third: 2})
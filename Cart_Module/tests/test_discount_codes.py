@@ -3,6 +3,7 @@ from decimal import Decimal
 
 from django.contrib.admin.sites import AdminSite
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
 from django.test import TestCase
 from django.urls import reverse
@@ -10,8 +11,8 @@ from django.utils import timezone
 
 from Accounts_Module.models import UserProfile
 from Cart_Module.admin import DiscountCodeAdmin
-from Cart_Module.models import DiscountCode, Order
-from Cart_Module.services import CART_SESSION_KEY, DISCOUNT_SESSION_KEY
+from Cart_Module.models import CartItem, DiscountCode, DiscountCodeUsage, Order
+from Cart_Module.services import DISCOUNT_CODES_VERSION, DISCOUNT_SESSION_KEY, get_discount_code, sync_cart_to_db
 from Products_Module.models import Category, Product
 
 
@@ -102,8 +103,8 @@ class DiscountCodeFlowTests(TestCase):
         self._set_cart({self.product.id: 1})
 
     def _set_cart(self, items, discount_code_value=None):
+        sync_cart_to_db(self.user, items)
         session = self.client.session
-        session[CART_SESSION_KEY] = {str(product_id): qty for product_id, qty in items.items()}
         if discount_code_value:
             session[DISCOUNT_SESSION_KEY] = discount_code_value
         elif DISCOUNT_SESSION_KEY in session:
@@ -131,6 +132,22 @@ class DiscountCodeFlowTests(TestCase):
         payload.update(overrides)
         return DiscountCode.objects.create(**payload)
 
+    def test_only_products_used_by_codes_invalidate_cached_rules(self):
+        other = Product.objects.create(
+            name='Other', slug='other', category=self.category, description='desc', price=Decimal('1000'), stock=1,
+        )
+        self._create_discount(code='ITEM', scope=DiscountCode.SCOPE_PRODUCT, product=self.product)
+        version = cache.get(DISCOUNT_CODES_VERSION, 0)
+
+        other.name = 'Renamed'
+        other.save()
+        self.assertEqual(cache.get(DISCOUNT_CODES_VERSION, 0), version)
+
+        self.product.name = 'Renamed Product'
+        self.product.save()
+        self.assertGreater(cache.get(DISCOUNT_CODES_VERSION, 0), version)
+        self.assertEqual(get_discount_code('ITEM').product.name, 'Renamed Product')
+
     def test_discount_apply_accepts_valid_code(self):
         self._create_discount(code='SAVE10')
 
@@ -201,6 +218,8 @@ class DiscountCodeFlowTests(TestCase):
             discount_code=code,
             total=Decimal('90000'),
         )
+        # ثبت سفارش (orders.place_order) شمارنده استفاده کاربر را افزایش می‌دهد
+        DiscountCodeUsage.objects.create(discount_code=code, user=self.user, count=1)
 
         response = self.client.post(reverse('cart:discount_apply'), {'code': 'ONCEONLY'})
 
@@ -249,7 +268,7 @@ class DiscountCodeFlowTests(TestCase):
         code.refresh_from_db()
         self.assertEqual(code.used_count, 1)
 
-        self.assertEqual(self.client.session.get(CART_SESSION_KEY), {})
+        self.assertFalse(CartItem.objects.filter(user=self.user).exists())
         self.assertIsNone(self.client.session.get(DISCOUNT_SESSION_KEY))
 
         payment_response = self.client.get(reverse('cart:payment', kwargs={'order_id': order.id}))
@@ -0,0 +1,226 @@
+import threading
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import OperationalError, connection, connections
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from Accounts_Module.models import UserProfile
+from Cart_Module import inventory
+from Cart_Module.models import Order, OrderItem
+from Cart_Module.orders import place_order
+from Cart_Module.services import price_cart, sync_cart_to_db
+from Products_Module import cache_keys, facets
+from Products_Module.models import Category, Product
+
+CONTACT = {'full_name': 'Buyer', 'phone': '09120000000', 'email': '', 'address': 'Tehran', 'postal_code': '', 'city': ''}
+
+
+def create_product(slug, stock, category=None):
+    category = category or Category.objects.get_or_create(name='Category', slug='category')[0]
+    return Product.objects.create(
+        name=slug, slug=slug, category=category, description='desc', price=Decimal('1000'), stock=stock,
+    )
+
+
+def create_order(user, lines):
+    order = Order.objects.create(user=user, full_name='Buyer', phone='0912', address='Tehran')
+    for product, quantity in lines:
+        OrderItem.objects.create(order=order, product=product, product_name=product.name, quantity=quantity,
+                                 price=product.price)
+    return order
+
+
+class StockTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.first = create_product('first', stock=3)
+        self.second = create_product('second', stock=1)
+
+    def test_decrement_marks_sold_out_unavailable(self):
+        inventory.decrement_stock([(self.first.pk, 2), (self.second.pk, 1)])
+
+        self.first.refresh_from_db()
+        self.second.refresh_from_db()
+        self.assertEqual((self.first.stock, self.first.is_available), (1, True))
+        self.assertEqual((self.second.stock, self.second.is_available), (0, False))
+
+    def test_shortage_rolls_back_every_line(self):
+        with self.assertRaises(inventory.InsufficientStock) as raised:
+            inventory.decrement_stock([(self.first.pk, 1), (self.second.pk, 2)])
+
+        self.assertEqual(raised.exception.product_name, 'second')
+        self.assertEqual(Product.objects.get(pk=self.first.pk).stock, 3)
+
+    def test_duplicate_lines_are_merged(self):
+        with self.assertRaises(inventory.InsufficientStock):
+            inventory.decrement_stock([(self.second.pk, 1), (self.second.pk, 1)])
+
+    def test_increment_restores_availability(self):
+        inventory.decrement_stock([(self.second.pk, 1)])
+        inventory.increment_stock([(self.second.pk, 1)])
+
+        self.second.refresh_from_db()
+        self.assertEqual((self.second.stock, self.second.is_available), (1, True))
+
+    def test_increment_keeps_manually_disabled_products_off(self):
+        Product.objects.filter(pk=self.second.pk).update(stock=0, is_available=False)
+
+        inventory.increment_stock([(self.second.pk, 1)])
+
+        self.second.refresh_from_db()
+        self.assertEqual((self.second.stock, self.second.is_available), (1, False))
+
+    def test_only_availability_flips_touch_catalog_caches(self):
+        cache.set(cache_keys.PRICE_RANGE, 'cached')
+        version = cache_keys.listing_version()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            inventory.decrement_stock([(self.first.pk, 1)])
+        self.assertEqual(cache.get(cache_keys.PRICE_RANGE), 'cached')
+        self.assertEqual(cache_keys.listing_version(), version)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            inventory.decrement_stock([(self.first.pk, 2)])
+        self.assertIsNone(cache.get(cache_keys.PRICE_RANGE))
+        self.assertGreater(cache_keys.listing_version(), version)
+        self.assertNotIn(self.first.pk, facets.query(available=True).ids)
+
+
+class ReservationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user('buyer', password='pass')
+        self.product = create_product('shoe', stock=2)
+
+    def _place(self):
+        """سفارش از مسیر واقعی checkout (orders.place_order) که موجودی را رزرو می‌کند"""
+        items, _ = price_cart({str(self.product.pk): 2})
+        return place_order(self.user, items, CONTACT)
+
+    def _stock(self):
+        return Product.objects.get(pk=self.product.pk).stock
+
+    def test_reserve_then_commit_decrements_once(self):
+        order = self._place()
+        self.assertEqual(self._stock(), 0)
+
+        self.assertTrue(inventory.commit_order(order))
+        self.assertEqual(self._stock(), 0)
+        order.refresh_from_db()
+        self.assertEqual((order.status, order.reserved_until), ('paid', None))
+
+    def test_second_commit_is_rejected(self):
+        order = self._place()
+        inventory.commit_order(order)
+
+        self.assertFalse(inventory.commit_order(order))
+        self.assertEqual(self._stock(), 0)
+
+    def test_expired_hold_is_released_and_paid_later(self):
+        order = self._place()
+
+        self.assertEqual(inventory.release_expired(timezone.now() + timedelta(hours=1)), 1)
+        self.assertEqual(self._stock(), 2)
+
+        self.assertTrue(inventory.commit_order(order))
+        self.assertEqual(self._stock(), 0)
+
+    def test_commit_after_release_fails_when_sold_elsewhere(self):
+        order = self._place()
+        inventory.release_expired(timezone.now() + timedelta(hours=1))
+        inventory.decrement_stock([(self.product.pk, 1)])
+
+        with self.assertRaises(inventory.InsufficientStock):
+            inventory.commit_order(order)
+        order.refresh_from_db()
+        self.assertEqual(order.status, 'pending')
+        self.assertEqual(self._stock(), 1)
+
+
+@override_settings(RATELIMIT_ENABLE=False)
+class CheckoutReservationViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user('buyer', password='pass')
+        UserProfile.objects.update_or_create(user=self.user, defaults={
+            'full_name': 'Buyer', 'phone': '09120000000', 'address': 'Tehran',
+        })
+        self.product = create_product('shoe', stock=1)
+        self.client.force_login(self.user)
+
+    def _checkout(self, quantity):
+        sync_cart_to_db(self.user, {self.product.pk: quantity})
+        return self.client.get(reverse('cart:checkout'))
+
+    def test_checkout_reserves_and_payment_commits(self):
+        response = self._checkout(1)
+        order = Order.objects.get()
+
+        self.assertRedirects(response, reverse('cart:payment', args=[order.pk]), fetch_redirect_response=False)
+        self.assertIsNotNone(order.reserved_until)
+        self.assertEqual(Product.objects.get(pk=self.product.pk).stock, 0)
+
+        response = self.client.post(reverse('cart:payment', args=[order.pk]))
+
+        self.assertRedirects(response, reverse('cart:invoice', args=[order.pk]), fetch_redirect_response=False)
+        self.assertEqual(Order.objects.get().status, 'paid')
+
+    def test_checkout_without_stock_creates_no_order(self):
+        response = self._checkout(2)
+
+        self.assertRedirects(response, reverse('cart:detail'), fetch_redirect_response=False)
+        self.assertFalse(Order.objects.exists())
+        self.assertEqual(Product.objects.get(pk=self.product.pk).stock, 1)
+
+
+class ConcurrentPaymentTests(TransactionTestCase):
+    """پرداخت‌های همزمان از چند thread با اتصال دیتابیس جداگانه"""
+
+    buyers = 8
+    stock = 3
+
+    def setUp(self):
+        cache.clear()
+        self.product = create_product('limited', stock=self.stock)
+        user = get_user_model().objects.create_user('buyer', password='pass')
+        self.orders = [create_order(user, [(self.product, 1)]) for _ in range(self.buyers)]
+
+    def _pay(self, order, results, barrier):
+        try:
+            barrier.wait()
+            for _ in range(200):
+                try:
+                    results.append(inventory.commit_order(order))
+                    return
+                except inventory.InsufficientStock:
+                    results.append(False)
+                    return
+                except OperationalError:
+                    # SQLite: نوشتن همزمان قفل کل دیتابیس را می‌خواهد؛ تلاش دوباره
+                    time.sleep(0.005)
+        finally:
+            connections.close_all()
+
+    def test_no_oversell_under_parallel_payments(self):
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            self.skipTest('threads need a file-based or server test database')
+        results = []
+        barrier = threading.Barrier(self.buyers)
+        threads = [threading.Thread(target=self._pay, args=(order, results, barrier)) for order in self.orders]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.product.refresh_from_db()
+        self.assertEqual(len(results), self.buyers)
+        self.assertEqual(results.count(True), self.stock)
+        self.assertEqual(Order.objects.filter(status='paid').count(), self.stock)
+        self.assertEqual(self.product.stock, 0)
+        self.assertFalse(self.product.is_available)
@@ -0,0 +1,147 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from Cart_Module import inventory
+from Cart_Module.models import DiscountCode, DiscountCodeUsage, Order, OrderItem
+from Cart_Module.orders import DiscountUnavailable, place_order
+from Cart_Module.services import price_cart, validate_discount_code
+from Products_Module.models import Category, Product
+
+CONTACT = {'full_name': 'Buyer', 'phone': '09120000000', 'email': '', 'address': 'Tehran', 'postal_code': '', 'city': ''}
+
+
+class PlaceOrderTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user('buyer', password='pass')
+        category = Category.objects.create(name='Category', slug='category')
+        self.products = [
+            Product.objects.create(
+                name=f'Product {index}', slug=f'product-{index}', category=category,
+                description='desc', price=Decimal('1000'), stock=5,
+            )
+            for index in range(6)
+        ]
+
+    def _items(self, count):
+        return price_cart({str(product.pk): 2 for product in self.products[:count]})[0]
+
+    def _place(self, items, discount_code=None):
+        with self.captureOnCommitCallbacks(execute=True):
+            return place_order(self.user, items, CONTACT, discount_code)
+
+    def test_order_is_written_with_precomputed_totals(self):
+        order = self._place(self._items(2))
+
+        self.assertEqual(order.subtotal, Decimal('4000'))
+        self.assertIsNotNone(order.reserved_until)
+        self.assertEqual(
+            sorted(OrderItem.objects.filter(order=order).values_list('quantity', 'total')),
+            [(2, Decimal('2000')), (2, Decimal('2000'))],
+        )
+        self.assertEqual(Product.objects.get(pk=self.products[0].pk).stock, 3)
+
+    def test_query_count_does_not_grow_with_lines(self):
+        one, six = self._items(1), self._items(6)
+
+        with CaptureQueriesContext(connection) as single:
+            place_order(self.user, one, CONTACT)
+        with CaptureQueriesContext(connection) as many:
+            place_order(self.user, six, CONTACT)
+
+        self.assertEqual(len(many), len(single))
+
+    def test_discount_usage_is_reserved(self):
+        code = DiscountCode.objects.create(code='SAVE', title='Save', value=Decimal('10'), usage_limit_total=1)
+
+        order = self._place(self._items(1), code)
+
+        self.assertEqual(order.discount_amount, Decimal('200'))
+        self.assertEqual(DiscountCode.objects.get(pk=code.pk).used_count, 1)
+
+    def test_exhausted_discount_rolls_back_order(self):
+        code = DiscountCode.objects.create(
+            code='SAVE', title='Save', value=Decimal('10'), usage_limit_total=1, used_count=1,
+        )
+
+        with self.assertRaises(DiscountUnavailable):
+            self._place(self._items(1), code)
+
+        self.assertFalse(Order.objects.exists())
+        self.assertEqual(Product.objects.get(pk=self.products[0].pk).stock, 5)
+
+    def test_insufficient_stock_rolls_back_order(self):
+        items = self._items(2)
+        items[1]['quantity'] = 6
+
+        with self.assertRaises(inventory.InsufficientStock):
+            self._place(items)
+
+        self.assertFalse(Order.objects.exists())
+        self.assertEqual(Product.objects.get(pk=self.products[0].pk).stock, 5)
+
+
+class DiscountCodeCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user('buyer', password='pass')
+        category = Category.objects.create(name='Category', slug='category')
+        self.product = Product.objects.create(
+            name='Shoe', slug='shoe', category=category, description='desc', price=Decimal('1000'), stock=5,
+        )
+        self.code = DiscountCode.objects.create(
+            code='SAVE', title='Save', value=Decimal('10'), usage_limit_per_user=1,
+            scope=DiscountCode.SCOPE_PRODUCT, product=self.product,
+        )
+        self.items = price_cart({str(self.product.pk): 1})[0]
+
+    def test_cart_validation_is_served_from_cache(self):
+        validate_discount_code('save', self.items, self.user)
+
+        with self.assertNumQueries(0):
+            code, error = validate_discount_code(' save ', self.items, self.user)
+
+        self.assertIsNone(error)
+        self.assertEqual(code.pk, self.code.pk)
+        self.assertEqual(code.product.name, 'Shoe')
+
+    def test_final_validation_reads_usage_in_one_query(self):
+        validate_discount_code('SAVE', self.items, self.user)
+
+        with self.assertNumQueries(1):
+            code, error = validate_discount_code('SAVE', self.items, self.user, final=True)
+        self.assertIsNone(error)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            place_order(self.user, self.items, CONTACT, code)
+        self.assertEqual(DiscountCodeUsage.objects.get(discount_code=self.code, user=self.user).count, 1)
+
+        code, error = validate_discount_code('SAVE', self.items, self.user, final=True)
+        self.assertIsNone(code)
+
+    def test_per_user_limit_is_enforced_at_placement(self):
+        code, _ = validate_discount_code('SAVE', self.items, self.user)
+        DiscountCodeUsage.objects.create(discount_code=self.code, user=self.user, count=1)
+
+        with self.assertRaises(DiscountUnavailable):
+            place_order(self.user, self.items, CONTACT, code)
+        self.assertEqual(DiscountCode.objects.get(pk=self.code.pk).used_count, 0)
+
+    def test_saving_code_invalidates_cache(self):
+        validate_discount_code('SAVE', self.items, self.user)
+        self.code.is_active = False
+        self.code.save()
+
+        code, error = validate_discount_code('SAVE', self.items, self.user)
+        self.assertIsNone(code)
+
+    def test_unknown_code_is_cached(self):
+        validate_discount_code('NOPE', self.items, self.user)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(validate_discount_code('NOPE', self.items, self.user)[0], None)
@@ -1,5 +1,5 @@
 """
-ویوهای سبد خرید - سشن‌بیس، افزودن/حذف/به‌روزرسانی، فاکتور، کد تخفیف
+ویوهای سبد خرید - افزودن/حذف/به‌روزرسانی (storage.py)، فاکتور، کد تخفیف
 """
 from decimal import Decimal
 from django.shortcuts import render, redirect, get_object_or_404
@@ -9,67 +9,28 @@ from django.views.decorators.http import require_POST, require_GET
 from django.views.decorators.cache import never_cache
 from django.urls import reverse
 from django.utils import timezone
+from django.utils.functional import SimpleLazyObject
 from django_ratelimit.decorators import ratelimit
-from django.core.cache import cache
 
 from Products_Module.models import Product
-from .models import Order, OrderItem
+from . import inventory
+from .models import Order
+from .orders import DiscountUnavailable, place_order
 from .services import (
-    sync_cart_to_db,
-    load_cart_from_db,
-    CART_SESSION_KEY,
     DISCOUNT_SESSION_KEY,
     get_active_discount_code,
     validate_discount_code,
     apply_discount_to_session,
     remove_discount_from_session,
     calculate_cart_with_discount,
+    price_cart,
 )
-
-
-def _get_cart(request):
-    if request.user.is_authenticated:
-        load_cart_from_db(request)
-
-    """دیکشنری سبد از سشن: { product_id: quantity }"""
-    cart = request.session.get(CART_SESSION_KEY)
-    if cart is None:
-        request.session[CART_SESSION_KEY] = {}
-        cart = request.session[CART_SESSION_KEY]
-    return cart
-
-
-def _clear_cart_cache(request):
-    """پاک کردن کش سبد خرید - هنگام تغییر سبد فراخوانی شود"""
-    if request.user.is_authenticated:
-        cache_key = f'cart_context_user_{request.user.id}'
-    else:
-        cache_key = f'cart_context_session_{request.session.session_key}'
-    cache.delete(cache_key)
+from .storage import cart_summary, get_cart_storage
 
 
 def _cart_item_list(request):
-    """لیست آیتم‌های سبد با شیء محصول و تعداد و جمع - برای قالب"""
-    cart = _get_cart(request)
-    items = []
-    total = Decimal('0')
-    for product_id_str, qty in list(cart.items()):
-        try:
-            product_id = int(product_id_str)
-            product = Product.objects.filter(pk=product_id, is_active=True, is_available=True).first()
-            if product and qty > 0:
-                price = product.price
-                line_total = price * qty
-                total += line_total
-                items.append({
-                    'product': product,
-                    'quantity': qty,
-                    'price': price,
-                    'total': line_total,
-                })
-        except (ValueError, TypeError):
-            continue
-    return items, total
+    """لیست آیتم‌های سبد با شیء محصول و تعداد و جمع - برای قالب (یک کوئری برای کل سبد)"""
+    return price_cart(get_cart_storage(request).items())
 
 
 @never_cache
@@ -118,7 +79,7 @@ def cart_add(request, product_id):
         messages.error(request, 'این محصول در حال حاضر موجود نیست.')
         return redirect(product.get_absolute_url())
 
-    cart = _get_cart(request)
+    cart = get_cart_storage(request)
     qty = request.POST.get('quantity', 1)
     try:
         qty = max(1, min(int(qty), product.stock if product.stock else 99))
@@ -126,8 +87,7 @@ def cart_add(request, product_id):
         qty = 1
 
     # Check if adding this quantity would exceed available stock
-    pid = str(product.id)
-    current_qty = cart.get(pid, 0)
+    current_qty = cart.quantity(product.id)
     if current_qty + qty > product.stock:
         available = product.stock - current_qty
         if available <= 0:
@@ -137,10 +97,7 @@ def cart_add(request, product_id):
             qty = available
             messages.warning(request, f'حداکثر {available} عدد از «{product.name}» قابل افزودن به سبد است.')
 
-    cart[pid] = current_qty + qty
-    request.session.modified = True
-    sync_cart_to_db(request)
-    _clear_cart_cache(request)  # پاک کردن کش سبد
+    cart.set(product.id, current_qty + qty)
 
     messages.success(request, f'«{product.name}» به سبد خرید اضافه شد.')
     next_url = request.POST.get('next') or request.GET.get('next')
@@ -154,13 +111,9 @@ def cart_remove(request, product_id):
         messages.info(request, 'برای مدیریت سبد خرید ابتدا وارد شوید.')
         return redirect(reverse('accounts:login_register') + '?next=' + request.path)
 
-    cart = _get_cart(request)
-    pid = str(product_id)
-    if pid in cart:
-        del cart[pid]
-        request.session.modified = True
-        sync_cart_to_db(request)
-        _clear_cart_cache(request)  # پاک کردن کش سبد
+    cart = get_cart_storage(request)
+    if cart.quantity(product_id):
+        cart.remove(product_id)
         messages.info(request, 'محصول از سبد خرید حذف شد.')
 
     next_url = request.POST.get('next') or request.GET.get('next')
@@ -174,52 +127,44 @@ def cart_update(request):
         messages.info(request, 'برای مدیریت سبد خرید ابتدا وارد شوید.')
         return redirect(reverse('accounts:login_register') + '?next=' + request.path)
 
-    cart = _get_cart(request)
+    requested = {}
     for key, value in request.POST.items():
         if key.startswith('qty_'):
             try:
-                product_id = int(key.replace('qty_', ''))
-                qty = int(value)
-                if qty < 1:
-                    cart.pop(str(product_id), None)
-                else:
-                    product = Product.objects.filter(pk=product_id, is_active=True, is_available=True).first()
-                    if product:
-                        max_qty = product.stock if product.stock else 99
-                        cart[str(product_id)] = min(qty, max_qty)
+                requested[int(key.replace('qty_', ''))] = int(value)
             except (ValueError, TypeError):
                 continue
-    request.session.modified = True
-    sync_cart_to_db(request)
-    _clear_cart_cache(request)  # پاک کردن کش سبد
+
+    # موجودی همه محصولات درخواستی با یک کوئری
+    stocks = dict(Product.objects.filter(
+        pk__in=[pid for pid, qty in requested.items() if qty >= 1],
+        is_active=True,
+        is_available=True,
+    ).values_list('pk', 'stock'))
+    quantities = {}
+    for product_id, qty in requested.items():
+        if qty < 1:
+            quantities[product_id] = 0
+        elif product_id in stocks:
+            max_qty = stocks[product_id] if stocks[product_id] else 99
+            quantities[product_id] = min(qty, max_qty)
+    # همه تغییرات با یک نوشتن
+    get_cart_storage(request).update(quantities)
     messages.success(request, 'سبد خرید به‌روزرسانی شد.')
     return redirect('cart:detail')
 
 
 def cart_context(request):
-    """برای استفاده در هدر: تعداد آیتم، جمع کل و چند آیتم اول برای دراپ‌داون - با کشینگ"""
-    # کش مخصوص هر کاربر برای عملکرد بهتر
-    if request.user.is_authenticated:
-        cache_key = f'cart_context_user_{request.user.id}'
-    else:
-        cache_key = f'cart_context_session_{request.session.session_key}'
-
-    cached_context = cache.get(cache_key)
-    if cached_context is not None:
-        return cached_context
-
-    items, total = _cart_item_list(request)
-    context = {
-        'cart_count': sum(i['quantity'] for i in items),
-        'cart_total': total,
-        'cart_items_preview': items[:3],  # حداکثر ۳ آیتم برای دراپ‌داون هدر
+    """
+    برای استفاده در هدر: داده‌های سبد مخصوص هر کاربر، جدا از داده‌های مشترک قالب.
+    مقادیر تنبل هستند؛ سبد فقط وقتی قالب یکی از آن‌ها را بخواند خوانده می‌شود.
+    """
+    summary = SimpleLazyObject(lambda: cart_summary(request))
+    return {
+        name: SimpleLazyObject(lambda name=name: summary[name])
+        for name in ('cart_count', 'cart_total', 'cart_items_preview')
     }
 
-    # کش برای 2 دقیقه
-    cache.set(cache_key, context, 60 * 2)
-
-    return context
-
 
 # ─────────────────────────────────────────────────────────────────────────────
 # ویوهای کد تخفیف
@@ -243,7 +188,7 @@ def discount_apply(request):
         messages.warning(request, 'سبد خرید شما خالی است.')
         return redirect('cart:empty')
 
-    discount_code, error = validate_discount_code(code_str, items, request.user, request)
+    discount_code, error = validate_discount_code(code_str, items, request.user, request, final=True)
 
     if error:
         messages.error(request, error)
@@ -322,62 +267,40 @@ def checkout_view(request):
 
     # ── اعتبارسنجی مجدد کد تخفیف در زمان checkout ────────────────────────────
     discount_code_obj = None
-    discount_amount = Decimal('0')
-    subtotal = sum(item['total'] for item in items)
-
     code_str = request.session.get(DISCOUNT_SESSION_KEY)
     if code_str:
-        validated_code, error = validate_discount_code(code_str, items, request.user, request)
+        validated_code, error = validate_discount_code(code_str, items, request.user, request, final=True)
         if validated_code:
             discount_code_obj = validated_code
-            discount_info = calculate_cart_with_discount(items, validated_code)
-            discount_amount = discount_info['discount_amount']
         else:
             # کد دیگر معتبر نیست - از سشن پاک کن و به کاربر اطلاع بده
             remove_discount_from_session(request)
             messages.warning(request, f'کد تخفیف «{code_str}» دیگر معتبر نیست و از سبد حذف شد.')
 
-    final_total = max(subtotal - discount_amount, Decimal('0'))
-
-    order = Order(
-        user=request.user if request.user.is_authenticated else None,
-        full_name=full_name,
-        phone=phone,
-        email=email,
-        address=address,
-        postal_code=postal_code,
-        city=city,
-        subtotal=subtotal,
-        discount_code=discount_code_obj,
-        discount_amount=discount_amount,
-        total=final_total,
-        shipping_cost=Decimal('0'),
-        tax=Decimal('0'),
-        status='pending',
-    )
-    order.save()
-
-    for item in items:
-        OrderItem.objects.create(
-            order=order,
-            product=item['product'],
-            product_name=item['product'].name,
-            quantity=item['quantity'],
-            price=item['price'],
-            total=item['total'],
-        )
+    # رزروهای منقضی شده موجودی را برمی‌گردانند (بدون نیاز به cron)
+    inventory.release_expired()
 
-    # افزایش شمارنده استفاده از کد تخفیف
-    if discount_code_obj:
-        from django.db.models import F
-        from .models import DiscountCode
-        DiscountCode.objects.filter(pk=discount_code_obj.pk).update(used_count=F('used_count') + 1)
+    contact = {
+        'full_name': full_name,
+        'phone': phone,
+        'email': email,
+        'address': address,
+        'postal_code': postal_code,
+        'city': city,
+    }
+    try:
+        order = place_order(request.user, items, contact, discount_code_obj)
+    except inventory.InsufficientStock as exc:
+        messages.error(request, f'موجودی کافی از «{exc.product_name}» وجود ندارد.')
+        return redirect('cart:detail')
+    except DiscountUnavailable as exc:
+        remove_discount_from_session(request)
+        messages.error(request, f'ظرفیت استفاده از کد تخفیف «{exc.code}» تمام شد و از سبد حذف شد.')
+        return redirect('cart:detail')
 
     # خالی کردن سبد و کد تخفیف
-    request.session[CART_SESSION_KEY] = {}
+    get_cart_storage(request).clear()
     remove_discount_from_session(request)
-    request.session.modified = True
-    sync_cart_to_db(request)
 
     messages.success(request, 'سفارش با موفقیت ثبت شد. لطفاً پرداخت را انجام دهید.')
     return redirect('cart:payment', order_id=order.id)
@@ -399,29 +322,22 @@ def payment_view(request, order_id):
         return HttpResponseForbidden('دسترسی مجاز نیست.')
 
     if request.method == 'POST':
-        # Reduce product stock
-        from django.db import transaction
+        # کسر اتمیک موجودی (یا تبدیل رزرو checkout به فروش قطعی) و ثبت پرداخت
         try:
-            with transaction.atomic():
-                for item in order.items.all():
-                    product = item.product
-                    if product.stock >= item.quantity:
-                        product.stock -= item.quantity
-                        if product.stock <= 0:
-                            product.is_available = False
-                        product.save(update_fields=['stock', 'is_available'])
-                    else:
-                        messages.error(request, f'موجودی کافی از «{product.name}» وجود ندارد.')
-                        return redirect('cart:payment', order_id=order.id)
-
-                order.status = 'paid'
-                order.save(update_fields=['status', 'updated_at'])
-                messages.success(request, 'پرداخت با موفقیت انجام شد. فاکتور شما آماده است.')
-                return redirect('cart:invoice', order_id=order.id)
+            paid = inventory.commit_order(order)
+        except inventory.InsufficientStock as exc:
+            messages.error(request, f'موجودی کافی از «{exc.product_name}» وجود ندارد.')
+            return redirect('cart:payment', order_id=order.id)
         except Exception as e:
             messages.error(request, 'خطا در پردازش سفارش. لطفاً دوباره تلاش کنید.')
             return redirect('cart:payment', order_id=order.id)
 
+        if not paid:
+            messages.info(request, 'این سفارش قبلاً پرداخت یا لغو شده است.')
+            return redirect('cart:invoice', order_id=order.id)
+        messages.success(request, 'پرداخت با موفقیت انجام شد. فاکتور شما آماده است.')
+        return redirect('cart:invoice', order_id=order.id)
+
     return render(request, 'cart/payment.html', {'order': order})
 
 
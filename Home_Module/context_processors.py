@@ -0,0 +1,44 @@
+"""
+داده‌های مشترک قالب پایه (هدر، ناوبار و فوتر)
+
+همه داده‌های مشترک بین کاربران با یک cache.get_many خوانده می‌شوند و کلیدهای
+غایب یا منقضی با cache_fill (یک سازنده برای هر کلید) پر می‌شوند. مقادیر context تنبل (lazy) هستند؛ صفحه‌ای که
+هدر را رندر نمی‌کند (مثل پاسخ‌های AJAX) هیچ هزینه‌ای نمی‌پردازد.
+داده‌های سبد خرید مخصوص هر کاربر جداگانه در Cart_Module.context_processors هستند.
+"""
+from django.utils.functional import SimpleLazyObject
+
+from Menu_Module.menu_tree import load_main_menu
+from Products_Module import cache_fill, cache_keys
+from Products_Module.category_tree import load_navbar_categories
+
+# {نام متغیر قالب: (کلید کش، تابع ساخت در صورت نبودن در کش)}
+LAYOUT_DATA = {
+    'navbar_categories': (cache_keys.NAVBAR_CATEGORIES, load_navbar_categories),
+    'main_menu_items': (cache_keys.MAIN_MENU_ITEMS, load_main_menu),
+}
+
+
+class LayoutData:
+    """بارگذاری یکجای همه داده‌های مشترک در اولین دسترسی"""
+
+    def __init__(self):
+        self._values = None
+
+    def _load(self):
+        cached = cache_fill.get_or_build_many({key: loader for key, loader in LAYOUT_DATA.values()})
+        return {name: cached[key] for name, (key, _) in LAYOUT_DATA.items()}
+
+    def __getitem__(self, name):
+        if self._values is None:
+            self._values = self._load()
+        return self._values[name]
+
+
+def layout(request):
+    """Context processor: shared header/footer data, loaded lazily with one cache round trip"""
+    data = LayoutData()
+    return {
+        name: SimpleLazyObject(lambda name=name: data[name])
+        for name in LAYOUT_DATA
+    }
@@ -0,0 +1,53 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.sessions.backends.cache import SessionStore
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase
+
+from Cart_Module.context_processors import cart_context
+from Cart_Module.storage import cart_summary_key
+from Home_Module.context_processors import layout
+from Menu_Module.models import MenuItem
+from Products_Module.models import Category
+
+
+class LayoutContextTests(TestCase):
+    def setUp(self):
+        self.root = Category.objects.create(name='Clothing', slug='clothing')
+        Category.objects.create(name='Men', slug='men', parent=self.root)
+        MenuItem.objects.create(title='Shop', url='/shop/')
+        cache.clear()
+        self.request = RequestFactory().get('/')
+        self.request.user = AnonymousUser()
+        self.request.session = SessionStore()
+
+    def test_layout_data_is_lazy(self):
+        with self.assertNumQueries(0), mock.patch.object(cache, 'get_many') as get_many:
+            layout(self.request)
+
+        get_many.assert_not_called()
+
+    def test_all_shared_data_is_fetched_with_one_get_many(self):
+        layout(self.request)['navbar_categories'].__len__()  # warm the cache
+
+        context = layout(self.request)
+        with self.assertNumQueries(0), mock.patch.object(cache, 'get_many', wraps=cache.get_many) as get_many:
+            roots = list(context['navbar_categories'])
+            menu = list(context['main_menu_items'])
+
+        get_many.assert_called_once()
+        self.assertEqual([(c.name, [s.name for s in c.subcategories]) for c in roots], [('Clothing', ['Men'])])
+        self.assertEqual([item.title for item in menu], ['Shop'])
+
+    def test_cart_data_is_lazy_and_per_user(self):
+        user = get_user_model().objects.create_user(username='chrome', password='StrongPass123!')
+        self.request.user = user
+
+        with self.assertNumQueries(0):
+            context = cart_context(self.request)
+
+        self.assertEqual(context['cart_count'], 0)
+        self.assertFalse(context['cart_items_preview'])
+        self.assertIsNotNone(cache.get(cart_summary_key(f'user_{user.id}')))
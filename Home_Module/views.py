@@ -1,45 +1,46 @@
 from django.shortcuts import render
-from django.core.cache import cache
 from Products_Module.models import Product, Category
+from Products_Module import cache_keys, cache_fill, fragments
+
+
+def load_new_products():
+    return list(fragments.card_products(Product.objects.filter(
+        is_active=True,
+        is_available=True
+    )).order_by('-created_at')[:8])
+
+
+def load_trending_products():
+    return list(fragments.card_products(Product.objects.filter(
+        is_active=True,
+        is_available=True
+    )).order_by('-views_count')[:8])
+
+
+def load_main_categories():
+    # تعداد محصولات از category_tree.product_counts خوانده می‌شود
+    return list(Category.objects.filter(
+        is_active=True,
+        parent=None
+    ).only('id', 'name', 'slug', 'image')[:6])
+
+
+# {کلید کش: تابع ساخت} لیست‌های صفحه اصلی - با تغییر مدل‌ها از طریق سیگنال باطل می‌شوند
+HOME_DATA = {
+    cache_keys.HOME_NEW_PRODUCTS: load_new_products,
+    cache_keys.HOME_TRENDING_PRODUCTS: load_trending_products,
+    cache_keys.HOME_MAIN_CATEGORIES: load_main_categories,
+}
 
 
 def index(request):
-    """صفحه اصلی با کشینگ برای بهبود عملکرد"""
-
-    # کش برای محصولات جدید (5 دقیقه)
-    new_products_cache_key = 'home_new_products'
-    new_products = cache.get(new_products_cache_key)
-    if new_products is None:
-        new_products = list(Product.objects.filter(
-            is_active=True,
-            is_available=True
-        ).select_related('category', 'brand').prefetch_related('images').order_by('-created_at')[:8])
-        cache.set(new_products_cache_key, new_products, 60 * 5)  # 5 minutes
-
-    # کش برای محصولات پرفروش (10 دقیقه)
-    trending_products_cache_key = 'home_trending_products'
-    trending_products = cache.get(trending_products_cache_key)
-    if trending_products is None:
-        trending_products = list(Product.objects.filter(
-            is_active=True,
-            is_available=True
-        ).select_related('category', 'brand').prefetch_related('images').order_by('-views_count')[:8])
-        cache.set(trending_products_cache_key, trending_products, 60 * 10)  # 10 minutes
-
-    # کش برای دسته‌بندی‌های اصلی (15 دقیقه)
-    categories_cache_key = 'home_main_categories'
-    main_categories = cache.get(categories_cache_key)
-    if main_categories is None:
-        main_categories = list(Category.objects.filter(
-            is_active=True,
-            parent=None
-        ).prefetch_related('products')[:6])
-        cache.set(categories_cache_key, main_categories, 60 * 15)  # 15 minutes
+    """صفحه اصلی؛ هر سه لیست با یک رفت و برگشت کش خوانده می‌شوند (cache_fill)"""
+    data = cache_fill.get_or_build_many(HOME_DATA)
 
     context = {
-        'new_products': new_products,
-        'trending_products': trending_products,
-        'main_categories': main_categories,
+        'new_products': data[cache_keys.HOME_NEW_PRODUCTS],
+        'trending_products': data[cache_keys.HOME_TRENDING_PRODUCTS],
+        'main_categories': data[cache_keys.HOME_MAIN_CATEGORIES],
     }
 
     return render(request, 'Home_Module/index.html', context)
@@ -3,4 +3,7 @@ from django.apps import AppConfig
 
 class MenuModuleConfig(AppConfig):
     name = 'Menu_Module'
-    verbose_name = 'مدیریت منو'
\ No newline at end of file
+    verbose_name = 'مدیریت منو'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,77 @@
+"""
+درخت منو به صورت گره‌های ساده و تغییرناپذیر
+
+همه آیتم‌های فعال منو با یک کوئری خوانده می‌شوند و آدرس نهایی (resolved_url)،
+لیست فرزندان و has_children از پیش محاسبه می‌شوند؛ قالب‌ها دیگر برای هر آیتم
+کوئری has_children/get_children نمی‌زنند. درخت هر نوع منو کش می‌شود و سیگنال
+ذخیره/حذف MenuItem آن را باطل می‌کند.
+"""
+from typing import NamedTuple
+
+from Products_Module import cache_fill, cache_keys
+from .models import MenuItem
+
+
+class MenuNode(NamedTuple):
+    """گره منو؛ نام ویژگی‌ها با MenuItem یکسان است تا قالب‌ها بدون تغییر کار کنند"""
+
+    id: int
+    title: str
+    url: str
+    resolved_url: str
+    order: int
+    children: tuple = ()
+
+    @property
+    def has_children(self):
+        return bool(self.children)
+
+    def get_children(self):
+        return self.children
+
+
+def build_menu_tree(items, menu_type='main'):
+    """
+    ساخت گره‌های ریشه یک نوع منو از لیست آیتم‌های فعال (مرتب بر اساس order).
+    فرزندِ آیتم غیرفعال همراه والدش حذف می‌شود.
+    """
+    children = {}
+    for item in items:
+        children.setdefault(item.parent_id, []).append(item)
+
+    def node(item, seen):
+        # seen: جلوگیری از حلقه در داده‌های خراب
+        return MenuNode(
+            id=item.id,
+            title=item.title,
+            url=item.url or '',
+            resolved_url=item.resolved_url,
+            order=item.order,
+            children=tuple(
+                node(child, seen | {item.id})
+                for child in children.get(item.id, ()) if child.id not in seen
+            ),
+        )
+
+    return tuple(node(item, frozenset()) for item in children.get(None, ()) if item.menu_type == menu_type)
+
+
+def load_menu_tree(menu_type='main'):
+    """ساخت درخت منو از دیتابیس با یک کوئری (بدون کش)"""
+    items = MenuItem.objects.filter(is_active=True).only(
+        'id', 'title', 'url', 'order', 'parent_id', 'menu_type',
+    ).order_by('order', 'id')
+    return build_menu_tree(items, menu_type)
+
+
+def load_main_menu():
+    return load_menu_tree('main')
+
+
+def load_footer_menu():
+    return load_menu_tree('footer')
+
+
+def get_menu_tree(menu_type='main'):
+    """گره‌های ریشه منو (کش شده)"""
+    return cache_fill.get_or_build(cache_keys.menu_tree_key(menu_type), lambda: load_menu_tree(menu_type))
@@ -0,0 +1,13 @@
+"""
+سیگنال‌های ابطال کش منو
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from Products_Module import cache_keys
+from .models import MenuItem
+
+
+@receiver([post_save, post_delete], sender=MenuItem, dispatch_uid='catalog_cache_menu_item')
+def invalidate_menu_cache(sender, **kwargs):
+    cache_keys.invalidate_model('MenuItem')
@@ -1,21 +1,20 @@
 from django import template
-from Menu_Module.models import MenuItem
+from Menu_Module.menu_tree import get_menu_tree
 
 register = template.Library()
 
 
+@register.simple_tag
+def get_menu_items(menu_type='main'):
+    return get_menu_tree(menu_type)
+
+
 @register.inclusion_tag('menu/render_menu.html')
 def render_main_menu():
-    menu_items = MenuItem.objects.filter(
-        menu_type='main',
-        is_active=True,
-        parent__isnull=True
-    ).prefetch_related('children').order_by('order')
-
-    return {'menu_items': menu_items}
+    return {'menu_items': get_menu_tree('main')}
 
 
 @register.inclusion_tag('menu/render_submenu.html')
 def render_submenu(parent_item):
     children = parent_item.get_children()
-    return {'children': children}
\ No newline at end of file
+    return {'children': children}
@@ -0,0 +1,53 @@
+from django.core.cache import cache
+from django.template import Context, Template
+from django.test import TestCase
+
+from Menu_Module.menu_tree import get_menu_tree
+from Menu_Module.models import MenuItem
+
+
+class MenuTreeTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.shop = MenuItem.objects.create(title='Shop', url='/products/', order=2)
+        self.blog = MenuItem.objects.create(title='Blog', url='/blog/', order=1)
+        self.men = MenuItem.objects.create(title='Men', url='/products/men/', parent=self.shop, order=1)
+        MenuItem.objects.create(title='Shirts', url='/products/shirts/', parent=self.men)
+        MenuItem.objects.create(title='Hidden', url='/hidden/', parent=self.shop, is_active=False)
+        MenuItem.objects.create(title='Footer', url='/faq/', menu_type='footer')
+        cache.clear()
+
+    def test_tree_is_built_with_one_query(self):
+        with self.assertNumQueries(1):
+            tree = get_menu_tree('main')
+
+        self.assertEqual([node.title for node in tree], ['Blog', 'Shop'])
+        shop = tree[1]
+        self.assertEqual(shop.resolved_url, '/shop/')
+        self.assertEqual([child.title for child in shop.get_children()], ['Men'])
+        self.assertEqual([sub.title for sub in shop.children[0].children], ['Shirts'])
+        self.assertFalse(tree[0].has_children)
+        self.assertEqual([node.title for node in get_menu_tree('footer')], ['Footer'])
+
+    def test_rendering_nested_menu_runs_no_queries(self):
+        tree = get_menu_tree('main')
+        template = Template(
+            '{% for item in items %}{{ item.title }}{% if item.has_children %}['
+            '{% for child in item.get_children %}{{ child.title }}'
+            '{% for sub in child.get_children %}<{{ sub.resolved_url }}>{% endfor %}{% endfor %}]'
+            '{% endif %};{% endfor %}'
+        )
+
+        with self.assertNumQueries(0):
+            output = template.render(Context({'items': get_menu_tree('main')}))
+
+        self.assertEqual(output, 'Blog;Shop[Men</shop/shirts/>];')
+        self.assertEqual(get_menu_tree('main'), tree)
+
+    def test_menu_item_save_invalidates_cached_tree(self):
+        get_menu_tree('main')
+
+        self.blog.title = 'News'
+        self.blog.save()
+
+        self.assertEqual([node.title for node in get_menu_tree('main')], ['News', 'Shop'])
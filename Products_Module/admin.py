@@ -72,7 +72,7 @@ class ProductAdmin(admin.ModelAdmin):
     prepopulated_fields = {'slug': ('name',)}
     list_editable = ['price', 'is_available', 'is_active', 'stock']
     inlines = [ProductImageInline, ProductColorInline, ProductSizeInline]
-    readonly_fields = ['views_count', 'created_at', 'updated_at']
+    readonly_fields = ['views_count', 'rating_avg', 'rating_count', 'created_at', 'updated_at']
 
     fieldsets = (
         ('اطلاعات اصلی', {
@@ -85,7 +85,7 @@ class ProductAdmin(admin.ModelAdmin):
             'fields': ('price', 'old_price', 'stock', 'is_available')
         }),
         ('تنظیمات', {
-            'fields': ('is_active', 'views_count', 'created_at', 'updated_at')
+            'fields': ('is_active', 'views_count', 'rating_avg', 'rating_count', 'created_at', 'updated_at')
         }),
     )
 
@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class ProductConfig(AppConfig):
     name = 'Products_Module'
+
+    def ready(self):
+        from . import signals  # noqa: F401
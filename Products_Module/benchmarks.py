@@ -0,0 +1,217 @@
+"""
+بنچمارک مسیرهای پرترافیک فروشگاه
+
+هر سناریو یک درخواست واقعی با Django test client است (میدل‌ورها، قالب‌ها و
+کش مثل محیط اصلی). برای هر ویو تاخیر (p50/p95/p99)، تعداد کوئری و اوج حافظه
+(tracemalloc) یک درخواست جداگانه ثبت می‌شود؛ اندازه‌گیری حافظه و کوئری‌ها
+خارج از حلقه زمان‌سنجی است تا روی تاخیر اثر نگذارد.
+
+نتیجه با یک baseline (فایل JSON) مقایسه می‌شود: کندتر شدن p95 یا افزایش
+حافظه بیش از آستانه، یا بیشتر شدن تعداد کوئری، پسرفت حساب می‌شود.
+اجرای کامل (دیتابیس آزمایشی و داده حجیم): دستور run_benchmarks
+"""
+import json
+import platform
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from typing import Callable, NamedTuple, Optional
+
+import django
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from Accounts_Module.models import UserProfile
+from Ario_Shop.profiling import percentile
+from Cart_Module.models import CartItem
+from .models import Brand, Category, Product
+
+BENCHMARK_USERNAME = 'benchmark-user'
+CART_PRODUCTS = 3
+# تفاوت‌های کوچک‌تر از این مقادیر نویز اندازه‌گیری حساب می‌شوند
+MIN_LATENCY_DELTA_MS = 2.0
+MIN_MEMORY_DELTA_KB = 256
+
+
+class Scenario(NamedTuple):
+    """یک درخواست بنچمارک؛ paths به صورت چرخشی در تکرارها استفاده می‌شوند"""
+
+    name: str
+    paths: tuple
+    method: str = 'get'
+    data: Optional[dict] = None
+    before: Optional[Callable] = None
+    expected_status: tuple = (200,)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# سناریوها
+# ─────────────────────────────────────────────────────────────────────────────
+
+def prepare_user():
+    """کاربر بنچمارک با پروفایل کامل (لازم برای checkout)"""
+    user, _ = get_user_model().objects.get_or_create(
+        username=BENCHMARK_USERNAME, defaults={'email': 'benchmark@example.com'},
+    )
+    UserProfile.objects.update_or_create(user=user, defaults={
+        'full_name': 'کاربر بنچمارک', 'phone': '09120000000', 'address': 'تهران', 'city': 'تهران',
+    })
+    return user
+
+
+def build_scenarios(user):
+    """سناریوهای استاندارد روی داده فعلی دیتابیس"""
+    products = Product.objects.filter(is_active=True, is_available=True, stock__gt=0)
+    detail_slugs = list(products.order_by('-views_count', 'id').values_list('slug', flat=True)[:20])
+    cart_products = list(products.order_by('-stock', 'id').values_list('id', flat=True)[:CART_PRODUCTS])
+    add_products = list(products.exclude(pk__in=cart_products).order_by('id').values_list('id', flat=True)[:50])
+    category = Category.objects.filter(is_active=True, parent=None).order_by('id').first()
+    brand = Brand.objects.filter(is_active=True).order_by('id').first()
+    query_word = products.order_by('id').values_list('name', flat=True).first().split()[0]
+
+    list_url = reverse('products:list')
+    filters = [list_url, f'{list_url}?sort=price_low', f'{list_url}?available=1&sort=rating']
+    if brand:
+        filters.append(f'{list_url}?brand={brand.slug}&min_price=100000&max_price=3000000')
+    if category:
+        filters.append(reverse('products:category', args=[category.slug]) + '?size=m&sort=date')
+
+    def fill_cart():
+        CartItem.objects.filter(user=user).delete()
+        CartItem.objects.bulk_create(CartItem(user=user, product_id=pk, quantity=1) for pk in cart_products)
+
+    return [
+        Scenario('index', (reverse('index'),)),
+        Scenario('product_list', tuple(filters)),
+        Scenario('product_detail', tuple(reverse('products:detail', args=[slug]) for slug in detail_slugs)),
+        Scenario('search_products', (f"{reverse('products:search')}?q={query_word}",)),
+        Scenario('cart_detail', (reverse('cart:detail'),), before=fill_cart),
+        # سبد قبل از هر تکرار به همان CART_PRODUCTS قلم برمی‌گردد (ثبت سفارش آن را خالی می‌کند)
+        Scenario('checkout_view', (reverse('cart:checkout'),), before=fill_cart, expected_status=(302,)),
+        Scenario(
+            'cart_add', tuple(reverse('cart:add', args=[pk]) for pk in add_products),
+            method='post', data={'quantity': 1}, before=fill_cart, expected_status=(302,),
+        ),
+    ]
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# اجرا
+# ─────────────────────────────────────────────────────────────────────────────
+
+@contextmanager
+def _profiled(stats):
+    """تعداد کوئری و اوج حافظه درخواست داخل بلوک"""
+    tracemalloc.start()
+    try:
+        with CaptureQueriesContext(connection) as queries:
+            yield
+        stats['queries'] = len(queries)
+        stats['peak'] = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def _request(client, scenario, index, wrap=nullcontext):
+    """یک درخواست سناریو؛ برمی‌گرداند: زمان پاسخ به میلی‌ثانیه (بدون هوک before)"""
+    path = scenario.paths[index % len(scenario.paths)]
+    if scenario.before:
+        scenario.before()
+    with wrap():
+        started = time.perf_counter()
+        response = getattr(client, scenario.method)(path, scenario.data or {})
+        elapsed = (time.perf_counter() - started) * 1000
+    if response.status_code not in scenario.expected_status:
+        raise RuntimeError(f'{scenario.name}: {path} returned {response.status_code}')
+    return elapsed
+
+
+def run_scenario(client, scenario, iterations=20, warmup=2):
+    """نتیجه یک سناریو: تاخیرها به میلی‌ثانیه، تعداد کوئری و اوج حافظه به KB"""
+    for index in range(warmup):
+        _request(client, scenario, index)
+    timings = [_request(client, scenario, index) for index in range(warmup, warmup + iterations)]
+
+    stats = {}
+    _request(client, scenario, warmup + iterations, wrap=lambda: _profiled(stats))
+
+    return {
+        'p50_ms': round(percentile(timings, 50), 2),
+        'p95_ms': round(percentile(timings, 95), 2),
+        'p99_ms': round(percentile(timings, 99), 2),
+        'mean_ms': round(sum(timings) / len(timings), 2),
+        'queries': stats['queries'],
+        'peak_kb': round(stats['peak'] / 1024, 1),
+    }
+
+
+def run_suite(iterations=20, warmup=2, only=None, dataset=None):
+    """
+    اجرای همه سناریوها روی دیتابیس فعلی.
+    only: نام سناریوهای انتخابی؛ dataset: توضیح داده برای ثبت در نتیجه
+    برمی‌گرداند: dict قابل ذخیره به صورت JSON
+    """
+    user = prepare_user()
+    client = Client()
+    client.force_login(user)
+    views = {}
+    for scenario in build_scenarios(user):
+        if only and scenario.name not in only:
+            continue
+        views[scenario.name] = run_scenario(client, scenario, iterations, warmup)
+    return {
+        'meta': {
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'iterations': iterations,
+            'warmup': warmup,
+            'dataset': dataset or {},
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+        },
+        'views': views,
+    }
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# baseline
+# ─────────────────────────────────────────────────────────────────────────────
+
+def load_baseline(path):
+    try:
+        with open(path, encoding='utf-8') as baseline_file:
+            return json.load(baseline_file)
+    except FileNotFoundError:
+        return None
+
+
+def save_results(results, path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as results_file:
+        json.dump(results, results_file, ensure_ascii=False, indent=2, sort_keys=True)
+        results_file.write('\n')
+
+
+def compare(results, baseline, threshold=0.25):
+    """
+    پسرفت‌های نتیجه نسبت به baseline (ویوهای جدید یا حذف شده نادیده گرفته می‌شوند).
+    threshold: افزایش نسبی مجاز p95 و حافظه؛ تعداد کوئری نباید بیشتر شود.
+    برمی‌گرداند: لیست پیام‌های پسرفت
+    """
+    regressions = []
+    for name, current in results['views'].items():
+        previous = baseline.get('views', {}).get(name)
+        if previous is None:
+            continue
+        if (current['p95_ms'] > previous['p95_ms'] * (1 + threshold)
+                and current['p95_ms'] - previous['p95_ms'] > MIN_LATENCY_DELTA_MS):
+            regressions.append(f"{name}: p95 {previous['p95_ms']}ms → {current['p95_ms']}ms")
+        if current['queries'] > previous['queries']:
+            regressions.append(f"{name}: queries {previous['queries']} → {current['queries']}")
+        if (current['peak_kb'] > previous['peak_kb'] * (1 + threshold)
+                and current['peak_kb'] - previous['peak_kb'] > MIN_MEMORY_DELTA_KB):
+            regressions.append(f"{name}: peak memory {previous['peak_kb']}KB → {current['peak_kb']}KB")
+    return regressions
@@ -0,0 +1,117 @@
+"""
+پر کردن کلیدهای کش کاتالوگ بدون هجوم همزمان به دیتابیس (cache stampede)
+
+هر مقدار به صورت (value, delta, expires) ذخیره می‌شود: delta مدت ساخت مقدار و
+expires انقضای نرم است؛ خود کلید CACHE_STALE_TTL ثانیه بیشتر در کش می‌ماند.
+
+    XFetch: هر خواننده با احتمالی که با نزدیک شدن به expires (و برای مقادیر
+        پرهزینه‌تر زودتر) بالا می‌رود بازسازی را زودتر شروع می‌کند؛ انقضای
+        همزمان همه خواننده‌ها به یک لحظه نمی‌افتد.
+    single-flight: فقط خواننده‌ای که قفل کلید را با cache.add بگیرد می‌سازد؛ قفل
+        روی لایه مشترک است و بین workerها هم کار می‌کند.
+    stale-while-revalidate: تا وقتی برنده قفل در حال ساخت است بقیه مقدار کهنه را
+        می‌گیرند. اگر کلید اصلاً نباشد (شروع سرد یا ابطال با سیگنال) منتظر برنده
+        می‌مانند و پس از CACHE_FILL_WAIT ثانیه خودشان می‌سازند.
+
+ابطال با سیگنال (cache_keys.invalidate_model) همچنان کلید را حذف می‌کند تا داده
+کهنه بعد از تغییر مدل نمایش داده نشود.
+
+تنظیمات (settings.py):
+    CACHE_STALE_TTL: مدتی که مقدار منقضی شده هنوز قابل برگرداندن است (ثانیه)
+    CACHE_FILL_LOCK_TIMEOUT: حداکثر عمر قفل ساخت (اگر برنده از کار بیفتد)
+    CACHE_FILL_WAIT: حداکثر انتظار برای برنده وقتی مقدار کهنه‌ای نیست
+    CACHE_XFETCH_BETA: ضریب XFetch (بزرگ‌تر: بازسازی زودتر)
+"""
+import math
+import random
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from . import cache_keys
+
+DEFAULT_STALE_TTL = 60 * 10
+DEFAULT_LOCK_TIMEOUT = 30
+DEFAULT_FILL_WAIT = 2.0
+DEFAULT_XFETCH_BETA = 1.0
+POLL_INTERVAL = 0.05
+
+
+def stale_ttl():
+    return getattr(settings, 'CACHE_STALE_TTL', DEFAULT_STALE_TTL)
+
+
+def lock_key(key):
+    return f'lock_{key}'
+
+
+def _is_fresh(entry, now):
+    """XFetch: now - delta * beta * ln(rand) < expires"""
+    _, delta, expires = entry
+    beta = getattr(settings, 'CACHE_XFETCH_BETA', DEFAULT_XFETCH_BETA)
+    return now - delta * beta * math.log(1.0 - random.random()) < expires
+
+
+def _build(key, build, timeout):
+    """ساخت و ذخیره مقدار همراه با مدت ساخت و انقضای نرم"""
+    started = time.perf_counter()
+    value = build()
+    delta = time.perf_counter() - started
+    cache.set(key, (value, delta, time.time() + timeout), timeout + stale_ttl())
+    return value
+
+
+def _wait_for(key):
+    """انتظار برای مقداری که برنده قفل در حال ساخت آن است"""
+    deadline = time.monotonic() + getattr(settings, 'CACHE_FILL_WAIT', DEFAULT_FILL_WAIT)
+    while time.monotonic() < deadline:
+        time.sleep(POLL_INTERVAL)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry
+    return None
+
+
+def _refresh(key, build, timeout, stale):
+    lock = lock_key(key)
+    if cache.add(lock, 1, getattr(settings, 'CACHE_FILL_LOCK_TIMEOUT', DEFAULT_LOCK_TIMEOUT)):
+        try:
+            return _build(key, build, timeout)
+        finally:
+            cache.delete(lock)
+    if stale is not None:
+        return stale[0]
+    entry = _wait_for(key)
+    if entry is not None:
+        return entry[0]
+    # برنده در مهلت انتظار نساخت؛ ساخت بدون قفل بهتر از پاسخ ندادن است
+    return _build(key, build, timeout)
+
+
+def get_or_build_many(builders, timeout=None):
+    """
+    builders: {کلید: تابع ساخت بدون آرگومان}
+    timeout: مدت اعتبار (پیش‌فرض: cache_keys.timeout_for هر کلید)
+    همه کلیدها با یک get_many خوانده می‌شوند؛ برمی‌گرداند: {کلید: مقدار}
+    """
+    entries = cache.get_many(builders)
+    now = time.time()
+    values = {}
+    for key, build in builders.items():
+        entry = entries.get(key)
+        if entry is not None and _is_fresh(entry, now):
+            values[key] = entry[0]
+        else:
+            values[key] = _refresh(key, build, timeout or cache_keys.timeout_for(key), entry)
+    return values
+
+
+def refresh(key, build, timeout=None):
+    """ساخت دوباره مقدار حتی اگر تازه باشد (دستور warm_caches --force)"""
+    return _refresh(key, build, timeout or cache_keys.timeout_for(key), cache.get(key))
+
+
+def get_or_build(key, build, timeout=None):
+    """مقدار کش شده یک کلید؛ در صورت نبود یا انقضا با build ساخته می‌شود"""
+    return get_or_build_many({key: build}, timeout)[key]
@@ -0,0 +1,153 @@
+"""
+رجیستری مرکزی کلیدهای کش کاتالوگ
+
+همه کلیدهای کش مشترک (صفحه اصلی، سایدبار فروشگاه، ناوبار و منو) اینجا
+تعریف می‌شوند و مشخص است تغییر کدام مدل کدام کلید را باطل می‌کند.
+سیگنال‌های post_save/post_delete (در signals.py هر ماژول) فقط همان
+کلیدهای وابسته را پاک می‌کنند؛ به همین دلیل TTL ها می‌توانند چند ساعته باشند.
+"""
+import secrets
+
+from django.core.cache import cache
+
+# مدت کش کلیدهای کاتالوگ - ابطال با سیگنال انجام می‌شود، TTL فقط پشتیبان است
+CATALOG_CACHE_TIMEOUT = 60 * 60 * 6  # 6 hours
+# ترتیب محصولات پربازدید با views_count است که view_counter با UPDATE (بدون سیگنال)
+# می‌نویسد؛ این کلید با تغییر بازدیدها باطل نمی‌شود و TTL کوتاه خودش را دارد
+TRENDING_CACHE_TIMEOUT = 60 * 10  # 10 minutes
+
+# ── کلیدهای صفحه اصلی ──────────────────────────────────────────────────────
+HOME_NEW_PRODUCTS = 'home_new_products'
+HOME_TRENDING_PRODUCTS = 'home_trending_products'
+HOME_MAIN_CATEGORIES = 'home_main_categories'
+
+# ── کلیدهای سایدبار فروشگاه ────────────────────────────────────────────────
+CATEGORIES_WITH_COUNT = 'all_active_categories_with_count'
+BRANDS_WITH_COUNT = 'all_active_brands_with_count'
+PRICE_RANGE = 'active_products_price_range'
+
+# ── درخت دسته‌بندی (category_tree.py) ───────────────────────────────────────
+CATEGORY_TREE_VERSION = 'category_tree_version'
+CATEGORY_PRODUCT_COUNTS = 'category_product_counts'
+
+# ── کلیدهای هدر و منو ──────────────────────────────────────────────────────
+NAVBAR_CATEGORIES = 'navbar_categories'
+MAIN_MENU_ITEMS = 'main_menu_items'
+FOOTER_MENU_ITEMS = 'footer_menu_items'
+
+# ── نسخه نتایج کش شده لیست محصولات (listing.py) ───────────────────────────
+# کلید هر صفحه لیست شامل این نسخه است؛ تغییر مدل‌های زیر نسخه را بالا می‌برد
+LISTING_VERSION = 'product_listing_version'
+LISTING_DEPENDENCIES = (
+    'Product', 'Category', 'Brand', 'ProductImage', 'ProductReview', 'ProductSize', 'ProductColor',
+)
+
+# ── نسخه قطعه‌های کش شده قالب (fragments.py) ──────────────────────────────
+# کلید HTML کش شده هر قطعه شامل نسخه آن است؛ تغییر مدل‌های زیر نسخه را بالا می‌برد.
+# کارت محصول علاوه بر نسخه با updated_at محصول کلید می‌خورد (تغییر محصول، تصویر،
+# رنگ یا امتیاز updated_at را جلو می‌برد) و فقط نام دسته را از بیرون نشان می‌دهد.
+FRAGMENT_DEPENDENCIES = {
+    'product_card': ('Category',),
+    'navbar': ('Category', 'MenuItem'),
+}
+
+# نام مدل‌هایی که تغییرشان هر کلید را باطل می‌کند
+KEY_DEPENDENCIES = {
+    # کارت‌های صفحه اصلی امتیاز (rating_avg) و رنگ‌ها را هم نشان می‌دهند
+    HOME_NEW_PRODUCTS: ('Product', 'Category', 'Brand', 'ProductImage', 'ProductReview', 'ProductColor'),
+    HOME_TRENDING_PRODUCTS: ('Product', 'Category', 'Brand', 'ProductImage', 'ProductReview', 'ProductColor'),
+    HOME_MAIN_CATEGORIES: ('Category', 'Product'),
+    CATEGORIES_WITH_COUNT: ('Category', 'Product'),
+    BRANDS_WITH_COUNT: ('Brand', 'Product'),
+    PRICE_RANGE: ('Product',),
+    CATEGORY_PRODUCT_COUNTS: ('Category', 'Product'),
+    NAVBAR_CATEGORIES: ('Category',),
+    MAIN_MENU_ITEMS: ('MenuItem',),
+    FOOTER_MENU_ITEMS: ('MenuItem',),
+}
+
+
+# تابع ساخت هر کلید کاتالوگ (مسیر نقطه‌دار) - دستور warm_caches همه را از پیش می‌سازد
+KEY_BUILDERS = {
+    HOME_NEW_PRODUCTS: 'Home_Module.views.load_new_products',
+    HOME_TRENDING_PRODUCTS: 'Home_Module.views.load_trending_products',
+    HOME_MAIN_CATEGORIES: 'Home_Module.views.load_main_categories',
+    CATEGORIES_WITH_COUNT: 'Products_Module.listing.load_sidebar_categories',
+    BRANDS_WITH_COUNT: 'Products_Module.listing.load_sidebar_brands',
+    PRICE_RANGE: 'Products_Module.listing.load_price_range',
+    CATEGORY_PRODUCT_COUNTS: 'Products_Module.category_tree.load_product_counts',
+    NAVBAR_CATEGORIES: 'Products_Module.category_tree.load_navbar_categories',
+    MAIN_MENU_ITEMS: 'Menu_Module.menu_tree.load_main_menu',
+    FOOTER_MENU_ITEMS: 'Menu_Module.menu_tree.load_footer_menu',
+}
+
+
+# کلیدهایی که مدت کش متفاوتی از CATALOG_CACHE_TIMEOUT دارند
+KEY_TIMEOUTS = {
+    HOME_TRENDING_PRODUCTS: TRENDING_CACHE_TIMEOUT,
+}
+
+
+def timeout_for(key):
+    """مدت کش یک کلید کاتالوگ"""
+    return KEY_TIMEOUTS.get(key, CATALOG_CACHE_TIMEOUT)
+
+
+def product_reviews_key(product_id):
+    """کلید کش نظرات تایید شده یک محصول"""
+    return f'product_{product_id}_approved_reviews'
+
+
+def menu_tree_key(menu_type):
+    """کلید کش درخت یک نوع منو"""
+    return FOOTER_MENU_ITEMS if menu_type == 'footer' else MAIN_MENU_ITEMS
+
+
+def fragment_version_key(name):
+    """کلید شمارنده نسخه یک قطعه قالب"""
+    return f'fragment_version_{name}'
+
+
+def keys_for_model(model_name):
+    """کلیدهایی که با تغییر مدل داده شده باید پاک شوند"""
+    return [key for key, models in KEY_DEPENDENCIES.items() if model_name in models]
+
+
+def listing_version():
+    return cache.get(LISTING_VERSION, 0)
+
+
+def version_seed():
+    """
+    مقدار اولیه شمارنده نسخه‌ای که از کش حذف شده: عدد تصادفی 48 بیتی.
+    شروع دوباره از 1 نسخه‌های تکراری می‌ساخت و مقادیری که هنوز با v1 و v2 کش
+    شده بودند دوباره معتبر می‌شدند. نسخه‌ها فقط برابری مقایسه می‌شوند.
+    """
+    return secrets.randbits(48)
+
+
+def bump_version(key):
+    """افزایش شمارنده نسخه در کش (بدون انقضا)؛ برمی‌گرداند: نسخه جدید"""
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # add تا دو پروسه همزمان شمارنده را بازنویسی نکنند
+        cache.add(key, version_seed(), None)
+        return cache.incr(key)
+
+
+def bump_listing_version():
+    """باطل کردن همه صفحه‌های کش شده لیست محصولات"""
+    bump_version(LISTING_VERSION)
+
+
+def invalidate_model(model_name):
+    """پاک کردن همه کلیدهای وابسته به یک مدل با یک delete_many"""
+    keys = keys_for_model(model_name)
+    if keys:
+        cache.delete_many(keys)
+    if model_name in LISTING_DEPENDENCIES:
+        bump_listing_version()
+    for name, models in FRAGMENT_DEPENDENCIES.items():
+        if model_name in models:
+            bump_version(fragment_version_key(name))
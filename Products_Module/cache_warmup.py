@@ -0,0 +1,140 @@
+"""
+گرم کردن کش‌ها پس از دیپلوی یا ری‌استارت
+
+کارها (هر کدام مستقل؛ با یک thread pool اجرا می‌شوند):
+    - همه کلیدهای کاتالوگ ثبت شده در cache_keys.KEY_BUILDERS (از طریق cache_fill)
+    - ایندکس‌های حافظه همین پروسه: درخت دسته‌ها، ایندکس facet و ایندکس جستجو
+    - صفحه اول لیست محصولات (نتیجه، تعداد کل و سایدبار با تعداد هر فیلتر)
+    - N محصول پربازدید: نظرات تایید شده (تنها بخش کش شده صفحه جزئیات) و HTML
+      کارت‌های آن‌ها در هر دو قالب کارت
+
+گرم کردن هنگام شروع پروسه (warm_on_startup در wsgi.py/asgi.py) اختیاری است؛
+ایندکس‌های حافظه فقط در همان پروسه ساخته می‌شوند، پس دستور warm_caches برای
+کش‌های مشترک است و هوک شروع برای هر worker.
+
+تنظیمات (settings.py):
+    CACHE_WARM_ON_STARTUP: گرم کردن کش‌ها هنگام بارگذاری برنامه WSGI/ASGI
+    CACHE_WARM_TOP_PRODUCTS: تعداد محصولات پربازدید
+    CACHE_WARM_WORKERS: تعداد threadها
+"""
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, NamedTuple, Optional
+
+from django.conf import settings
+from django.db import connection, connections
+from django.utils.module_loading import import_string
+
+from . import cache_fill, cache_keys, category_tree, facets, fragments, search_index
+from .listing import ProductListingQuery
+from .models import Product
+from .services import approved_reviews
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TOP_PRODUCTS = 50
+DEFAULT_WORKERS = 4
+
+
+class Task(NamedTuple):
+    name: str
+    run: Callable
+
+
+class TaskResult(NamedTuple):
+    name: str
+    seconds: float
+    error: Optional[str] = None
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# کارها
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _catalog_task(key, force):
+    build = import_string(cache_keys.KEY_BUILDERS[key])
+    if force:
+        return lambda: cache_fill.refresh(key, build)
+    return lambda: cache_fill.get_or_build(key, build)
+
+
+def _warm_products(product_ids):
+    """نظرات و کارت‌های محصولات پربازدید"""
+    for product_id in product_ids:
+        approved_reviews(product_id)
+    products = list(fragments.card_products(Product.objects.filter(pk__in=product_ids)))
+    for variant in fragments.CARD_TEMPLATES:
+        fragments.render_product_cards(products, variant)
+
+
+def build_tasks(top_products=None, force=False):
+    """لیست کارهای گرم کردن به ترتیب اهمیت"""
+    if top_products is None:
+        top_products = getattr(settings, 'CACHE_WARM_TOP_PRODUCTS', DEFAULT_TOP_PRODUCTS)
+    tasks = [Task(key, _catalog_task(key, force)) for key in cache_keys.KEY_BUILDERS]
+    tasks += [
+        Task('category_tree', category_tree.get_tree),
+        Task('facet_index', facets.warm),
+        Task('search_index', search_index.warm),
+        Task('product_list', lambda: ProductListingQuery().execute()),
+    ]
+    if top_products:
+        product_ids = list(
+            Product.objects.filter(is_active=True).order_by('-views_count', 'id').values_list('id', flat=True)[:top_products]
+        )
+        if product_ids:
+            tasks.append(Task(f'top_products ({len(product_ids)})', lambda: _warm_products(product_ids)))
+    return tasks
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# اجرا
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _run(task, in_thread):
+    started = time.perf_counter()
+    error = None
+    try:
+        task.run()
+    except Exception as exc:
+        logger.exception('Cache warm-up task %s failed', task.name)
+        error = f'{type(exc).__name__}: {exc}'
+    finally:
+        if in_thread:
+            # اتصال دیتابیس هر thread با خودش بسته می‌شود
+            connection.close()
+    return TaskResult(task.name, round(time.perf_counter() - started, 3), error)
+
+
+def warm(top_products=None, workers=None, force=False):
+    """
+    اجرای همه کارها؛ خطای یک کار بقیه را متوقف نمی‌کند.
+    workers: تعداد threadها (۱: اجرا در thread فعلی)
+    برمی‌گرداند: [TaskResult] به ترتیب کارها
+    """
+    if workers is None:
+        workers = getattr(settings, 'CACHE_WARM_WORKERS', DEFAULT_WORKERS)
+    tasks = build_tasks(top_products, force)
+    if workers <= 1:
+        return [_run(task, in_thread=False) for task in tasks]
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='cache-warm') as pool:
+        return list(pool.map(lambda task: _run(task, in_thread=True), tasks))
+
+
+def warm_on_startup():
+    """هوک wsgi.py/asgi.py: گرم کردن کش‌ها پیش از اولین درخواست (در صورت فعال بودن)"""
+    if not getattr(settings, 'CACHE_WARM_ON_STARTUP', False):
+        return
+    try:
+        results = warm()
+    except Exception:
+        # مثلاً دیتابیس هنوز آماده نیست؛ worker بدون کش گرم هم کار می‌کند
+        logger.exception('Cache warm-up on startup failed')
+        return
+    finally:
+        # اتصال دیتابیس شروع پروسه به workerهای fork شده نمی‌رسد
+        connections.close_all()
+    failed = [result.name for result in results if result.error]
+    logger.info('Cache warm-up: %d tasks, %.2fs, failed: %s',
+                len(results), sum(result.seconds for result in results), ', '.join(failed) or '-')
@@ -0,0 +1,157 @@
+"""
+درخت دسته‌بندی‌ها در حافظه
+
+درخت با یک کوئری روی همه دسته‌ها (مرتب بر اساس path) ساخته می‌شود و مجموعه
+شناسه زیردسته‌های هر دسته از پیش محاسبه می‌شود؛ پرسیدن «همه زیردسته‌ها» O(1) است.
+هر پروسه نسخه خودش را دارد و با تغییر نسخه در کش (سیگنال ذخیره/حذف دسته)
+در اولین استفاده بازسازی می‌شود.
+
+تعداد محصولات هر دسته (شامل زیردسته‌ها) با یک کوئری GROUP BY و جمع روی درخت
+محاسبه و در کش نگهداری می‌شود.
+"""
+import threading
+from collections import defaultdict
+
+from django.core.cache import cache
+from django.db.models import Count
+
+from . import cache_fill, cache_keys
+from .models import CATEGORY_PATH_STEP, Category, Product
+
+
+class CategoryTree:
+    """
+    ساختار درخت از ردیف‌های (id, parent_id, is_active):
+        descendants: {id: frozenset(خود دسته و همه زیردسته‌ها)}
+        active_descendants: مثل descendants، بدون شاخه‌های غیرفعال
+    """
+
+    def __init__(self, rows):
+        self.parent = {}
+        self.children = defaultdict(list)
+        self.is_active = {}
+        for category_id, parent_id, is_active in rows:
+            self.parent[category_id] = parent_id
+            self.is_active[category_id] = is_active
+            if parent_id is not None:
+                self.children[parent_id].append(category_id)
+
+        self.descendants = {}
+        self.active_descendants = {}
+        for category_id in self._post_order():
+            subtree = {category_id}
+            active_subtree = {category_id}
+            for child_id in self.children.get(category_id, ()):
+                subtree |= self.descendants[child_id]
+                if self.is_active[child_id]:
+                    active_subtree |= self.active_descendants[child_id]
+            self.descendants[category_id] = frozenset(subtree)
+            self.active_descendants[category_id] = frozenset(active_subtree)
+
+    def _post_order(self):
+        """ترتیبی که هر دسته بعد از همه فرزندانش می‌آید (بدون بازگشت)"""
+        order = []
+        stack = [category_id for category_id, parent_id in self.parent.items() if parent_id not in self.parent]
+        while stack:
+            category_id = stack.pop()
+            order.append(category_id)
+            stack.extend(self.children.get(category_id, ()))
+        return reversed(order)
+
+    def paths(self):
+        """{id: (path, depth)} محاسبه شده از روی parent"""
+        result = {}
+        stack = [(category_id, '', 0) for category_id, parent_id in self.parent.items() if parent_id not in self.parent]
+        while stack:
+            category_id, prefix, depth = stack.pop()
+            path = f'{prefix}{category_id:0{CATEGORY_PATH_STEP}d}/'
+            result[category_id] = (path, depth)
+            stack.extend((child_id, path, depth + 1) for child_id in self.children.get(category_id, ()))
+        return result
+
+    def descendant_ids(self, category_id, active_only=True):
+        """شناسه خود دسته و همه زیردسته‌ها"""
+        tree = self.active_descendants if active_only else self.descendants
+        return tree.get(category_id, frozenset((category_id,)))
+
+    def rollup(self, counts):
+        """جمع تعداد هر دسته با زیردسته‌هایش: {id: تعداد مستقیم} ← {id: تعداد کل}"""
+        return {
+            category_id: sum(counts.get(child_id, 0) for child_id in subtree)
+            for category_id, subtree in self.descendants.items()
+        }
+
+
+_tree = None
+_tree_version = None
+_tree_lock = threading.Lock()
+
+
+def get_tree():
+    """درخت دسته‌ها؛ در صورت تغییر نسخه در کش بازسازی می‌شود"""
+    global _tree, _tree_version
+    version = cache.get(cache_keys.CATEGORY_TREE_VERSION, 0)
+    if _tree is None or _tree_version != version:
+        with _tree_lock:
+            rows = Category.objects.order_by('path').values_list('id', 'parent_id', 'is_active')
+            _tree = CategoryTree(rows)
+            _tree_version = version
+    return _tree
+
+
+def descendant_ids(category_id, active_only=True):
+    return get_tree().descendant_ids(category_id, active_only)
+
+
+def build_category_nodes(categories):
+    """
+    اتصال دسته‌ها به والدشان در حافظه؛ برمی‌گرداند: دسته‌های ریشه.
+    زیردسته‌های هر دسته در ویژگی subcategories (با حفظ ترتیب ورودی) قرار می‌گیرند.
+    دسته‌ای که والدش در ورودی نیست (مثلاً والد غیرفعال) نمایش داده نمی‌شود.
+    """
+    categories = list(categories)
+    by_id = {category.id: category for category in categories}
+    for category in categories:
+        category.subcategories = []
+    roots = []
+    for category in categories:
+        if category.parent_id is None:
+            roots.append(category)
+        elif category.parent_id in by_id:
+            by_id[category.parent_id].subcategories.append(category)
+    return roots
+
+
+def load_navbar_categories():
+    """دسته‌های ریشه فعال ناوبار با کل زیردرخت فعال - یک کوئری"""
+    return build_category_nodes(Category.objects.filter(is_active=True).order_by('name'))
+
+
+def load_product_counts():
+    direct = dict(
+        Product.objects.filter(is_active=True, is_available=True)
+        .values('category_id').annotate(count=Count('id')).order_by()
+        .values_list('category_id', 'count')
+    )
+    return get_tree().rollup(direct)
+
+
+def product_counts():
+    """{شناسه دسته: تعداد محصولات فعال و موجود خود دسته و زیردسته‌ها} - کش شده"""
+    return cache_fill.get_or_build(cache_keys.CATEGORY_PRODUCT_COUNTS, load_product_counts)
+
+
+def rebuild_paths(batch_size=500):
+    """
+    بازسازی path و depth همه دسته‌ها از روی parent (مثلاً پس از loaddata که save را صدا نمی‌زند).
+    برمی‌گرداند: تعداد دسته‌های اصلاح شده
+    """
+    current = {pk: (path, depth) for pk, path, depth in Category.objects.values_list('id', 'path', 'depth')}
+    stale = [
+        Category(pk=pk, path=path, depth=depth)
+        for pk, (path, depth) in get_tree().paths().items()
+        if current.get(pk) != (path, depth)
+    ]
+    Category.objects.bulk_update(stale, ['path', 'depth'], batch_size=batch_size)
+    cache_keys.bump_version(cache_keys.CATEGORY_TREE_VERSION)
+    return len(stale)
@@ -0,0 +1,265 @@
+"""
+ایندکس فیلترهای چندگانه (facet) صفحه لیست محصولات
+
+برای هر مقدار هر فیلتر (دسته، برند، سایز، کد رنگ، بازه قیمت، موجودی) مجموعه
+شناسه محصولات فعال در حافظه نگهداری می‌شود. فیلترهای صفحه لیست با اشتراک این
+مجموعه‌ها اعمال می‌شوند (داخل هر فیلتر OR، بین فیلترها AND) و تعداد محصولات
+هر مقدار با در نظر گرفتن بقیه فیلترهای فعال محاسبه می‌شود.
+
+ایندکس با سیگنال‌های ذخیره/حذف محصول، سایز، رنگ و برند به صورت تدریجی به‌روز
+می‌شود. هر پروسه نسخه خودش را دارد و با نسخه مشترک در کش همگام می‌ماند؛ تغییر
+پروسه دیگر با بازسازی در پس‌زمینه بارگذاری می‌شود (index_sync).
+
+تنظیمات (settings.py):
+    PRODUCT_FACET_PRICE_BUCKETS: مرزهای پایین بازه‌های قیمت
+    PRODUCT_FACET_MAX_IDS: حداکثر تعداد نتیجه برای واکشی با pk__in؛
+        نتایج بزرگ‌تر با فیلترهای دیتابیس واکشی می‌شوند
+"""
+import bisect
+from collections import defaultdict
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+
+from .index_sync import SyncedIndex
+from .models import Product, ProductColor, ProductSize
+
+VERSION_CACHE_KEY = 'product_facet_index_version'
+FACETS = ('category', 'brand', 'size', 'color', 'price', 'available')
+DEFAULT_PRICE_BUCKETS = (0, 500_000, 1_000_000, 2_000_000, 5_000_000, 10_000_000)
+DEFAULT_MAX_IDS = 2000
+
+
+def price_buckets():
+    return tuple(getattr(settings, 'PRODUCT_FACET_PRICE_BUCKETS', DEFAULT_PRICE_BUCKETS))
+
+
+def max_ids():
+    return getattr(settings, 'PRODUCT_FACET_MAX_IDS', DEFAULT_MAX_IDS)
+
+
+def parse_price(value):
+    """قیمت ارسال شده در GET؛ مقدار خالی یا نامعتبر None است"""
+    if not value:
+        return None
+    try:
+        return Decimal(value)
+    except (InvalidOperation, TypeError, ValueError):
+        return None
+
+
+class FacetResult:
+    """
+    نتیجه اعمال فیلترها:
+        ids: مجموعه شناسه محصولات منطبق با همه فیلترها
+        counts: {نام فیلتر: {مقدار: تعداد}} - تعداد هر مقدار با بقیه فیلترهای فعال
+    """
+
+    def __init__(self, ids, counts):
+        self.ids = ids
+        self.counts = counts
+
+    def __len__(self):
+        return len(self.ids)
+
+
+class FacetIndex(SyncedIndex):
+    """{فیلتر: {مقدار: set(شناسه محصول)}} به همراه قیمت هر محصول برای فیلتر بازه"""
+
+    version_key = VERSION_CACHE_KEY
+
+    def __init__(self):
+        super().__init__()
+        self._values = {facet: defaultdict(set) for facet in FACETS}
+        self._docs = {}
+        self._prices = {}
+        self._price_order = []
+
+    # ── ساخت و به‌روزرسانی ────────────────────────────────────────────────
+
+    @staticmethod
+    def _load(product_ids=None):
+        """
+        مقادیر فیلترهای محصولات فعال با سه کوئری.
+        برمی‌گرداند: {شناسه: {فیلتر: set(مقادیر)}} و {شناسه: قیمت}
+        """
+        products = Product.objects.filter(is_active=True)
+        sizes = ProductSize.objects.filter(product__is_active=True)
+        colors = ProductColor.objects.filter(product__is_active=True)
+        if product_ids is not None:
+            products = products.filter(pk__in=product_ids)
+            sizes = sizes.filter(product_id__in=product_ids)
+            colors = colors.filter(product_id__in=product_ids)
+
+        buckets = price_buckets()
+        docs = {}
+        prices = {}
+        rows = products.values_list('id', 'category_id', 'brand__slug', 'price', 'is_available', 'stock')
+        for pk, category_id, brand_slug, price, is_available, stock in rows.iterator(chunk_size=2000):
+            docs[pk] = {
+                'category': {category_id} if category_id else set(),
+                'brand': {brand_slug} if brand_slug else set(),
+                'size': set(),
+                'color': set(),
+                'price': {max(bisect.bisect_right(buckets, price) - 1, 0)},
+                'available': {True} if is_available and stock > 0 else set(),
+            }
+            prices[pk] = price
+        for facet, queryset, field in (('size', sizes, 'size'), ('color', colors, 'code')):
+            for product_id, value in queryset.values_list('product_id', field).iterator(chunk_size=2000):
+                if product_id in docs:
+                    docs[product_id][facet].add(value)
+        return docs, prices
+
+    def _add(self, product_id, doc, price):
+        for facet, values in doc.items():
+            for value in values:
+                self._values[facet][value].add(product_id)
+        self._docs[product_id] = doc
+        self._prices[product_id] = price
+        bisect.insort(self._price_order, (price, product_id))
+
+    def _discard(self, product_id):
+        doc = self._docs.pop(product_id, None)
+        if doc is None:
+            return
+        for facet, values in doc.items():
+            for value in values:
+                ids = self._values[facet].get(value)
+                if ids is not None:
+                    ids.discard(product_id)
+                    if not ids:
+                        del self._values[facet][value]
+        price = self._prices.pop(product_id)
+        position = bisect.bisect_left(self._price_order, (price, product_id))
+        if position < len(self._price_order) and self._price_order[position] == (price, product_id):
+            del self._price_order[position]
+
+    def _load_state(self):
+        docs, prices = self._load()
+        values_index = {facet: defaultdict(set) for facet in FACETS}
+        for product_id, doc in docs.items():
+            for facet, values in doc.items():
+                for value in values:
+                    values_index[facet][value].add(product_id)
+        return values_index, docs, prices
+
+    def _install(self, state):
+        self._values, self._docs, self._prices = state
+        self._price_order = sorted((price, pk) for pk, price in self._prices.items())
+
+    def rebuild(self):
+        """بازسازی کامل از دیتابیس؛ برمی‌گرداند: تعداد محصولات ایندکس شده"""
+        with self._lock:
+            self._rebuild()
+            self._bump_version()
+            return len(self._docs)
+
+    def reindex(self, product_ids):
+        """بازخوانی محصولات داده شده (محصول حذف یا غیرفعال شده از ایندکس خارج می‌شود)"""
+        product_ids = list(product_ids)
+        if not product_ids:
+            return
+        with self._lock:
+            self._ensure_fresh()
+            docs, prices = self._load(product_ids)
+            for product_id in product_ids:
+                self._discard(product_id)
+                if product_id in docs:
+                    self._add(product_id, docs[product_id], prices[product_id])
+            self._bump_version()
+
+    def remove(self, product_ids):
+        with self._lock:
+            self._ensure_fresh()
+            for product_id in product_ids:
+                self._discard(product_id)
+            self._bump_version()
+
+    # ── پرس‌وجو ────────────────────────────────────────────────────────────
+
+    def _union(self, facet, selected):
+        values = self._values[facet]
+        matched = set()
+        for value in selected:
+            matched |= values.get(value, set())
+        return matched
+
+    def _price_matches(self, min_price, max_price):
+        start = 0 if min_price is None else bisect.bisect_left(self._price_order, (min_price,))
+        if max_price is None:
+            end = len(self._price_order)
+        else:
+            # (max_price, بی‌نهایت) تا محصولات با قیمت دقیقاً max_price هم شامل شوند
+            end = bisect.bisect_right(self._price_order, (max_price, float('inf')))
+        return {product_id for _, product_id in self._price_order[start:end]}
+
+    @staticmethod
+    def _intersect(sets, universe):
+        if not sets:
+            return set(universe)
+        ordered = sorted(sets, key=len)
+        result = set(ordered[0])
+        for other in ordered[1:]:
+            result &= other
+        return result
+
+    def query(self, category=(), brand=(), size=(), color=(), min_price=None, max_price=None, available=False,
+              within=None):
+        """
+        اعمال فیلترها؛ برای هر فیلتر لیست مقادیر انتخاب شده (خالی = بدون فیلتر).
+        within: محدود کردن نتایج و تعدادها به این شناسه‌ها (مثلاً نتایج جستجو)
+        برمی‌گرداند: FacetResult
+        """
+        selections = {'category': category, 'brand': brand, 'size': size, 'color': color}
+        with self._lock:
+            self._ensure_fresh()
+            universe = self._docs.keys()
+            matches = {
+                facet: self._union(facet, selected)
+                for facet, selected in selections.items() if selected
+            }
+            if within is not None:
+                # در هیچ facet ای نیست، پس روی تعداد همه فیلترها اعمال می‌شود
+                matches['within'] = set(within)
+            if min_price is not None or max_price is not None:
+                matches['price'] = self._price_matches(min_price, max_price)
+            if available:
+                matches['available'] = self._values['available'].get(True, set())
+
+            ids = self._intersect(list(matches.values()), universe)
+
+            # تعداد هر مقدار: اشتراک با همه فیلترهای فعال به جز فیلتر خودش
+            counts = {}
+            for facet in FACETS:
+                others = [matched for name, matched in matches.items() if name != facet]
+                base = ids if facet not in matches else self._intersect(others, universe)
+                counts[facet] = {
+                    value: len(base & product_ids) if len(base) < len(universe) else len(product_ids)
+                    for value, product_ids in self._values[facet].items()
+                }
+        return FacetResult(ids, counts)
+
+
+facet_index = FacetIndex()
+
+
+def query(**filters):
+    return facet_index.query(**filters)
+
+
+def reindex_products(product_ids):
+    facet_index.reindex(product_ids)
+
+
+def remove_products(product_ids):
+    facet_index.remove(list(product_ids))
+
+
+def rebuild():
+    return facet_index.rebuild()
+
+
+def warm():
+    """ساخت ایندکس این پروسه پیش از اولین درخواست"""
+    facet_index.query()
@@ -0,0 +1,126 @@
+"""
+کش قطعه‌های HTML قالب (کارت محصول و ناوبار)
+
+کارت هر محصول یک بار رندر و زیر کلیدی از شناسه و updated_at محصول کش می‌شود؛
+ذخیره محصول (auto_now) و تغییر تصویر، رنگ یا امتیاز آن (touch_products)
+updated_at را جلو می‌برند و کارت قبلی دیگر خوانده نمی‌شود. کارت‌های یک صفحه با
+یک get_many خوانده و کارت‌های جدید با یک set_many نوشته می‌شوند.
+
+بقیه قطعه‌ها (مثل منوهای ناوبار) با نسخه‌ای کلید می‌خورند که تغییر مدل‌های وابسته
+(cache_keys.FRAGMENT_DEPENDENCIES) آن را بالا می‌برد.
+
+تعداد بازدید روی کارت با QuerySet.update جمع می‌شود و updated_at را تغییر
+نمی‌دهد؛ حداکثر به اندازه PRODUCT_CARD_CACHE_TIMEOUT عقب است.
+
+تنظیمات (settings.py):
+    PRODUCT_CARD_CACHE_TIMEOUT: مدت کش HTML هر کارت محصول به ثانیه
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import OuterRef, Prefetch, Subquery
+from django.template.loader import get_template
+from django.utils import timezone
+from django.utils.safestring import mark_safe
+
+from . import cache_keys
+from .models import CARD_IMAGE_COUNT, Product, ProductColor, ProductImage
+
+DEFAULT_CARD_CACHE_TIMEOUT = 60 * 15
+CARD_TEMPLATES = {
+    'home': 'products/cards/home.html',
+    'list': 'products/cards/list.html',
+}
+# ستون‌هایی که کارت محصول و صفحه‌بندی keyset (pagination.SORT_KEYS) لازم دارند
+CARD_FIELDS = (
+    'id', 'name', 'slug', 'price', 'old_price', 'stock', 'is_available', 'label',
+    'views_count', 'rating_avg', 'rating_count', 'created_at', 'updated_at',
+    'category', 'category__name', 'category__slug',
+)
+
+
+def card_cache_timeout():
+    return getattr(settings, 'PRODUCT_CARD_CACHE_TIMEOUT', DEFAULT_CARD_CACHE_TIMEOUT)
+
+
+def fragment_version(name):
+    return cache.get(cache_keys.fragment_version_key(name), 0)
+
+
+def invalidate_fragment(name):
+    """باطل کردن همه نسخه‌های کش شده یک قطعه در همه پروسه‌ها"""
+    cache_keys.bump_version(cache_keys.fragment_version_key(name))
+
+
+def fragment_key(name, vary_on=()):
+    """کلید کش یک قطعه با نسخه فعلی آن و مقادیر vary_on"""
+    digest = hashlib.md5(repr(tuple(str(value) for value in vary_on)).encode(), usedforsecurity=False).hexdigest()
+    return f'fragment_{name}_{fragment_version(name)}_{digest}'
+
+
+def render_fragment(name, vary_on, render):
+    """HTML قطعه از کش؛ در نبود آن render() صدا زده و نتیجه کش می‌شود"""
+    key = fragment_key(name, vary_on)
+    html = cache.get(key)
+    if html is None:
+        html = render()
+        cache.set(key, html, cache_keys.CATALOG_CACHE_TIMEOUT)
+    return mark_safe(html)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# کارت محصول
+# ─────────────────────────────────────────────────────────────────────────────
+
+def card_products(queryset):
+    """
+    نمای سبک محصولات برای کارت: فقط ستون‌های CARD_FIELDS، مسیر CARD_IMAGE_COUNT
+    تصویر اول به صورت زیرکوئری (card_image_N) به جای prefetch همه تصاویر،
+    و رنگ‌ها با یک prefetch سبک.
+    """
+    images = ProductImage.objects.filter(product=OuterRef('pk')).order_by('order', 'created_at', 'id').values('image')
+    return queryset.select_related('category').only(*CARD_FIELDS).annotate(**{
+        f'card_image_{n}': Subquery(images[n:n + 1]) for n in range(CARD_IMAGE_COUNT)
+    }).prefetch_related(
+        Prefetch('colors', queryset=ProductColor.objects.only('id', 'product_id', 'name', 'code')),
+    )
+
+
+def product_card_key(product, variant, version):
+    stamp = int(product.updated_at.timestamp() * 1_000_000) if product.updated_at else 0
+    return f'product_card_{variant}_{version}_{product.pk}_{stamp}'
+
+
+def render_product_cards(products, variant='list'):
+    """
+    HTML کارت‌های محصولات به ترتیب ورودی.
+    variant: نوع کارت (CARD_TEMPLATES)؛ فقط کارت‌های غایب در کش رندر می‌شوند.
+    """
+    template = get_template(CARD_TEMPLATES[variant])
+    products = list(products)
+    version = fragment_version('product_card')
+    keys = [product_card_key(product, variant, version) for product in products]
+    cached = cache.get_many(keys)
+
+    missing = {}
+    cards = []
+    for product, key in zip(products, keys):
+        html = cached.get(key)
+        if html is None:
+            html = template.render({'product': product})
+            missing[key] = html
+        cards.append(html)
+    if missing:
+        cache.set_many(missing, card_cache_timeout())
+    return mark_safe(''.join(cards))
+
+
+def touch_products(product_ids):
+    """
+    جلو بردن updated_at محصولات (با یک UPDATE و بدون سیگنال) تا کارت کش شده‌شان
+    کنار گذاشته شود؛ برای تغییر داده‌های وابسته مثل تصویر، رنگ و امتیاز.
+    """
+    product_ids = [pk for pk in product_ids if pk is not None]
+    if product_ids:
+        Product.objects.filter(pk__in=product_ids).update(updated_at=timezone.now())
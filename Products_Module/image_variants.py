@@ -0,0 +1,254 @@
+"""
+نسخه‌های واکنش‌گرای تصاویر آپلود شده (WebP / AVIF / JPEG در چند عرض)
+
+برای هر تصویر اصلی، نسخه‌های کوچک‌شده در عرض‌های IMAGE_VARIANT_WIDTHS و
+فرمت‌های IMAGE_VARIANT_FORMATS کنار همان فایل (در زیرپوشه variants) ساخته می‌شوند:
+
+    products/shoe.jpg  ←  products/variants/shoe-300w.webp، products/variants/shoe-300w.jpg، ...
+
+ساخت با سیگنال post_save مدل‌های تصویردار انجام می‌شود (فقط اگر نسخه‌ها هنوز
+وجود نداشته باشند، یا فایل تازه آپلود شده باشد) و برای فایل‌های قدیمی دستور
+generate_image_variants هست. با جایگزینی فایل (pre_save) یا حذف ردیف (post_delete)
+نسخه‌های فایل قبلی پاک می‌شوند، مگر ردیف دیگری هنوز به همان فایل اشاره کند.
+تگ‌های image_tags برای این نسخه‌ها srcset و <picture> تولید می‌کنند؛ تا وقتی
+نسخه‌ای ساخته نشده، همان فایل اصلی نمایش داده می‌شود.
+
+تنظیمات (settings.py):
+    IMAGE_VARIANT_WIDTHS: عرض نسخه‌ها به پیکسل (صعودی)
+    IMAGE_VARIANT_FORMATS: فرمت‌ها به ترتیب اولویت مرورگر؛ فرمت پشتیبانی نشده
+        توسط Pillow نصب شده (مثلاً avif پیش از Pillow 11.2) نادیده گرفته می‌شود
+    IMAGE_VARIANT_QUALITY: کیفیت فشرده‌سازی (1 تا 100)
+"""
+import logging
+import posixpath
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from PIL import Image, ImageOps, UnidentifiedImageError, features
+
+logger = logging.getLogger(__name__)
+
+VARIANTS_DIR = 'variants'
+DEFAULT_WIDTHS = (300, 600, 1200)
+DEFAULT_FORMATS = ('webp', 'jpeg')
+DEFAULT_QUALITY = 80
+SOURCE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp', '.gif', '.bmp', '.tif', '.tiff')
+
+# فرمت ← (نام Pillow، پسوند فایل، نوع MIME)
+FORMATS = {
+    'avif': ('AVIF', 'avif', 'image/avif'),
+    'webp': ('WEBP', 'webp', 'image/webp'),
+    'jpeg': ('JPEG', 'jpg', 'image/jpeg'),
+}
+
+
+def variant_widths():
+    return tuple(sorted(getattr(settings, 'IMAGE_VARIANT_WIDTHS', DEFAULT_WIDTHS)))
+
+
+def variant_formats():
+    """فرمت‌های تنظیم شده‌ای که Pillow نصب شده می‌تواند بنویسد"""
+    return tuple(
+        fmt for fmt in getattr(settings, 'IMAGE_VARIANT_FORMATS', DEFAULT_FORMATS)
+        if fmt in FORMATS and (fmt == 'jpeg' or features.check(fmt))
+    )
+
+
+def variant_quality():
+    return getattr(settings, 'IMAGE_VARIANT_QUALITY', DEFAULT_QUALITY)
+
+
+def mime_type(fmt):
+    return FORMATS[fmt][2]
+
+
+def is_variant(name):
+    return posixpath.basename(posixpath.dirname(name)) == VARIANTS_DIR
+
+
+def is_source(name):
+    return name.lower().endswith(SOURCE_EXTENSIONS) and not is_variant(name)
+
+
+def variant_name(name, width, fmt):
+    """مسیر نسخه یک تصویر در storage"""
+    directory, filename = posixpath.split(name)
+    stem = posixpath.splitext(filename)[0]
+    return posixpath.join(directory, VARIANTS_DIR, f'{stem}-{width}w.{FORMATS[fmt][1]}')
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# ساخت نسخه‌ها
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _encode(image, fmt, quality):
+    pil_format = FORMATS[fmt][0]
+    if pil_format == 'JPEG' and image.mode != 'RGB':
+        # JPEG کانال آلفا ندارد: شفافیت روی زمینه سفید
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel('A') if 'A' in image.getbands() else None)
+        image = background
+    buffer = BytesIO()
+    options = {'quality': quality}
+    if pil_format == 'JPEG':
+        options.update(optimize=True, progressive=True)
+    elif pil_format == 'WEBP':
+        options['method'] = 4
+    image.save(buffer, pil_format, **options)
+    return buffer.getvalue()
+
+
+def has_variants(name, storage=default_storage):
+    """آیا کوچک‌ترین نسخه با اولین فرمت ساخته شده؟ (همه نسخه‌ها با هم ساخته می‌شوند)"""
+    widths, formats = variant_widths(), variant_formats()
+    if not name or not widths or not formats:
+        return False
+    return storage.exists(variant_name(name, widths[0], formats[0]))
+
+
+def generate_variants(name, storage=default_storage, force=False):
+    """
+    ساخت همه نسخه‌های یک تصویر. عرض‌های بزرگ‌تر از تصویر اصلی بزرگ‌نمایی نمی‌شوند
+    (نسخه در اندازه اصلی ذخیره می‌شود) تا srcset همیشه کامل باشد.
+    برمی‌گرداند: تعداد فایل‌های ساخته شده (تصویر نامعتبر یا ناموجود: 0)
+    """
+    if not name or not is_source(name):
+        return 0
+    if not force and has_variants(name, storage):
+        return 0
+    try:
+        with storage.open(name, 'rb') as source:
+            original = Image.open(source)
+            original.load()
+    except (FileNotFoundError, UnidentifiedImageError, OSError) as exc:
+        logger.warning('Cannot read image %s for variants: %s', name, exc)
+        return 0
+
+    original = ImageOps.exif_transpose(original)
+    if original.mode not in ('RGB', 'RGBA'):
+        original = original.convert('RGBA' if 'transparency' in original.info or original.mode in ('LA', 'PA') else 'RGB')
+
+    quality = variant_quality()
+    created = 0
+    for width in variant_widths():
+        resized = original
+        if original.width > width:
+            height = round(original.height * width / original.width)
+            resized = original.resize((width, height), Image.Resampling.LANCZOS)
+        for fmt in variant_formats():
+            target = variant_name(name, width, fmt)
+            if storage.exists(target):
+                storage.delete(target)
+            storage.save(target, ContentFile(_encode(resized, fmt, quality)))
+            created += 1
+    return created
+
+
+def delete_variants(name, storage=default_storage):
+    """حذف همه نسخه‌های یک تصویر (همه فرمت‌های شناخته شده)؛ برمی‌گرداند: تعداد فایل‌های حذف شده"""
+    deleted = 0
+    for width in variant_widths():
+        for fmt in FORMATS:
+            target = variant_name(name, width, fmt)
+            if storage.exists(target):
+                storage.delete(target)
+                deleted += 1
+    return deleted
+
+
+def _delete_unreferenced(model, field_name, name, storage):
+    """حذف نسخه‌های فایلی که دیگر هیچ ردیفی از model به آن اشاره نمی‌کند"""
+    if name and not model._base_manager.filter(**{field_name: name}).exists():
+        delete_variants(name, storage)
+
+
+def note_replaced_files(instance, field_names, update_fields=None):
+    """
+    pre_save: نام فایل قبلی فیلدهایی که در این ذخیره فایل دیگری می‌گیرند و اینکه
+    فایل تازه آپلود شده یا نه (فایل آپلودی ممکن است روی همان نام نوشته شود).
+    نتیجه روی نمونه می‌ماند تا schedule_variants در post_save از آن استفاده کند.
+    """
+    if update_fields is not None:
+        field_names = [field_name for field_name in field_names if field_name in update_fields]
+    previous = {}
+    if field_names and not instance._state.adding and instance.pk is not None:
+        previous = type(instance)._base_manager.filter(pk=instance.pk).values(*field_names).first() or {}
+    instance._image_variant_changes = {
+        field_name: (previous.get(field_name) or '', not getattr(instance, field_name)._committed)
+        for field_name in field_names
+    }
+
+
+def schedule_variants(instance, *field_names):
+    """
+    post_save: پس از commit تراکنش ذخیره، نسخه‌های فایل جایگزین شده پاک و نسخه‌های
+    فیلدهای تصویر ساخته می‌شوند (فایل تازه آپلود شده همیشه از نو، بقیه فقط اگر نباشند)
+    """
+    model = type(instance)
+    changes = getattr(instance, '_image_variant_changes', {})
+    files = [
+        (field_name, getattr(instance, field_name), *changes.get(field_name, ('', False)))
+        for field_name in field_names
+    ]
+
+    def generate():
+        for field_name, field_file, previous_name, uploaded in files:
+            if previous_name != field_file.name:
+                _delete_unreferenced(model, field_name, previous_name, field_file.storage)
+            if field_file and field_file.name:
+                generate_variants(field_file.name, field_file.storage, force=uploaded)
+
+    transaction.on_commit(generate)
+
+
+def schedule_cleanup(instance, *field_names):
+    """post_delete: حذف نسخه‌های فایل‌های ردیف حذف شده پس از commit (اگر ردیف دیگری از آن‌ها استفاده نکند)"""
+    model = type(instance)
+    files = [(field_name, getattr(instance, field_name)) for field_name in field_names]
+
+    def cleanup():
+        for field_name, field_file in files:
+            _delete_unreferenced(model, field_name, field_file.name, field_file.storage)
+
+    transaction.on_commit(cleanup)
+
+
+def iter_sources(directory, storage=default_storage):
+    """مسیر همه تصاویر اصلی زیر یک پوشه storage (پوشه‌های variants رد می‌شوند)"""
+    pending = [directory]
+    while pending:
+        current = pending.pop()
+        try:
+            subdirs, files = storage.listdir(current)
+        except FileNotFoundError:
+            continue
+        pending.extend(posixpath.join(current, subdir) for subdir in subdirs if subdir != VARIANTS_DIR)
+        for filename in files:
+            name = posixpath.join(current, filename)
+            if is_source(name):
+                yield name
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# srcset
+# ─────────────────────────────────────────────────────────────────────────────
+
+def srcset(name, fmt, storage=default_storage):
+    """مقدار srcset یک فرمت: «url 300w, url 600w, ...»"""
+    return ', '.join(
+        f'{storage.url(variant_name(name, width, fmt))} {width}w'
+        for width in variant_widths()
+    )
+
+
+def sources(name, storage=default_storage):
+    """
+    منابع <picture> برای یک تصویر: [(نوع MIME، srcset)] به ترتیب اولویت.
+    تا وقتی نسخه‌ها ساخته نشده‌اند لیست خالی است و فقط فایل اصلی نمایش داده می‌شود.
+    """
+    if not has_variants(name, storage):
+        return []
+    return [(mime_type(fmt), srcset(name, fmt, storage)) for fmt in variant_formats()]
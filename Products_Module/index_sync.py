@@ -0,0 +1,109 @@
+"""
+همگام‌سازی ایندکس‌های درون حافظه (facets و backend پایتونی جستجو) بین پروسه‌ها
+
+هر ایندکس یک شمارنده نسخه در کش مشترک دارد و هر تغییر تدریجی آن را با cache.incr
+یک واحد بالا می‌برد. پروسه‌ای که نسخه خودش با کش فرق کند تغییر پروسه دیگری را
+ندیده و ایندکس را از دیتابیس بازسازی می‌کند:
+    - اولین ساخت در همان درخواست انجام می‌شود (ایندکس قبلی برای پاسخ وجود ندارد)
+    - بازسازی‌های بعدی در یک thread پس‌زمینه؛ تا پایان آن ایندکس قبلی پاسخ می‌دهد
+    - داخل تراکنش باز بازسازی در همان thread انجام می‌شود؛ thread دیگر تغییرات
+      commit نشده این اتصال را نمی‌بیند
+
+اگر نتیجه incr پس از یک تغییر تدریجی نسخه قبلی + ۱ نباشد، پروسه دیگری در همین
+فاصله تغییری داده که این پروسه بارگذاری نکرده است؛ نسخه محلی جلو نمی‌رود و
+بازسازی شروع می‌شود.
+"""
+import logging
+import threading
+from abc import ABC, abstractmethod
+
+from django.core.cache import cache
+from django.db import connection
+
+from .cache_keys import version_seed
+
+logger = logging.getLogger(__name__)
+
+
+class SyncedIndex(ABC):
+    """
+    پایه ایندکس درون حافظه با نسخه مشترک در کش.
+    زیرکلاس‌ها version_key، _load_state (خواندن کامل از دیتابیس، بدون قفل) و
+    _install (جایگزینی ساختارها، با قفل) را تعریف می‌کنند.
+    """
+
+    version_key = None
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._version = None
+        self._rebuild_thread = None
+
+    @abstractmethod
+    def _load_state(self):
+        """ساختارهای کامل ایندکس از دیتابیس"""
+
+    @abstractmethod
+    def _install(self, state):
+        """جایگزینی ساختارهای ایندکس با state"""
+
+    def _shared_version(self):
+        return cache.get(self.version_key, 0)
+
+    # ── بازسازی ────────────────────────────────────────────────────────────
+
+    def _replace(self, state, version):
+        with self._lock:
+            self._install(state)
+            self._version = version
+
+    def _rebuild(self):
+        # نسخه پیش از خواندن دیتابیس؛ تغییری که بعد از آن برسد بازسازی بعدی را شروع می‌کند
+        version = self._shared_version()
+        self._replace(self._load_state(), version)
+
+    def _rebuild_in_background(self):
+        try:
+            self._rebuild()
+        except Exception:
+            logger.exception('Rebuilding %s failed', type(self).__name__)
+        finally:
+            with self._lock:
+                self._rebuild_thread = None
+            # اتصال دیتابیس مخصوص همین thread است
+            connection.close()
+
+    def _schedule_rebuild(self):
+        """بازسازی کامل؛ در پس‌زمینه مگر داخل تراکنش باز (با قفل صدا زده می‌شود)"""
+        if connection.in_atomic_block:
+            self._rebuild()
+            return
+        if self._rebuild_thread is not None:
+            return
+        self._rebuild_thread = threading.Thread(
+            target=self._rebuild_in_background, name=f'{type(self).__name__}-rebuild', daemon=True,
+        )
+        self._rebuild_thread.start()
+
+    # ── نسخه ───────────────────────────────────────────────────────────────
+
+    def _ensure_fresh(self):
+        """پیش از هر خواندن یا تغییر تدریجی (با قفل صدا زده می‌شود)"""
+        if self._version is None:
+            self._rebuild()
+        elif self._version != self._shared_version():
+            self._schedule_rebuild()
+
+    def _bump_version(self):
+        """اعلام یک تغییر تدریجی به بقیه پروسه‌ها (با قفل صدا زده می‌شود)"""
+        try:
+            version = cache.incr(self.version_key)
+        except ValueError:
+            # کلید نسخه از کش حذف شده؛ add تا دو پروسه همزمان آن را بازنویسی نکنند.
+            # شروع از 0 نسخه پروسه‌ای را که قبلاً به همان عدد رسیده بود تازه نشان می‌داد
+            cache.add(self.version_key, version_seed(), None)
+            version = cache.incr(self.version_key)
+        if self._version is not None and version == self._version + 1:
+            self._version = version
+        else:
+            self._schedule_rebuild()
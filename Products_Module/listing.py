@@ -0,0 +1,231 @@
+"""
+سرویس مشترک صفحه‌های لیست محصولات (همه محصولات، دسته‌بندی و جستجو)
+
+پارامترهای GET یک بار به ProductListingQuery تبدیل می‌شوند؛ یک tuple تغییرناپذیر
+و hashable که هم QuerySet بهینه را می‌سازد و هم کلید کش نتیجه است. کل نتیجه
+(صفحه محصولات، تعداد کل و سایدبار با تعداد هر فیلتر) زیر کلیدی از روی همین
+spec و نسخه لیست (cache_keys.LISTING_VERSION) کش می‌شود.
+
+تنظیمات (settings.py):
+    PRODUCT_LISTING_CACHE_TIMEOUT: مدت کش هر صفحه لیست به ثانیه؛ ترتیب
+        «بیشترین بازدید» حداکثر به همین اندازه عقب است
+"""
+import hashlib
+from decimal import Decimal
+from typing import NamedTuple, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Max, Min
+
+from . import cache_fill, cache_keys, category_tree, facets, fragments, search_index
+from .models import Brand, Category, Product, ProductSize
+from .pagination import RELEVANCE_SORT, CursorPaginator, RankedIdPaginator, normalize_sort
+
+DEFAULT_LISTING_CACHE_TIMEOUT = 60 * 5
+DEFAULT_PER_PAGE = 12
+
+
+def listing_cache_timeout():
+    return getattr(settings, 'PRODUCT_LISTING_CACHE_TIMEOUT', DEFAULT_LISTING_CACHE_TIMEOUT)
+
+
+def _values(params, name):
+    """مقادیر چندتایی GET به صورت tuple مرتب و بدون تکرار (برای کلید پایدار)"""
+    return tuple(sorted({value for value in params.getlist(name) if value}))
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# سایدبار
+# ─────────────────────────────────────────────────────────────────────────────
+
+def load_sidebar_categories():
+    return list(Category.objects.filter(is_active=True))
+
+
+def load_sidebar_brands():
+    return list(Brand.objects.filter(is_active=True))
+
+
+def load_price_range():
+    return Product.objects.filter(is_active=True).aggregate(min_price=Min('price'), max_price=Max('price'))
+
+
+def sidebar_categories():
+    """دسته‌بندی‌های فعال سایدبار (تعداد محصولات از ایندکس facet پر می‌شود)"""
+    return cache_fill.get_or_build(cache_keys.CATEGORIES_WITH_COUNT, load_sidebar_categories)
+
+
+def sidebar_brands():
+    """برندهای فعال سایدبار (تعداد محصولات از ایندکس facet پر می‌شود)"""
+    return cache_fill.get_or_build(cache_keys.BRANDS_WITH_COUNT, load_sidebar_brands)
+
+
+def price_range():
+    """کمترین و بیشترین قیمت محصولات فعال"""
+    return cache_fill.get_or_build(cache_keys.PRICE_RANGE, load_price_range)
+
+
+def size_facets(facet_counts, selected_sizes=()):
+    """گزینه‌های فیلتر سایز سایدبار به همراه تعداد محصولات هر سایز"""
+    return [
+        {'value': value, 'label': label, 'count': facet_counts['size'].get(value, 0), 'selected': value in selected_sizes}
+        for value, label in ProductSize.SIZE_CHOICES
+    ]
+
+
+class ListingResult:
+    """نتیجه کش شونده یک صفحه لیست: صفحه محصولات و داده‌های سایدبار"""
+
+    def __init__(self, page, categories, brands, sizes, facet_counts, price_range):
+        self.page = page
+        self.categories = categories
+        self.brands = brands
+        self.sizes = sizes
+        self.facet_counts = facet_counts
+        self.price_range = price_range
+
+    @property
+    def total(self):
+        return self.page.count
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# spec پرس‌وجو
+# ─────────────────────────────────────────────────────────────────────────────
+
+class ProductListingQuery(NamedTuple):
+    """spec تغییرناپذیر یک صفحه لیست محصولات"""
+
+    category_id: Optional[int] = None
+    brands: tuple = ()
+    sizes: tuple = ()
+    colors: tuple = ()
+    min_price: Optional[Decimal] = None
+    max_price: Optional[Decimal] = None
+    available: bool = False
+    query: str = ''
+    sort: str = 'popularity'
+    cursor: str = ''
+    per_page: int = DEFAULT_PER_PAGE
+
+    @classmethod
+    def from_request(cls, request, category=None, query=''):
+        """
+        ساخت spec از پارامترهای GET.
+        category: دسته انتخاب شده (از آدرس یا پارامتر category)؛ query: عبارت جستجو
+        """
+        params = request.GET
+        query = query.strip()
+        sort = params.get('sort') or (RELEVANCE_SORT if query else None)
+        return cls(
+            category_id=category.id if category else None,
+            brands=_values(params, 'brand'),
+            sizes=_values(params, 'size'),
+            colors=_values(params, 'color'),
+            min_price=facets.parse_price(params.get('min_price')),
+            max_price=facets.parse_price(params.get('max_price')),
+            available=bool(params.get('available')),
+            query=query,
+            sort=normalize_sort(sort, allow_relevance=bool(query)),
+            cursor=params.get('cursor', ''),
+        )
+
+    def has_filters(self):
+        return bool(
+            self.category_id or self.brands or self.sizes or self.colors
+            or self.min_price is not None or self.max_price is not None or self.available
+        )
+
+    def cache_key(self):
+        digest = hashlib.md5(repr(tuple(self)).encode(), usedforsecurity=False).hexdigest()
+        return f'product_listing_{cache_keys.listing_version()}_{digest}'
+
+    def base_queryset(self):
+        return fragments.card_products(Product.objects.filter(is_active=True))
+
+    def category_ids(self):
+        """دسته انتخاب شده به همراه همه زیردسته‌های فعال آن"""
+        if not self.category_id:
+            return ()
+        return category_tree.descendant_ids(self.category_id)
+
+    def apply_db_filters(self, products):
+        """فیلترها با join در دیتابیس (برای نتایج بزرگ‌تر از PRODUCT_FACET_MAX_IDS)"""
+        if self.category_id:
+            products = products.filter(category_id__in=self.category_ids())
+        if self.brands:
+            products = products.filter(brand__slug__in=self.brands)
+        if self.sizes:
+            products = products.filter(sizes__size__in=self.sizes).distinct()
+        if self.colors:
+            products = products.filter(colors__code__in=self.colors).distinct()
+        if self.min_price is not None:
+            products = products.filter(price__gte=self.min_price)
+        if self.max_price is not None:
+            products = products.filter(price__lte=self.max_price)
+        if self.available:
+            products = products.filter(is_available=True, stock__gt=0)
+        return products
+
+    def facet_result(self, ranked_ids=None):
+        return facets.query(
+            category=self.category_ids(),
+            brand=self.brands,
+            size=self.sizes,
+            color=self.colors,
+            min_price=self.min_price,
+            max_price=self.max_price,
+            available=self.available,
+            within=ranked_ids,
+        )
+
+    def paginate(self, facet_result, ranked_ids=None):
+        """صفحه فعلی؛ نتایج کوچک با pk__in از ایندکس facet، بزرگ‌ها با فیلتر دیتابیس"""
+        products = self.base_queryset()
+        if self.sort == RELEVANCE_SORT:
+            ids = [pk for pk in ranked_ids if pk in facet_result.ids]
+            return RankedIdPaginator(products, ids, per_page=self.per_page).get_page(self.cursor)
+
+        count = len(facet_result)
+        if ranked_ids is not None or self.has_filters():
+            if count <= facets.max_ids():
+                products = products.filter(pk__in=facet_result.ids)
+            else:
+                products = self.apply_db_filters(products)
+                if ranked_ids is not None:
+                    products = products.filter(pk__in=ranked_ids)
+        paginator = CursorPaginator(products, self.sort, per_page=self.per_page, count=count)
+        return paginator.get_page(self.cursor)
+
+    def execute(self):
+        """نتیجه صفحه (از کش یا با محاسبه)؛ برمی‌گرداند: ListingResult"""
+        key = self.cache_key()
+        result = cache.get(key)
+        if result is not None:
+            return result
+
+        ranked_ids = search_index.search(self.query) if self.query else None
+        facet_result = self.facet_result(ranked_ids)
+        page = self.paginate(facet_result, ranked_ids)
+
+        # تعداد زنده سایدبار بر اساس فیلترهای فعال (لیست‌های کش شده کپی هستند)
+        counts = facet_result.counts
+        category_counts = category_tree.get_tree().rollup(counts['category'])
+        categories = sidebar_categories()
+        for category in categories:
+            category.product_count = category_counts.get(category.id, 0)
+        brands = sidebar_brands()
+        for brand in brands:
+            brand.product_count = counts['brand'].get(brand.slug, 0)
+
+        result = ListingResult(
+            page=page,
+            categories=categories,
+            brands=brands,
+            sizes=size_facets(counts, self.sizes),
+            facet_counts=counts,
+            price_range=price_range(),
+        )
+        cache.set(key, result, listing_cache_timeout())
+        return result
@@ -0,0 +1,56 @@
+"""
+ساخت نسخه‌های واکنش‌گرای (WebP/JPEG در چند عرض) تصاویر موجود در media
+استفاده: python manage.py generate_image_variants [products categories ...] [--workers 4] [--force]
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.core.management.base import BaseCommand
+
+from Products_Module import fragments, image_variants
+
+DEFAULT_DIRECTORIES = ('products', 'categories', 'brands', 'aboutus')
+
+
+def _generate(name, force):
+    """اجرا در پروسه کارگر؛ خطای یک تصویر بقیه را متوقف نمی‌کند"""
+    try:
+        return name, image_variants.generate_variants(name, force=force), None
+    except Exception as exc:  # noqa: BLE001 - گزارش و ادامه
+        return name, 0, str(exc)
+
+
+class Command(BaseCommand):
+    help = 'ساخت نسخه‌های WebP/JPEG در عرض‌های IMAGE_VARIANT_WIDTHS برای تصاویر موجود'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'directories', nargs='*', default=list(DEFAULT_DIRECTORIES),
+            help='پوشه‌های داخل MEDIA_ROOT (پیش‌فرض: همه پوشه‌های تصاویر)',
+        )
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='تعداد پروسه‌های موازی')
+        parser.add_argument('--force', action='store_true', help='ساخت دوباره نسخه‌های موجود')
+
+    def handle(self, *args, **options):
+        names = [
+            name
+            for directory in options['directories']
+            for name in image_variants.iter_sources(directory)
+        ]
+        force = options['force']
+        created = failed = 0
+        # هر کارگر جنگو را خودش راه‌اندازی می‌کند (برای روش spawn در ویندوز/macOS)
+        with ProcessPoolExecutor(max_workers=max(options['workers'], 1), initializer=django.setup) as executor:
+            for name, count, error in executor.map(_generate, names, [force] * len(names), chunksize=8):
+                if error:
+                    failed += 1
+                    self.stderr.write(f'{name}: {error}')
+                created += count
+
+        # کارت‌های کش شده محصول با srcset جدید رندر شوند
+        fragments.invalidate_fragment('product_card')
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(names)} تصویر بررسی و {created} نسخه ساخته شد'
+            + (f' ({failed} خطا).' if failed else '.')
+        ))
@@ -1,38 +1,271 @@
 """
 دستور Django برای پر کردن دیتابیس با داده‌های نمونه
 استفاده: python manage.py populate_db
+داده حجیم برای تست بار:
+    python manage.py populate_db --products 100000 --reviews-per-product 10 --seed 42 --workers 4
 """
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from decimal import Decimal
+
+from django.core.cache import cache
 from django.core.management.base import BaseCommand
+from django.db import connection, transaction
 from django.utils import timezone
+from Products_Module import cache_keys, facets, search_index
 from Products_Module.models import Category, Brand, Product, ProductImage, ProductColor, ProductSize, ProductReview
 from Menu_Module.models import MenuItem
 from Contact_Module.models import ContactInfo
 from AboutUs_Module.models import AboutPage, Brand as AboutBrand, TeamMember, Testimonial
+from Cart_Module.models import CartItem, DiscountCode, OrderItem
+from Cart_Module.services import invalidate_discount_codes
+
+
+# تصاویر موجود در پوشه media/products
+SAMPLE_IMAGES = [
+    'products/1.jpg',
+    'products/2.jpg',
+    'products/3.jpg',
+    'products/product-1.jpg',
+    'products/product-4.jpg',
+    'products/product-5.jpg',
+    'products/product-6.jpg',
+    'products/product-7.jpg',
+    'products/product-9.jpg',
+]
+
+# جدول‌هایی که پیش از پر کردن خالی می‌شوند (به جز کاربران)؛ برگ‌ها اول تا هیچ
+# کلید خارجی به ردیف حذف شده اشاره نکند
+WIPE_MODELS = (
+    ProductReview, ProductSize, ProductColor, ProductImage, CartItem, Product, Brand, Category, MenuItem,
+    ContactInfo, AboutPage, AboutBrand, TeamMember, Testimonial,
+)
+# مدل‌هایی که کش‌های کاتالوگ به آن‌ها وابسته‌اند
+CATALOG_MODELS = (Category, Brand, Product, ProductImage, ProductColor, ProductSize, ProductReview, MenuItem)
+
+SAMPLE_COLORS = [
+    {'name': 'مشکی', 'code': '#000000'},
+    {'name': 'سفید', 'code': '#FFFFFF'},
+    {'name': 'قرمز', 'code': '#FF0000'},
+    {'name': 'آبی', 'code': '#0000FF'},
+    {'name': 'سبز', 'code': '#00FF00'},
+    {'name': 'زرد', 'code': '#FFFF00'},
+    {'name': 'نقره ای', 'code': '#C0C0C0'},
+    {'name': 'طلایی', 'code': '#FFD700'},
+]
+
+SAMPLE_SIZES = ['xs', 's', 'm', 'l', 'xl', 'xxl']
+
+SAMPLE_REVIEWS = [
+    {
+        'name': 'علی احمدی',
+        'email': 'ali@example.com',
+        'rating': 5,
+        'title': 'عالی بود',
+        'comment': 'محصول بسیار با کیفیت و ارسال سریع. پیشنهاد می‌کنم.',
+        'is_approved': True,
+    },
+    {
+        'name': 'سارا محمدی',
+        'email': 'sara@example.com',
+        'rating': 4,
+        'title': 'خوب بود',
+        'comment': 'کیفیت خوبی داشت اما قیمت کمی بالا بود.',
+        'is_approved': True,
+    },
+    {
+        'name': 'رضا کریمی',
+        'email': 'reza@example.com',
+        'rating': 5,
+        'title': 'فوق العاده',
+        'comment': 'بهترین خریدی که تا حالا داشتم. ممنون از فروشگاه.',
+        'is_approved': True,
+    },
+    {
+        'name': 'مریم حسینی',
+        'email': 'maryam@example.com',
+        'rating': 4,
+        'title': 'راضی هستم',
+        'comment': 'محصول مطابق توضیحات بود. ارسال هم سریع انجام شد.',
+        'is_approved': True,
+    },
+    {
+        'name': 'حسین رضایی',
+        'email': 'hossein@example.com',
+        'rating': 5,
+        'title': 'بی نظیر',
+        'comment': 'کیفیت عالی و قیمت مناسب. حتما دوباره خرید می‌کنم.',
+        'is_approved': True,
+    },
+    {
+        'name': 'زهرا اکبری',
+        'email': 'zahra@example.com',
+        'rating': 3,
+        'title': 'متوسط',
+        'comment': 'محصول خوب بود اما انتظار بیشتری داشتم.',
+        'is_approved': True,
+    },
+    {
+        'name': 'امیر محمودی',
+        'email': 'amir@example.com',
+        'rating': 5,
+        'title': 'عالی',
+        'comment': 'دقیقا همان چیزی بود که می‌خواستم. ممنون.',
+        'is_approved': True,
+    },
+]
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# داده حجیم (--products)
+# ─────────────────────────────────────────────────────────────────────────────
+
+PRODUCT_NOUNS = ['تی شرت', 'پیراهن', 'شلوار', 'کفش', 'کتونی', 'کیف', 'کوله', 'ساعت', 'عینک', 'کلاه', 'شال', 'گردنبند']
+PRODUCT_ADJECTIVES = ['اسپرت', 'کلاسیک', 'رسمی', 'راحتی', 'چرمی', 'نخی', 'مدرن', 'تابستانی', 'زمستانی', 'طرح دار']
+APPROVED_REVIEW_RATIO = 0.9
+
+
+@contextmanager
+def sqlite_bulk_pragmas():
+    """
+    pragma های درج سریع SQLite برای همین اتصال (بیرون از تراکنش تنظیم می‌شوند) و
+    برگرداندن مقدار قبلی در پایان. روی دیتابیس‌های دیگر یا داخل تراکنش باز کاری انجام نمی‌دهد.
+    """
+    if connection.vendor != 'sqlite' or connection.in_atomic_block:
+        yield
+        return
+    pragmas = {'synchronous': 'OFF', 'journal_mode': 'MEMORY', 'temp_store': 'MEMORY', 'cache_size': '-200000'}
+    with connection.cursor() as cursor:
+        previous = {}
+        for name, value in pragmas.items():
+            previous[name] = cursor.execute(f'PRAGMA {name}').fetchone()[0]
+            cursor.execute(f'PRAGMA {name} = {value}')
+    try:
+        yield
+    finally:
+        with connection.cursor() as cursor:
+            for name, value in previous.items():
+                cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def generate_chunk(chunk):
+    """
+    داده محصولات [start, start + count) به صورت dict (قابل ارسال بین پروسه‌ها).
+    هر دسته بذر مستقل خودش را دارد؛ خروجی به تعداد کارگرها بستگی ندارد.
+    """
+    start, count, seed, reviews_per_product, category_ids, brand_ids = chunk
+    rng = random.Random(f'{seed}:{start}')
+    rows = []
+    for index in range(start, start + count):
+        price = rng.randrange(50, 5000) * 1000
+        reviews = [
+            dict(SAMPLE_REVIEWS[rng.randrange(len(SAMPLE_REVIEWS))], rating=rng.randint(1, 5),
+                 is_approved=rng.random() < APPROVED_REVIEW_RATIO)
+            for _ in range(reviews_per_product)
+        ]
+        approved = [review['rating'] for review in reviews if review['is_approved']]
+        stock = 0 if rng.random() < 0.1 else rng.randint(1, 200)
+        first_image = rng.randrange(len(SAMPLE_IMAGES))
+        image_count = rng.randint(1, 4)
+        name = f'{rng.choice(PRODUCT_NOUNS)} {rng.choice(PRODUCT_ADJECTIVES)} {index + 1}'
+        rows.append({
+            'product': {
+                'name': name,
+                'slug': f'load-product-{index + 1:07d}',
+                'category_id': rng.choice(category_ids),
+                'brand_id': rng.choice(brand_ids) if rng.random() < 0.8 else None,
+                'description': f'{name} - توضیحات کوتاه',
+                'full_description': f'{name} - توضیحات کامل محصول برای داده تست بار.',
+                'price': price,
+                'old_price': price + rng.randrange(1, 20) * 10000 if rng.random() < 0.3 else None,
+                'stock': stock,
+                'is_available': stock > 0,
+                'sold_out': stock == 0,
+                'label': rng.choice(('new', 'sale', 'hot', 'top', None, None, None)),
+                'views_count': int(rng.paretovariate(1.2) * 10),
+                # خلاصه امتیاز از همین نظرات (بدون اجرای rebuild_product_ratings)
+                'rating_avg': round(Decimal(sum(approved)) / len(approved), 2) if approved else Decimal('0'),
+                'rating_count': len(approved),
+            },
+            'images': [
+                {
+                    'image': SAMPLE_IMAGES[(first_image + i) % len(SAMPLE_IMAGES)],
+                    'alt_text': f'{name} - تصویر {i + 1}',
+                    'is_main': i == 0,
+                    'order': i,
+                }
+                for i in range(image_count)
+            ],
+            'colors': rng.sample(SAMPLE_COLORS, rng.randint(0, 4)),
+            'sizes': sorted(rng.sample(SAMPLE_SIZES, rng.randint(0, len(SAMPLE_SIZES))), key=SAMPLE_SIZES.index),
+            'reviews': reviews,
+        })
+    return rows
 
 
 class Command(BaseCommand):
     help = 'پر کردن دیتابیس با داده‌های نمونه'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--products', type=int, default=None,
+            help='تولید این تعداد محصول مصنوعی (حالت داده حجیم برای تست بار) به جای محصولات نمونه',
+        )
+        parser.add_argument('--reviews-per-product', type=int, default=5, help='تعداد نظر هر محصول مصنوعی')
+        parser.add_argument('--seed', type=int, default=0, help='بذر تولید تصادفی (خروجی قطعی)')
+        parser.add_argument('--workers', type=int, default=1, help='تعداد پروسه‌های تولید داده')
+        parser.add_argument('--batch-size', type=int, default=1000, help='تعداد محصول در هر دسته bulk_create')
+
     def handle(self, *args, **options):
         self.stdout.write(self.style.SUCCESS('شروع پر کردن دیتابیس...'))
+        started = time.monotonic()
+
+        # کل عملیات در یک تراکنش؛ در SQLite با pragma های سریع (فقط برای همین اتصال)
+        with sqlite_bulk_pragmas(), transaction.atomic():
+            old_product_ids = self.clear_data()
+            self.populate(options)
+
+        # پاک کردن و bulk_create سیگنال ندارند: ایندکس‌ها و کش‌های مشتق شده یک بار ساخته می‌شوند
+        self.stdout.write('بازسازی ایندکس جستجو و فیلترها...')
+        search_index.rebuild()
+        facets.rebuild()
+        for model in CATALOG_MODELS:
+            cache_keys.invalidate_model(model.__name__)
+        cache_keys.bump_version(cache_keys.CATEGORY_TREE_VERSION)
+        # شناسه محصولات حذف شده ممکن است دوباره استفاده شود
+        cache.delete_many([cache_keys.product_reviews_key(pk) for pk in old_product_ids])
+        invalidate_discount_codes()
+
+        self.stdout.write(self.style.SUCCESS(f'✓ دیتابیس با موفقیت پر شد! ({time.monotonic() - started:.1f} ثانیه)'))
+        self.stdout.write(self.style.SUCCESS(f'  - {Category.objects.count()} دسته‌بندی'))
+        self.stdout.write(self.style.SUCCESS(f'  - {Brand.objects.count()} برند'))
+        self.stdout.write(self.style.SUCCESS(f'  - {Product.objects.count()} محصول'))
+        self.stdout.write(self.style.SUCCESS(f'  - {ProductImage.objects.count()} تصویر محصول'))
+        self.stdout.write(self.style.SUCCESS(f'  - {ProductReview.objects.count()} نظر'))
+        self.stdout.write(self.style.SUCCESS(f'  - {MenuItem.objects.count()} آیتم منو'))
+        self.stdout.write(self.style.SUCCESS(f'  - {ContactInfo.objects.count()} اطلاعات تماس'))
 
-        # پاک کردن داده‌های قبلی (به جز کاربران)
+    def clear_data(self):
+        """
+        پاک کردن داده‌های قبلی (به جز کاربران) با یک DELETE برای هر جدول.
+        delete() معمولی به خاطر گیرنده‌های post_delete ردیف به ردیف حذف می‌کند و
+        روی داده حجیم ساعت‌ها طول می‌کشد؛ کارهای آن گیرنده‌ها در handle یک بار انجام می‌شود.
+        برمی‌گرداند: شناسه محصولات حذف شده
+        """
         self.stdout.write('پاک کردن داده‌های قبلی...')
         self.stdout.write(self.style.WARNING('توجه: کاربران ادمین حفظ می‌شوند'))
-        ProductReview.objects.all().delete()
-        ProductSize.objects.all().delete()
-        ProductColor.objects.all().delete()
-        ProductImage.objects.all().delete()
-        Product.objects.all().delete()
-        Brand.objects.all().delete()
-        Category.objects.all().delete()
-        MenuItem.objects.all().delete()
-        ContactInfo.objects.all().delete()
-        AboutPage.objects.all().delete()
-        AboutBrand.objects.all().delete()
-        TeamMember.objects.all().delete()
-        Testimonial.objects.all().delete()
-
+        product_ids = list(Product.objects.values_list('pk', flat=True))
+        # سفارش‌ها و کدهای تخفیف می‌مانند (on_delete=SET_NULL)
+        OrderItem.objects.filter(product__isnull=False).update(product=None)
+        DiscountCode.objects.filter(product__isnull=False).update(product=None)
+        for model in WIPE_MODELS:
+            queryset = model.objects.all()
+            queryset._raw_delete(queryset.db)
+        return product_ids
+
+    def populate(self, options):
         # ایجاد دسته‌بندی‌ها
         self.stdout.write('ایجاد دسته‌بندی‌ها...')
         categories = self.create_categories()
@@ -41,21 +274,25 @@ class Command(BaseCommand):
         self.stdout.write('ایجاد برندها...')
         brands = self.create_brands()
 
-        # ایجاد محصولات
-        self.stdout.write('ایجاد محصولات...')
-        products = self.create_products(categories, brands)
+        if options['products'] is not None:
+            self.stdout.write(f'ایجاد {options["products"]} محصول مصنوعی...')
+            self.create_bulk_catalog(categories, brands, options)
+        else:
+            # ایجاد محصولات
+            self.stdout.write('ایجاد محصولات...')
+            products = self.create_products(categories, brands)
 
-        # ایجاد تصاویر محصولات
-        self.stdout.write('ایجاد تصاویر محصولات...')
-        self.create_product_images(products)
+            # ایجاد تصاویر محصولات
+            self.stdout.write('ایجاد تصاویر محصولات...')
+            self.create_product_images(products)
 
-        # ایجاد رنگ‌ها و سایزها
-        self.stdout.write('ایجاد رنگ‌ها و سایزها...')
-        self.create_colors_and_sizes(products)
+            # ایجاد رنگ‌ها و سایزها
+            self.stdout.write('ایجاد رنگ‌ها و سایزها...')
+            self.create_colors_and_sizes(products)
 
-        # ایجاد نظرات
-        self.stdout.write('ایجاد نظرات...')
-        self.create_reviews(products)
+            # ایجاد نظرات
+            self.stdout.write('ایجاد نظرات...')
+            self.create_reviews(products)
 
         # ایجاد منوها
         self.stdout.write('ایجاد منوها...')
@@ -81,14 +318,47 @@ class Command(BaseCommand):
         self.stdout.write('ایجاد نظرات مشتریان...')
         self.create_testimonials()
 
-        self.stdout.write(self.style.SUCCESS('✓ دیتابیس با موفقیت پر شد!'))
-        self.stdout.write(self.style.SUCCESS(f'  - {Category.objects.count()} دسته‌بندی'))
-        self.stdout.write(self.style.SUCCESS(f'  - {Brand.objects.count()} برند'))
-        self.stdout.write(self.style.SUCCESS(f'  - {Product.objects.count()} محصول'))
-        self.stdout.write(self.style.SUCCESS(f'  - {ProductImage.objects.count()} تصویر محصول'))
-        self.stdout.write(self.style.SUCCESS(f'  - {ProductReview.objects.count()} نظر'))
-        self.stdout.write(self.style.SUCCESS(f'  - {MenuItem.objects.count()} آیتم منو'))
-        self.stdout.write(self.style.SUCCESS(f'  - {ContactInfo.objects.count()} اطلاعات تماس'))
+    def create_bulk_catalog(self, categories, brands, options):
+        """
+        محصولات مصنوعی با bulk_create در دسته‌های batch_size.
+        داده هر دسته در پروسه‌های کارگر (یا همین پروسه) تولید و به ترتیب درج می‌شود.
+        """
+        total, batch_size = options['products'], max(options['batch_size'], 1)
+        chunks = [
+            (start, min(batch_size, total - start), options['seed'], options['reviews_per_product'],
+             sorted(category.pk for category in categories.values()), sorted(brand.pk for brand in brands.values()))
+            for start in range(0, total, batch_size)
+        ]
+        workers = max(options['workers'], 1)
+        if workers > 1 and len(chunks) > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                self._insert_chunks(executor.map(generate_chunk, chunks), total)
+        else:
+            self._insert_chunks(map(generate_chunk, chunks), total)
+
+    def _insert_chunks(self, chunks, total):
+        inserted = 0
+        for rows in chunks:
+            products = Product.objects.bulk_create([Product(**row['product']) for row in rows])
+            if any(product.pk is None for product in products):
+                # دیتابیس‌هایی که شناسه bulk_create را برنمی‌گردانند
+                ids = dict(Product.objects.filter(slug__in=[p.slug for p in products]).values_list('slug', 'id'))
+                for product in products:
+                    product.pk = ids[product.slug]
+
+            images, colors, sizes, reviews = [], [], [], []
+            for product, row in zip(products, rows):
+                images.extend(ProductImage(product_id=product.pk, **image) for image in row['images'])
+                colors.extend(ProductColor(product_id=product.pk, **color) for color in row['colors'])
+                sizes.extend(ProductSize(product_id=product.pk, size=size) for size in row['sizes'])
+                reviews.extend(ProductReview(product_id=product.pk, **review) for review in row['reviews'])
+            ProductImage.objects.bulk_create(images)
+            ProductColor.objects.bulk_create(colors)
+            ProductSize.objects.bulk_create(sizes)
+            ProductReview.objects.bulk_create(reviews)
+
+            inserted += len(products)
+            self.stdout.write(f'  {inserted}/{total} محصول')
 
     def create_categories(self):
         """ایجاد دسته‌بندی‌ها"""
@@ -193,7 +463,7 @@ class Command(BaseCommand):
                 'stock': 45,
                 'label': 'sale',
             },
-            
+
             # محصولات زنانه
             {
                 'name': 'پیراهن زنانه گلدار بهاری',
@@ -241,7 +511,7 @@ class Command(BaseCommand):
                 'stock': 32,
                 'label': 'new',
             },
-            
+
             # کفش‌ها
             {
                 'name': 'کفش ورزشی آدیداس اولترا بوست',
@@ -278,7 +548,7 @@ class Command(BaseCommand):
                 'stock': 18,
                 'label': 'top',
             },
-            
+
             # کیف و کوله
             {
                 'name': 'کیف دستی چرم لوکس',
@@ -314,7 +584,7 @@ class Command(BaseCommand):
                 'stock': 15,
                 'label': 'sale',
             },
-            
+
             # ساعت‌ها
             {
                 'name': 'ساعت مچی مردانه اسپرت',
@@ -339,7 +609,7 @@ class Command(BaseCommand):
                 'stock': 22,
                 'label': 'hot',
             },
-            
+
             # عینک
             {
                 'name': 'عینک آفتابی ریبن کلاسیک',
@@ -364,7 +634,7 @@ class Command(BaseCommand):
                 'stock': 28,
                 'label': 'sale',
             },
-            
+
             # جواهرات
             {
                 'name': 'گردنبند طلا با آویز قلب',
@@ -400,7 +670,7 @@ class Command(BaseCommand):
                 'stock': 8,
                 'label': 'new',
             },
-            
+
             # لوازم جانبی
             {
                 'name': 'کمربند چرم مردانه',
@@ -447,28 +717,15 @@ class Command(BaseCommand):
 
     def create_product_images(self, products):
         """ایجاد تصاویر محصولات"""
-        # تصاویر موجود در پوشه media/products
-        available_images = [
-            'products/1.jpg',
-            'products/2.jpg',
-            'products/3.jpg',
-            'products/product-1.jpg',
-            'products/product-4.jpg',
-            'products/product-5.jpg',
-            'products/product-6.jpg',
-            'products/product-7.jpg',
-            'products/product-9.jpg',
-        ]
-        
         # برای هر محصول، 2-4 تصویر اضافه می‌کنیم
         for idx, product in enumerate(products):
             # تعداد تصاویر برای این محصول (بین 2 تا 4)
             num_images = 2 + (idx % 3)
-            
+
             for i in range(num_images):
                 # انتخاب تصویر به صورت چرخشی
-                image_path = available_images[(idx + i) % len(available_images)]
-                
+                image_path = SAMPLE_IMAGES[(idx + i) % len(SAMPLE_IMAGES)]
+
                 ProductImage.objects.create(
                     product=product,
                     image=image_path,
@@ -479,25 +736,12 @@ class Command(BaseCommand):
 
     def create_colors_and_sizes(self, products):
         """ایجاد رنگ‌ها و سایزها برای محصولات"""
-        colors = [
-            {'name': 'مشکی', 'code': '#000000'},
-            {'name': 'سفید', 'code': '#FFFFFF'},
-            {'name': 'قرمز', 'code': '#FF0000'},
-            {'name': 'آبی', 'code': '#0000FF'},
-            {'name': 'سبز', 'code': '#00FF00'},
-            {'name': 'زرد', 'code': '#FFFF00'},
-            {'name': 'نقره ای', 'code': '#C0C0C0'},
-            {'name': 'طلایی', 'code': '#FFD700'},
-        ]
-
-        sizes = ['xs', 's', 'm', 'l', 'xl', 'xxl']
-
         # برای محصولات لباس (10 محصول اول)
         for product in products[:10]:
             # اضافه کردن رنگ‌ها (3-4 رنگ برای هر محصول)
             num_colors = 3 + (products.index(product) % 2)
             for i in range(num_colors):
-                color = colors[i % len(colors)]
+                color = SAMPLE_COLORS[i % len(SAMPLE_COLORS)]
                 ProductColor.objects.create(
                     product=product,
                     name=color['name'],
@@ -506,7 +750,7 @@ class Command(BaseCommand):
 
             # اضافه کردن سایزها (4-6 سایز برای هر محصول)
             num_sizes = 4 + (products.index(product) % 3)
-            for size in sizes[:num_sizes]:
+            for size in SAMPLE_SIZES[:num_sizes]:
                 ProductSize.objects.create(
                     product=product,
                     size=size
@@ -514,72 +758,13 @@ class Command(BaseCommand):
 
     def create_reviews(self, products):
         """ایجاد نظرات برای محصولات"""
-        reviews_data = [
-            {
-                'name': 'علی احمدی',
-                'email': 'ali@example.com',
-                'rating': 5,
-                'title': 'عالی بود',
-                'comment': 'محصول بسیار با کیفیت و ارسال سریع. پیشنهاد می‌کنم.',
-                'is_approved': True,
-            },
-            {
-                'name': 'سارا محمدی',
-                'email': 'sara@example.com',
-                'rating': 4,
-                'title': 'خوب بود',
-                'comment': 'کیفیت خوبی داشت اما قیمت کمی بالا بود.',
-                'is_approved': True,
-            },
-            {
-                'name': 'رضا کریمی',
-                'email': 'reza@example.com',
-                'rating': 5,
-                'title': 'فوق العاده',
-                'comment': 'بهترین خریدی که تا حالا داشتم. ممنون از فروشگاه.',
-                'is_approved': True,
-            },
-            {
-                'name': 'مریم حسینی',
-                'email': 'maryam@example.com',
-                'rating': 4,
-                'title': 'راضی هستم',
-                'comment': 'محصول مطابق توضیحات بود. ارسال هم سریع انجام شد.',
-                'is_approved': True,
-            },
-            {
-                'name': 'حسین رضایی',
-                'email': 'hossein@example.com',
-                'rating': 5,
-                'title': 'بی نظیر',
-                'comment': 'کیفیت عالی و قیمت مناسب. حتما دوباره خرید می‌کنم.',
-                'is_approved': True,
-            },
-            {
-                'name': 'زهرا اکبری',
-                'email': 'zahra@example.com',
-                'rating': 3,
-                'title': 'متوسط',
-                'comment': 'محصول خوب بود اما انتظار بیشتری داشتم.',
-                'is_approved': True,
-            },
-            {
-                'name': 'امیر محمودی',
-                'email': 'amir@example.com',
-                'rating': 5,
-                'title': 'عالی',
-                'comment': 'دقیقا همان چیزی بود که می‌خواستم. ممنون.',
-                'is_approved': True,
-            },
-        ]
-
         # نظر برای همه محصولات
         for product in products:
             # تعداد نظرات برای هر محصول (بین 2 تا 5)
             num_reviews = 2 + (products.index(product) % 4)
-            
+
             for i in range(num_reviews):
-                review_data = reviews_data[i % len(reviews_data)]
+                review_data = SAMPLE_REVIEWS[i % len(SAMPLE_REVIEWS)]
                 ProductReview.objects.create(
                     product=product,
                     **review_data
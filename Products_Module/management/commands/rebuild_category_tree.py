@@ -0,0 +1,17 @@
+"""
+بازسازی مسیر درختی (path/depth) دسته‌بندی‌ها از روی parent
+استفاده: python manage.py rebuild_category_tree
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from Products_Module import category_tree
+
+
+class Command(BaseCommand):
+    help = 'بازسازی مسیر درختی دسته‌بندی‌ها'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            count = category_tree.rebuild_paths()
+        self.stdout.write(self.style.SUCCESS(f'مسیر {count} دسته‌بندی به‌روز شد.'))
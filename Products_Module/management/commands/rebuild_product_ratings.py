@@ -0,0 +1,20 @@
+"""
+بازسازی ستون‌های rating_avg و rating_count همه محصولات
+استفاده: python manage.py rebuild_product_ratings [--batch-size 1000]
+"""
+from django.core.management.base import BaseCommand
+
+from Products_Module import cache_keys
+from Products_Module.services import rebuild_product_ratings
+
+
+class Command(BaseCommand):
+    help = 'بازسازی خلاصه امتیاز محصولات از نظرات تایید شده'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='تعداد ردیف در هر bulk_update')
+
+    def handle(self, *args, **options):
+        rated = rebuild_product_ratings(batch_size=options['batch_size'])
+        cache_keys.invalidate_model('ProductReview')
+        self.stdout.write(self.style.SUCCESS(f'امتیاز {rated} محصول بازسازی شد.'))
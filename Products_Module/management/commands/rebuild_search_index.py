@@ -0,0 +1,23 @@
+"""
+بازسازی کامل ایندکس جستجوی محصولات
+استفاده: python manage.py rebuild_search_index [--batch-size 2000]
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from Products_Module import search_index
+
+
+class Command(BaseCommand):
+    help = 'بازسازی ایندکس جستجوی متنی محصولات'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000, help='تعداد محصول در هر دسته')
+
+    def handle(self, *args, **options):
+        backend = search_index.get_backend()
+        with transaction.atomic():
+            count = search_index.rebuild(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'{count} محصول در ایندکس جستجو ({backend.name}) ثبت شد.'
+        ))
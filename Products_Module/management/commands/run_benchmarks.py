@@ -0,0 +1,120 @@
+"""
+بنچمارک ویوهای پرترافیک روی یک دیتابیس آزمایشی با داده حجیم
+استفاده:
+    python manage.py run_benchmarks --products 5000 --update-baseline
+    python manage.py run_benchmarks --products 5000 --threshold 0.25
+دیتابیس و کش اصلی دست نمی‌خورند: دیتابیس آزمایشی مثل manage.py test ساخته
+و در پایان حذف می‌شود و کش همان لایه‌ها و مسیرهای CACHES روی LocMemCache های جداگانه
+است (مگر با --use-configured-cache).
+"""
+from io import StringIO
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+
+from Products_Module import benchmarks
+
+LOCMEM_BACKEND = 'django.core.cache.backends.locmem.LocMemCache'
+TIERED_BACKEND = 'Ario_Shop.cache_tiers.TieredCache'
+# جای کلیدهای لیست، کارت و قطعه‌های داده حجیم در لایه‌های مشترک و پایدار
+ISOLATED_MAX_ENTRIES = 1_000_000
+
+
+def isolated_caches():
+    """
+    CACHES پروژه با همان مسیرهای لایه‌ها، هر لایه یک LocMemCache جداگانه.
+    L1 (local) اندازه تنظیم شده‌اش را نگه می‌دارد چون بخشی از مسیر کش اصلی است؛
+    بقیه لایه‌ها جای همه کلیدها را دارند تا بنچمارک بیرون‌رانی LocMemCache
+    (پیش‌فرض 300 کلید) را به جای مسیر کش اندازه نگیرد.
+    """
+    isolated = {}
+    for alias, config in settings.CACHES.items():
+        if config['BACKEND'] == TIERED_BACKEND:
+            isolated[alias] = config
+            continue
+        options = config.get('OPTIONS', {}) if alias == 'local' else {'MAX_ENTRIES': ISOLATED_MAX_ENTRIES}
+        isolated[alias] = {**config, 'BACKEND': LOCMEM_BACKEND, 'LOCATION': f'benchmarks-{alias}', 'OPTIONS': options}
+    return isolated
+
+
+class Command(BaseCommand):
+    help = 'بنچمارک تاخیر، تعداد کوئری و حافظه ویوهای اصلی و مقایسه با baseline'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=2000, help='تعداد محصول داده آزمایشی')
+        parser.add_argument('--reviews-per-product', type=int, default=5)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--iterations', type=int, default=30, help='تعداد درخواست زمان‌سنجی شده هر ویو')
+        parser.add_argument('--warmup', type=int, default=3, help='درخواست‌های گرم کردن (بدون ثبت)')
+        parser.add_argument('--views', nargs='*', help='فقط این سناریوها (مثلاً index product_list)')
+        parser.add_argument(
+            '--baseline', type=Path,
+            default=Path(getattr(settings, 'BENCHMARK_BASELINE_PATH', settings.BASE_DIR / 'benchmarks' / 'baseline.json')),
+        )
+        parser.add_argument('--output', type=Path, help='ذخیره نتیجه این اجرا به صورت JSON')
+        parser.add_argument('--threshold', type=float, default=0.25, help='افزایش نسبی مجاز p95 و حافظه')
+        parser.add_argument('--update-baseline', action='store_true', help='ذخیره نتیجه به عنوان baseline جدید')
+        parser.add_argument('--use-configured-cache', action='store_true', help='استفاده از CACHES تنظیمات پروژه')
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        runner = DiscoverRunner(verbosity=0, interactive=False)
+        old_config = runner.setup_databases()
+        overrides = {'RATELIMIT_ENABLE': False}
+        if not options['use_configured_cache']:
+            overrides['CACHES'] = isolated_caches()
+        try:
+            with override_settings(**overrides):
+                results = self.run(options)
+        finally:
+            runner.teardown_databases(old_config)
+            teardown_test_environment()
+
+        self.report(results)
+        if options['output']:
+            benchmarks.save_results(results, options['output'])
+        if options['update_baseline']:
+            benchmarks.save_results(results, options['baseline'])
+            self.stdout.write(self.style.SUCCESS(f'baseline در {options["baseline"]} ذخیره شد.'))
+            return
+
+        baseline = benchmarks.load_baseline(options['baseline'])
+        if baseline is None:
+            self.stdout.write(self.style.WARNING(
+                f'baseline در {options["baseline"]} پیدا نشد؛ برای ساخت آن --update-baseline بدهید.'
+            ))
+            return
+        if baseline.get('meta', {}).get('dataset') != results['meta']['dataset']:
+            self.stdout.write(self.style.WARNING('داده این اجرا با baseline یکسان نیست؛ مقایسه تقریبی است.'))
+        regressions = benchmarks.compare(results, baseline, options['threshold'])
+        if regressions:
+            raise CommandError('پسرفت کارایی:\n  ' + '\n  '.join(regressions))
+        self.stdout.write(self.style.SUCCESS('بدون پسرفت نسبت به baseline.'))
+
+    def run(self, options):
+        dataset = {
+            'products': options['products'],
+            'reviews_per_product': options['reviews_per_product'],
+            'seed': options['seed'],
+        }
+        self.stdout.write(f'ساخت داده آزمایشی ({options["products"]} محصول)...')
+        call_command(
+            'populate_db', stdout=StringIO(), products=options['products'],
+            reviews_per_product=options['reviews_per_product'], seed=options['seed'],
+        )
+        self.stdout.write('اجرای سناریوها...')
+        return benchmarks.run_suite(
+            iterations=options['iterations'], warmup=options['warmup'], only=options['views'], dataset=dataset,
+        )
+
+    def report(self, results):
+        self.stdout.write(f'{"view":<18}{"p50":>9}{"p95":>9}{"p99":>9}{"queries":>9}{"peak KB":>10}')
+        for name, row in results['views'].items():
+            self.stdout.write(
+                f'{name:<18}{row["p50_ms"]:>9.1f}{row["p95_ms"]:>9.1f}{row["p99_ms"]:>9.1f}'
+                f'{row["queries"]:>9}{row["peak_kb"]:>10.0f}'
+            )
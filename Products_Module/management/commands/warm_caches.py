@@ -0,0 +1,30 @@
+"""
+گرم کردن کش‌های کاتالوگ پس از دیپلوی یا ری‌استارت
+استفاده: python manage.py warm_caches [--top-products 50] [--workers 4] [--force]
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from Products_Module import cache_warmup
+
+
+class Command(BaseCommand):
+    help = 'ساخت از پیش کلیدهای کش کاتالوگ، ایندکس‌ها و داده محصولات پربازدید'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top-products', type=int, help='تعداد محصولات پربازدید (پیش‌فرض: CACHE_WARM_TOP_PRODUCTS)')
+        parser.add_argument('--workers', type=int, help='تعداد threadها (پیش‌فرض: CACHE_WARM_WORKERS)')
+        parser.add_argument('--force', action='store_true', help='ساخت دوباره کلیدهایی که هنوز تازه‌اند')
+
+    def handle(self, *args, **options):
+        results = cache_warmup.warm(
+            top_products=options['top_products'], workers=options['workers'], force=options['force'],
+        )
+        width = max(len(result.name) for result in results)
+        for result in results:
+            status = self.style.ERROR(result.error) if result.error else self.style.SUCCESS('ok')
+            self.stdout.write(f'{result.name:<{width}}  {result.seconds:>8.3f}s  {status}')
+
+        failed = [result.name for result in results if result.error]
+        if failed:
+            raise CommandError(f'{len(failed)} کار گرم کردن ناموفق بود: {", ".join(failed)}')
+        self.stdout.write(self.style.SUCCESS(f'{len(results)} کار گرم کردن کش انجام شد.'))
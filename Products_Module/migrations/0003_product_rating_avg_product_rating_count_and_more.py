@@ -0,0 +1,51 @@
+# Generated manually - ستون‌های خلاصه امتیاز محصول و ایندکس مرتب‌سازی بر اساس امتیاز
+
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import Avg, Count
+
+
+def backfill_ratings(apps, schema_editor):
+    """پر کردن rating_avg و rating_count از نظرات تایید شده موجود"""
+    Product = apps.get_model('Products_Module', 'Product')
+    ProductReview = apps.get_model('Products_Module', 'ProductReview')
+
+    stats = ProductReview.objects.filter(is_approved=True).values('product_id').annotate(
+        avg=Avg('rating'),
+        count=Count('id'),
+    ).order_by()
+    products = [
+        Product(
+            pk=row['product_id'],
+            rating_avg=Decimal(str(row['avg'])).quantize(Decimal('0.01')),
+            rating_count=row['count'],
+        )
+        for row in stats
+    ]
+    Product.objects.bulk_update(products, ['rating_avg', 'rating_count'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Products_Module', '0002_productreview_user'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='rating_avg',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=3, verbose_name='میانگین امتیاز'),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='تعداد امتیازها'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['-rating_avg', '-rating_count'], name='product_rating_idx'),
+        ),
+        migrations.RunPython(backfill_ratings, migrations.RunPython.noop),
+    ]
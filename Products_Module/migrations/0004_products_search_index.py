@@ -0,0 +1,77 @@
+# Generated manually - جدول مجازی FTS5 برای جستجوی محصولات (فقط SQLite)
+
+import re
+
+from django.db import migrations, OperationalError
+
+FTS_TABLE = 'products_search_index'
+
+# کپی ثابت search_index.normalize_text در زمان این مایگریشن؛ تغییرات بعدی ماژول
+# نباید رفتار مایگریشن را عوض کند
+_CHAR_MAP = str.maketrans({
+    '\u064a': '\u06cc', '\u0649': '\u06cc', '\u0626': '\u06cc',
+    '\u0643': '\u06a9',
+    '\u0629': '\u0647', '\u06c0': '\u0647',
+    '\u0623': '\u0627', '\u0625': '\u0627', '\u0622': '\u0627', '\u0671': '\u0627',
+    '\u0624': '\u0648',
+    '\u200c': ' ',
+    '\u200d': '', '\u200e': '', '\u200f': '',
+    '\u0640': '',
+    **{chr(0x06F0 + i): str(i) for i in range(10)},
+    **{chr(0x0660 + i): str(i) for i in range(10)},
+})
+_DIACRITICS_RE = re.compile('[\u064b-\u065f\u0670]')
+
+
+def normalize_text(text):
+    if not text:
+        return ''
+    return _DIACRITICS_RE.sub('', text.translate(_CHAR_MAP)).lower()
+
+
+def create_search_index(apps, schema_editor):
+    """ساخت جدول FTS5 و ایندکس محصولات فعال موجود؛ بدون FTS5، backend پایتونی استفاده می‌شود"""
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+
+    try:
+        schema_editor.execute(
+            f'CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5('
+            f"name, description, category, brand, tokenize = 'unicode61 remove_diacritics 2')"
+        )
+    except OperationalError:
+        # SQLite بدون ماژول FTS5 کامپایل شده است
+        return
+
+    Product = apps.get_model('Products_Module', 'Product')
+    rows = [
+        [
+            product.pk,
+            normalize_text(product.name),
+            normalize_text(product.description),
+            normalize_text(product.category.name if product.category_id else ''),
+            normalize_text(product.brand.name if product.brand_id else ''),
+        ]
+        for product in Product.objects.filter(is_active=True).select_related('category', 'brand')
+    ]
+    with schema_editor.connection.cursor() as cursor:
+        cursor.executemany(
+            f'INSERT INTO {FTS_TABLE} (rowid, name, description, category, brand) VALUES (%s, %s, %s, %s, %s)',
+            rows,
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Products_Module', '0003_product_rating_avg_product_rating_count_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
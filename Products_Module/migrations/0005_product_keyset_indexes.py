@@ -0,0 +1,25 @@
+# Generated manually - ایندکس‌های (ستون مرتب‌سازی، id) برای صفحه‌بندی keyset لیست محصولات
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Products_Module', '0004_products_search_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['-views_count', 'id'], name='product_views_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['price', 'id'], name='product_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['-created_at', 'id'], name='product_created_idx'),
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated manually - مسیر درختی (materialized path) دسته‌بندی‌ها
+
+from django.db import migrations, models
+
+PATH_STEP = 6
+
+
+def backfill_paths(apps, schema_editor):
+    """محاسبه path و depth همه دسته‌های موجود از روی parent"""
+    Category = apps.get_model('Products_Module', 'Category')
+    parents = dict(Category.objects.values_list('id', 'parent_id'))
+    paths = {}
+
+    def build(category_id, seen=()):
+        if category_id not in paths:
+            parent_id = parents[category_id]
+            # والد نامعتبر یا حلقه: دسته به عنوان ریشه در نظر گرفته می‌شود
+            if parent_id is None or parent_id not in parents or parent_id in seen:
+                prefix = ''
+            else:
+                prefix = build(parent_id, seen + (category_id,))
+            paths[category_id] = f'{prefix}{category_id:0{PATH_STEP}d}/'
+        return paths[category_id]
+
+    categories = []
+    for category_id in parents:
+        path = build(category_id)
+        categories.append(Category(pk=category_id, path=path, depth=len(path) // (PATH_STEP + 1) - 1))
+    Category.objects.bulk_update(categories, ['path', 'depth'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Products_Module', '0005_product_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='path',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=255, verbose_name='مسیر درختی'),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='depth',
+            field=models.PositiveSmallIntegerField(default=0, editable=False, verbose_name='عمق'),
+        ),
+        migrations.RunPython(backfill_paths, migrations.RunPython.noop),
+    ]
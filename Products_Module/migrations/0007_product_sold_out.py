@@ -0,0 +1,19 @@
+# Generated manually - علامت ناموجود شدن محصول با اتمام موجودی (در برابر ناموجود کردن دستی)
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Products_Module', '0006_category_path_depth'),
+    ]
+
+    # محصولات ناموجود فعلی علامت نمی‌خورند: معلوم نیست دستی ناموجود شده‌اند یا با اتمام موجودی
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='sold_out',
+            field=models.BooleanField(default=False, editable=False, verbose_name='اتمام موجودی'),
+        ),
+    ]
@@ -1,8 +1,16 @@
 from django.db import models
+from django.db.models import F, Value
+from django.db.models.functions import Concat, Substr
 from django.conf import settings
+from django.core.exceptions import ValidationError
 from django.utils.text import slugify
 from django.urls import reverse
 
+# طول هر بخش مسیر درختی دسته‌بندی (شناسه با صفر پر شده)
+CATEGORY_PATH_STEP = 6
+# تعداد تصاویری که کارت محصول نشان می‌دهد (annotate های card_image_N در fragments.card_products)
+CARD_IMAGE_COUNT = 3
+
 
 class Category(models.Model):
     """مدل دسته‌بندی محصولات"""
@@ -12,6 +20,9 @@ class Category(models.Model):
     parent = models.ForeignKey('self', on_delete=models.CASCADE, null=True, blank=True, related_name='children',
                                verbose_name='دسته والد')
     is_active = models.BooleanField(default=True, verbose_name='فعال')
+    # مسیر درختی: شناسه اجداد و خود دسته، هر کدام CATEGORY_PATH_STEP رقمی و با / - در save به‌روز می‌شود
+    path = models.CharField(max_length=255, default='', editable=False, db_index=True, verbose_name='مسیر درختی')
+    depth = models.PositiveSmallIntegerField(default=0, editable=False, verbose_name='عمق')
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='تاریخ ایجاد')
     updated_at = models.DateTimeField(auto_now=True, verbose_name='تاریخ به‌روزرسانی')
 
@@ -27,18 +38,57 @@ class Category(models.Model):
     def __str__(self):
         return self.name
 
+    def clean(self):
+        super().clean()
+        if self.pk and self.parent_id:
+            parent_path = Category.objects.filter(pk=self.parent_id).values_list('path', flat=True).first() or ''
+            if self.parent_id == self.pk or (self.path and parent_path.startswith(self.path)):
+                raise ValidationError({'parent': 'دسته والد نمی‌تواند خود دسته یا یکی از زیردسته‌های آن باشد.'})
+
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.name, allow_unicode=True)
         super().save(*args, **kwargs)
+        self._update_path()
+
+    def _update_path(self):
+        """محاسبه مسیر از مسیر والد؛ با جابجایی دسته، مسیر همه زیردسته‌ها با یک UPDATE اصلاح می‌شود"""
+        parent_path, parent_depth = '', -1
+        if self.parent_id:
+            parent_path, parent_depth = Category.objects.filter(pk=self.parent_id).values_list(
+                'path', 'depth',
+            ).get()
+        new_path = f'{parent_path}{self.pk:0{CATEGORY_PATH_STEP}d}/'
+        new_depth = parent_depth + 1
+        old_path, old_depth = Category.objects.filter(pk=self.pk).values_list('path', 'depth').get()
+        if new_path == old_path:
+            return
+        Category.objects.filter(pk=self.pk).update(path=new_path, depth=new_depth)
+        if old_path:
+            Category.objects.filter(path__startswith=old_path).exclude(pk=self.pk).update(
+                path=Concat(Value(new_path), Substr('path', len(old_path) + 1)),
+                depth=F('depth') + (new_depth - old_depth),
+            )
+        self.path, self.depth = new_path, new_depth
 
     def get_absolute_url(self):
         return reverse('products:category', kwargs={'slug': self.slug})
 
+    def get_descendants(self, include_self=True):
+        """کل زیردرخت با یک کوئری روی ایندکس path"""
+        if self.path:
+            descendants = Category.objects.filter(path__startswith=self.path)
+        else:
+            # مسیر هنوز ساخته نشده (مثلاً داده loaddata)؛ دستور rebuild_category_tree
+            from .category_tree import descendant_ids
+            descendants = Category.objects.filter(pk__in=descendant_ids(self.pk, active_only=False))
+        return descendants if include_self else descendants.exclude(pk=self.pk)
+
     @property
     def products_count(self):
-        """تعداد محصولات در این دسته‌بندی"""
-        return self.products.filter(is_active=True, is_available=True).count()
+        """تعداد محصولات فعال و موجود این دسته و زیردسته‌هایش (از کش، بدون کوئری به ازای هر دسته)"""
+        from .category_tree import product_counts
+        return product_counts().get(self.pk, 0)
 
 
 class Brand(models.Model):
@@ -95,12 +145,19 @@ class Product(models.Model):
 
     stock = models.IntegerField(default=0, verbose_name='موجودی انبار')
     is_available = models.BooleanField(default=True, verbose_name='موجود است')
+    # ناموجود شده با اتمام موجودی (Cart_Module.inventory)؛ فقط این محصولات با برگشت
+    # موجودی دوباره موجود می‌شوند و محصولی که ادمین ناموجود کرده ناموجود می‌ماند
+    sold_out = models.BooleanField(default=False, editable=False, verbose_name='اتمام موجودی')
     is_active = models.BooleanField(default=True, verbose_name='فعال')
 
     label = models.CharField(max_length=10, choices=LABEL_CHOICES, blank=True, null=True, verbose_name='برچسب')
 
     views_count = models.IntegerField(default=0, verbose_name='تعداد بازدید')
 
+    # خلاصه امتیاز نظرات تایید شده - توسط سیگنال ProductReview به‌روز می‌شود
+    rating_avg = models.DecimalField(max_digits=3, decimal_places=2, default=0, verbose_name='میانگین امتیاز')
+    rating_count = models.PositiveIntegerField(default=0, verbose_name='تعداد امتیازها')
+
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='تاریخ ایجاد')
     updated_at = models.DateTimeField(auto_now=True, verbose_name='تاریخ به‌روزرسانی')
 
@@ -111,14 +168,16 @@ class Product(models.Model):
         indexes = [
             # Index for filtering by active status and availability
             models.Index(fields=['is_active', 'is_available'], name='product_active_avail_idx'),
-            # Index for ordering by views (trending products)
-            models.Index(fields=['-views_count'], name='product_views_idx'),
+            # Index for ordering by views (trending products, keyset pagination)
+            models.Index(fields=['-views_count', 'id'], name='product_views_idx'),
             # Index for category filtering
             models.Index(fields=['category', 'is_active'], name='product_category_idx'),
-            # Index for price range filtering
-            models.Index(fields=['price'], name='product_price_idx'),
-            # Index for created_at ordering
-            models.Index(fields=['-created_at'], name='product_created_idx'),
+            # Index for price range filtering and price keyset pagination
+            models.Index(fields=['price', 'id'], name='product_price_idx'),
+            # Index for created_at ordering and keyset pagination
+            models.Index(fields=['-created_at', 'id'], name='product_created_idx'),
+            # Index for rating ordering (sort=rating)
+            models.Index(fields=['-rating_avg', '-rating_count'], name='product_rating_idx'),
         ]
 
     def __str__(self):
@@ -127,6 +186,8 @@ class Product(models.Model):
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.name, allow_unicode=True)
+        if self.is_available:
+            self.sold_out = False
         super().save(*args, **kwargs)
 
     def get_absolute_url(self):
@@ -141,15 +202,25 @@ class Product(models.Model):
 
     @property
     def average_rating(self):
-        """میانگین امتیاز - با استفاده از aggregation برای عملکرد بهتر"""
-        from django.db.models import Avg
-        result = self.reviews.filter(is_approved=True).aggregate(avg_rating=Avg('rating'))
-        return result['avg_rating'] or 0
+        """میانگین امتیاز - از ستون ذخیره شده rating_avg (بدون کوئری)"""
+        return self.rating_avg or 0
 
     def get_rating_percentage(self):
         """درصد امتیاز برای نمایش ستاره‌ها"""
         return int((self.average_rating / 5) * 100)
 
+    @property
+    def card_images(self):
+        """
+        فایل حداکثر CARD_IMAGE_COUNT تصویر اول محصول (ImageFieldFile) برای کارت.
+        از مسیرهای annotate شده (card_image_N) خوانده می‌شود؛ بدون آن‌ها از images.
+        """
+        if not hasattr(self, 'card_image_0'):
+            return [image.image for image in self.images.all()[:CARD_IMAGE_COUNT]]
+        field = ProductImage._meta.get_field('image')
+        paths = (getattr(self, f'card_image_{n}') for n in range(CARD_IMAGE_COUNT))
+        return [field.attr_class(None, field, path) for path in paths if path]
+
 
 class ProductImage(models.Model):
     """مدل تصاویر محصول"""
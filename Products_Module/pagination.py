@@ -0,0 +1,268 @@
+"""
+صفحه‌بندی keyset (cursor) برای لیست محصولات
+
+به جای OFFSET، هر صفحه با شرط «بعد از آخرین ردیف صفحه قبل» روی ستون‌های
+مرتب‌سازی به همراه id خوانده می‌شود؛ هزینه صفحه‌های عمیق با صفحه اول یکسان است.
+cursor ها توکن امضا شده (django.core.signing) هستند و تعداد کل نتایج به جای
+COUNT(*) در هر درخواست، برای مدت کوتاهی کش می‌شود.
+
+تنظیمات (settings.py):
+    PRODUCT_LIST_COUNT_TIMEOUT: مدت کش تعداد کل نتایج یک لیست به ثانیه
+"""
+import hashlib
+import math
+from datetime import datetime
+from decimal import Decimal
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet, ValidationError
+from django.db.models import Q
+
+from .models import Product
+
+CURSOR_SALT = 'products.listing.cursor'
+DEFAULT_COUNT_TIMEOUT = 60 * 5
+DEFAULT_SORT = 'popularity'
+RELEVANCE_SORT = 'relevance'
+
+# ستون‌های مرتب‌سازی هر sort: (نام فیلد، نزولی)؛ id همیشه به عنوان ستون آخر اضافه می‌شود
+SORT_KEYS = {
+    'popularity': (('views_count', True),),
+    'date': (('created_at', True),),
+    'price_low': (('price', False),),
+    'price_high': (('price', True),),
+    'rating': (('rating_avg', True), ('rating_count', True)),
+}
+
+
+def normalize_sort(sort, allow_relevance=False):
+    """sort معتبر؛ مقدار ناشناخته به پیش‌فرض برمی‌گردد"""
+    if sort == RELEVANCE_SORT and allow_relevance:
+        return sort
+    return sort if sort in SORT_KEYS else DEFAULT_SORT
+
+
+def sort_keys(sort):
+    return SORT_KEYS[sort] + (('id', False),)
+
+
+def ordering(sort, reverse=False):
+    """آرگومان‌های order_by برای sort (reverse: برای خواندن صفحه قبل)"""
+    return [
+        f'-{field}' if descending != reverse else field
+        for field, descending in sort_keys(sort)
+    ]
+
+
+def count_timeout():
+    return getattr(settings, 'PRODUCT_LIST_COUNT_TIMEOUT', DEFAULT_COUNT_TIMEOUT)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# توکن cursor
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _dump_value(value):
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def encode_cursor(sort, offset, values=None, direction='n'):
+    """
+    توکن مات یک صفحه:
+        offset: جایگاه اولین ردیف صفحه (برای شماره صفحه و نمایش «x - y از n»)
+        values: مقادیر ستون‌های مرتب‌سازی ردیف مرز
+        direction: 'n' ردیف‌های بعد از مرز، 'p' ردیف‌های قبل از مرز
+    """
+    payload = {'s': sort, 'o': offset, 'd': direction}
+    if values is not None:
+        payload['k'] = [_dump_value(value) for value in values]
+    return signing.dumps(payload, salt=CURSOR_SALT, compress=True)
+
+
+def decode_cursor(token, sort):
+    """payload توکن؛ توکن خالی، دستکاری شده یا مربوط به sort دیگر None است"""
+    if not token:
+        return None
+    try:
+        payload = signing.loads(token, salt=CURSOR_SALT)
+    except signing.BadSignature:
+        return None
+    if not isinstance(payload, dict) or payload.get('s') != sort:
+        return None
+    keys = sort_keys(sort) if sort in SORT_KEYS else ()
+    if 'k' in payload:
+        if len(payload['k']) != len(keys):
+            return None
+        try:
+            payload['k'] = [
+                Product._meta.get_field(field).to_python(value)
+                for (field, _), value in zip(keys, payload['k'])
+            ]
+        except ValidationError:
+            return None
+    return payload
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# صفحه و صفحه‌بندی
+# ─────────────────────────────────────────────────────────────────────────────
+
+class CursorPage:
+    """صفحه‌ای از نتایج با لینک‌های cursor؛ ویژگی‌هایش هم‌نام Page جنگو هستند"""
+
+    def __init__(self, object_list, offset, per_page, count, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.offset = offset
+        self.per_page = per_page
+        self.count = count
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    @property
+    def number(self):
+        return self.offset // self.per_page + 1
+
+    @property
+    def num_pages(self):
+        return max(math.ceil(self.count / self.per_page), 1)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+    def start_index(self):
+        return self.offset + 1 if self.object_list else 0
+
+    def end_index(self):
+        return self.offset + len(self.object_list)
+
+
+class CursorPaginator:
+    """
+    صفحه‌بندی keyset روی یک QuerySet.
+    count: تعداد کل در صورت معلوم بودن (مثلاً از ایندکس facet)؛ در غیر این صورت
+    COUNT(*) کوئری فیلتر شده با کلیدی از روی SQL آن کش می‌شود.
+    """
+
+    def __init__(self, queryset, sort, per_page=12, count=None):
+        self.queryset = queryset
+        self.sort = sort
+        self.per_page = per_page
+        self._count = count
+
+    @property
+    def count(self):
+        if self._count is None:
+            self._count = self._cached_count()
+        return self._count
+
+    def _cached_count(self):
+        queryset = self.queryset.order_by()
+        try:
+            sql, params = queryset.query.sql_with_params()
+        except EmptyResultSet:
+            return 0
+        digest = hashlib.md5(f'{sql}|{params}'.encode(), usedforsecurity=False).hexdigest()
+        key = f'product_listing_count_{digest}'
+        count = cache.get(key)
+        if count is None:
+            count = queryset.count()
+            cache.set(key, count, count_timeout())
+        return count
+
+    def _seek(self, values, forward):
+        """شرط «بعد از» (یا «قبل از») ردیف مرز روی ستون‌های مرتب‌سازی"""
+        condition = Q()
+        equal = {}
+        for (field, descending), value in zip(sort_keys(self.sort), values):
+            lookup = 'lt' if descending == forward else 'gt'
+            condition |= Q(**equal, **{f'{field}__{lookup}': value})
+            equal[field] = value
+        return condition
+
+    def _cursor(self, row, offset, direction):
+        values = [getattr(row, field) for field, _ in sort_keys(self.sort)]
+        return encode_cursor(self.sort, max(offset, 0), values, direction)
+
+    def get_page(self, token=None):
+        cursor = decode_cursor(token, self.sort)
+        forward = cursor is None or cursor.get('d') != 'p'
+        offset = cursor['o'] if cursor else 0
+
+        queryset = self.queryset.order_by(*ordering(self.sort, reverse=not forward))
+        if cursor and 'k' in cursor:
+            queryset = queryset.filter(self._seek(cursor['k'], forward))
+        rows = list(queryset[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if not forward:
+            rows.reverse()
+
+        if forward:
+            has_next, has_previous = has_more, offset > 0
+        else:
+            # صفحه قبل از ابتدای لیست خوانده شد: شماره‌گذاری از صفر
+            has_next, has_previous = True, has_more
+            if not has_more:
+                offset = 0
+
+        next_cursor = previous_cursor = None
+        if rows and has_next:
+            next_cursor = self._cursor(rows[-1], offset + len(rows), 'n')
+        if rows and has_previous:
+            previous_cursor = self._cursor(rows[0], offset - self.per_page, 'p')
+        return CursorPage(rows, offset, self.per_page, self.count, next_cursor, previous_cursor)
+
+
+class RankedIdPaginator:
+    """
+    صفحه‌بندی cursor روی لیست شناسه‌های رتبه‌بندی شده (مثلاً نتایج جستجو)؛
+    فقط محصولات همان صفحه با in_bulk خوانده می‌شوند.
+    """
+
+    def __init__(self, queryset, ranked_ids, per_page=12):
+        self.queryset = queryset
+        self.ranked_ids = ranked_ids
+        self.per_page = per_page
+        self.count = len(ranked_ids)
+
+    def get_page(self, token=None):
+        cursor = decode_cursor(token, RELEVANCE_SORT)
+        offset = cursor['o'] if cursor else 0
+        if not 0 <= offset < self.count:
+            offset = 0
+        page_ids = self.ranked_ids[offset:offset + self.per_page]
+        products = self.queryset.in_bulk(page_ids)
+        rows = [products[pk] for pk in page_ids if pk in products]
+
+        next_cursor = previous_cursor = None
+        if offset + self.per_page < self.count:
+            next_cursor = encode_cursor(RELEVANCE_SORT, offset + self.per_page)
+        if offset > 0:
+            previous_cursor = encode_cursor(RELEVANCE_SORT, max(offset - self.per_page, 0))
+        return CursorPage(rows, offset, self.per_page, self.count, next_cursor, previous_cursor)
+
+
+def listing_query_string(get_params):
+    """پارامترهای GET بدون cursor و page، برای لینک‌های صفحه‌بندی و مرتب‌سازی"""
+    params = get_params.copy()
+    for name in ('cursor', 'page'):
+        params.pop(name, None)
+    return params.urlencode()
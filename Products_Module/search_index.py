@@ -0,0 +1,345 @@
+"""
+ایندکس جستجوی متنی محصولات
+
+متن محصول (نام، توضیحات، نام دسته و برند) پس از نرمال‌سازی فارسی
+(ی/ک عربی، نیم‌فاصله، اعراب، ارقام فارسی و عربی) توکن‌بندی و ایندکس می‌شود.
+
+دو backend وجود دارد:
+    fts5:   جدول مجازی FTS5 در SQLite با رتبه‌بندی bm25
+    python: ایندکس معکوس درون حافظه (برای دیتابیس‌های بدون FTS5)
+
+انتخاب backend با تنظیم PRODUCT_SEARCH_BACKEND ('auto' | 'fts5' | 'python').
+ایندکس با سیگنال‌های ذخیره/حذف محصول، دسته و برند همگام می‌ماند و دستور
+rebuild_search_index آن را از صفر می‌سازد.
+"""
+import bisect
+import math
+import re
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import DatabaseError, connection
+
+from .index_sync import SyncedIndex
+from .models import Product
+
+FTS_TABLE = 'products_search_index'
+VERSION_CACHE_KEY = 'product_search_index_version'
+DEFAULT_MAX_RESULTS = 1000
+
+# وزن هر فیلد در رتبه‌بندی
+FIELD_WEIGHTS = (
+    ('name', 10.0),
+    ('description', 1.0),
+    ('category', 4.0),
+    ('brand', 4.0),
+)
+_FIELD_WEIGHT = dict(FIELD_WEIGHTS)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# نرمال‌سازی و توکن‌بندی فارسی
+# ─────────────────────────────────────────────────────────────────────────────
+
+_CHAR_MAP = str.maketrans({
+    '\u064a': '\u06cc', '\u0649': '\u06cc', '\u0626': '\u06cc',  # ی عربی ← ی فارسی
+    '\u0643': '\u06a9',  # ک عربی ← ک فارسی
+    '\u0629': '\u0647', '\u06c0': '\u0647',  # ة و ۀ ← ه
+    '\u0623': '\u0627', '\u0625': '\u0627', '\u0622': '\u0627', '\u0671': '\u0627',  # أ إ آ ٱ ← ا
+    '\u0624': '\u0648',  # ؤ ← و
+    '\u200c': ' ',  # نیم‌فاصله: «می‌شود» و «می شود» یکسان
+    '\u200d': '', '\u200e': '', '\u200f': '',  # کاراکترهای اتصال و جهت
+    '\u0640': '',  # کشیده
+    **{chr(0x06F0 + i): str(i) for i in range(10)},  # ارقام فارسی
+    **{chr(0x0660 + i): str(i) for i in range(10)},  # ارقام عربی
+})
+_DIACRITICS_RE = re.compile('[\u064b-\u065f\u0670]')
+_TOKEN_RE = re.compile(r'\w+')
+
+
+def normalize_text(text):
+    """یکسان‌سازی نویسه‌های فارسی/عربی، حذف اعراب و کوچک کردن حروف لاتین"""
+    if not text:
+        return ''
+    return _DIACRITICS_RE.sub('', text.translate(_CHAR_MAP)).lower()
+
+
+def tokenize(text):
+    """لیست توکن‌های متن نرمال شده"""
+    return _TOKEN_RE.findall(normalize_text(text))
+
+
+def _max_results():
+    return getattr(settings, 'PRODUCT_SEARCH_MAX_RESULTS', DEFAULT_MAX_RESULTS)
+
+
+def _document(product):
+    """فیلدهای نرمال شده یک محصول برای ایندکس"""
+    return {
+        'name': normalize_text(product.name),
+        'description': normalize_text(product.description),
+        'category': normalize_text(product.category.name if product.category_id else ''),
+        'brand': normalize_text(product.brand.name if product.brand_id else ''),
+    }
+
+
+def indexable_products():
+    """محصولات فعال با ستون‌های لازم برای ایندکس"""
+    return Product.objects.filter(is_active=True).select_related('category', 'brand').only(
+        'id', 'name', 'description', 'is_active', 'category__name', 'brand__name',
+    )
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Backend: SQLite FTS5
+# ─────────────────────────────────────────────────────────────────────────────
+
+class FTS5Backend:
+    """جستجو با جدول مجازی FTS5؛ rowid هر ردیف همان شناسه محصول است"""
+
+    name = 'fts5'
+
+    @staticmethod
+    def is_available():
+        if connection.vendor != 'sqlite':
+            return False
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [FTS_TABLE],
+                )
+                return cursor.fetchone() is not None
+        except DatabaseError:
+            return False
+
+    def index_products(self, products):
+        rows = []
+        for product in products:
+            doc = _document(product)
+            rows.append([product.pk] + [doc[field] for field, _ in FIELD_WEIGHTS])
+        if not rows:
+            return
+        with connection.cursor() as cursor:
+            cursor.executemany(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [[row[0]] for row in rows])
+            cursor.executemany(
+                f'INSERT INTO {FTS_TABLE} (rowid, name, description, category, brand) '
+                f'VALUES (%s, %s, %s, %s, %s)',
+                rows,
+            )
+
+    def remove_products(self, product_ids):
+        with connection.cursor() as cursor:
+            cursor.executemany(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [[pk] for pk in product_ids])
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+
+    def warm(self):
+        """ایندکس در دیتابیس است؛ چیزی برای ساخت در حافظه نیست"""
+
+    def search(self, query, limit=None):
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        # هر توکن به صورت پیشوندی؛ توکن‌ها با AND ضمنی ترکیب می‌شوند
+        match = ' '.join(f'"{token}"*' for token in tokens)
+        weights = ', '.join(str(weight) for _, weight in FIELD_WEIGHTS)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s '
+                f'ORDER BY bm25({FTS_TABLE}, {weights}) LIMIT %s',
+                [match, limit or _max_results()],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Backend: ایندکس معکوس درون حافظه
+# ─────────────────────────────────────────────────────────────────────────────
+
+class InvertedIndexBackend(SyncedIndex):
+    """
+    ایندکس معکوس پایتونی: {توکن: {شناسه محصول: وزن}}.
+    هر پروسه نسخه خودش را دارد و با نسخه مشترک در کش همگام می‌ماند (index_sync).
+    """
+
+    name = 'python'
+    version_key = VERSION_CACHE_KEY
+
+    def __init__(self):
+        super().__init__()
+        self._postings = defaultdict(dict)
+        self._doc_tokens = {}
+        self._sorted_tokens = []
+
+    @staticmethod
+    def is_available():
+        return True
+
+    def warm(self):
+        """ساخت ایندکس این پروسه پیش از اولین جستجو"""
+        with self._lock:
+            self._ensure_fresh()
+
+    def _load_state(self):
+        postings = defaultdict(dict)
+        doc_tokens = {}
+        for product in indexable_products().iterator(chunk_size=2000):
+            self._add_to(postings, doc_tokens, product)
+        return postings, doc_tokens
+
+    def _install(self, state):
+        self._postings, self._doc_tokens = state
+        self._sorted_tokens = sorted(self._postings)
+
+    @staticmethod
+    def _add_to(postings, doc_tokens, product):
+        weights = defaultdict(float)
+        for field, text in _document(product).items():
+            for token in _TOKEN_RE.findall(text):
+                weights[token] += _FIELD_WEIGHT[field]
+        for token, weight in weights.items():
+            postings[token][product.pk] = weight
+        doc_tokens[product.pk] = set(weights)
+
+    def _discard(self, product_id):
+        for token in self._doc_tokens.pop(product_id, ()):
+            postings = self._postings.get(token)
+            if postings is not None:
+                postings.pop(product_id, None)
+                if not postings:
+                    del self._postings[token]
+
+    def index_products(self, products):
+        with self._lock:
+            self._ensure_fresh()
+            for product in products:
+                self._discard(product.pk)
+                self._add_to(self._postings, self._doc_tokens, product)
+            self._sorted_tokens = sorted(self._postings)
+            self._bump_version()
+
+    def remove_products(self, product_ids):
+        with self._lock:
+            self._ensure_fresh()
+            for product_id in product_ids:
+                self._discard(product_id)
+            self._sorted_tokens = sorted(self._postings)
+            self._bump_version()
+
+    def clear(self):
+        with self._lock:
+            self._replace((defaultdict(dict), {}), self._shared_version())
+            self._bump_version()
+
+    def _prefix_postings(self, prefix):
+        """ادغام postings همه توکن‌هایی که با prefix شروع می‌شوند"""
+        merged = {}
+        start = bisect.bisect_left(self._sorted_tokens, prefix)
+        for token in self._sorted_tokens[start:]:
+            if not token.startswith(prefix):
+                break
+            for product_id, weight in self._postings[token].items():
+                if weight > merged.get(product_id, 0):
+                    merged[product_id] = weight
+        return merged
+
+    def search(self, query, limit=None):
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        with self._lock:
+            self._ensure_fresh()
+            total_docs = len(self._doc_tokens) or 1
+            scores = None
+            for token in tokens:
+                postings = self._prefix_postings(token)
+                if not postings:
+                    return []
+                idf = math.log(1 + total_docs / len(postings))
+                if scores is None:
+                    scores = {pid: weight * idf for pid, weight in postings.items()}
+                else:
+                    scores = {
+                        pid: score + postings[pid] * idf
+                        for pid, score in scores.items() if pid in postings
+                    }
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return [product_id for product_id, _ in ranked[:limit or _max_results()]]
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# رابط عمومی
+# ─────────────────────────────────────────────────────────────────────────────
+
+BACKENDS = {
+    FTS5Backend.name: FTS5Backend,
+    InvertedIndexBackend.name: InvertedIndexBackend,
+}
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    """backend انتخاب شده طبق PRODUCT_SEARCH_BACKEND (auto: FTS5 در صورت وجود)"""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                choice = getattr(settings, 'PRODUCT_SEARCH_BACKEND', 'auto')
+                if choice == 'auto':
+                    choice = FTS5Backend.name if FTS5Backend.is_available() else InvertedIndexBackend.name
+                _backend = BACKENDS[choice]()
+    return _backend
+
+
+def reset_backend():
+    """فراموش کردن backend انتخاب شده (مثلاً پس از تغییر تنظیمات)"""
+    global _backend
+    _backend = None
+
+
+def warm():
+    get_backend().warm()
+
+
+def search(query, limit=None):
+    """شناسه محصولات مرتبط، به ترتیب رتبه"""
+    return get_backend().search(query, limit)
+
+
+def index_products(products):
+    """ایندکس یا حذف محصولات بر اساس فعال بودن"""
+    products = list(products)
+    backend = get_backend()
+    active = [product for product in products if product.is_active]
+    inactive = [product.pk for product in products if not product.is_active]
+    if active:
+        backend.index_products(active)
+    if inactive:
+        backend.remove_products(inactive)
+
+
+def remove_products(product_ids):
+    get_backend().remove_products(list(product_ids))
+
+
+def rebuild(batch_size=2000):
+    """بازسازی کامل ایندکس؛ برمی‌گرداند: تعداد محصولات ایندکس شده"""
+    backend = get_backend()
+    backend.clear()
+    count = 0
+    batch = []
+    for product in indexable_products().iterator(chunk_size=batch_size):
+        batch.append(product)
+        if len(batch) >= batch_size:
+            backend.index_products(batch)
+            count += len(batch)
+            batch = []
+    if batch:
+        backend.index_products(batch)
+        count += len(batch)
+    return count
@@ -0,0 +1,80 @@
+"""
+سرویس‌های ماژول محصولات
+"""
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Avg, Count
+from django.utils import timezone
+
+from . import cache_fill, cache_keys, fragments
+from .models import Product, ProductReview
+
+RATING_PRECISION = Decimal('0.01')
+
+
+def _rating_value(avg):
+    """گرد کردن میانگین امتیاز به دقت ستون rating_avg"""
+    if avg is None:
+        return Decimal('0')
+    return Decimal(str(avg)).quantize(RATING_PRECISION)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# خلاصه امتیاز محصولات (rating_avg / rating_count)
+# ─────────────────────────────────────────────────────────────────────────────
+
+def refresh_product_rating(product_id):
+    """
+    بازمحاسبه امتیاز یک محصول از نظرات تایید شده و ذخیره با یک UPDATE فقط اگر
+    امتیاز عوض شده باشد (updated_at هم جلو می‌رود تا کارت کش شده محصول با امتیاز
+    جدید رندر شود؛ نظر در انتظار تایید کارت را باطل نمی‌کند).
+    برمی‌گرداند: (rating_avg, rating_count)
+    """
+    stats = ProductReview.objects.filter(product_id=product_id, is_approved=True).aggregate(
+        avg=Avg('rating'),
+        count=Count('id'),
+    )
+    rating_avg = _rating_value(stats['avg'])
+    rating_count = stats['count']
+    Product.objects.filter(pk=product_id).exclude(rating_avg=rating_avg, rating_count=rating_count).update(
+        rating_avg=rating_avg, rating_count=rating_count, updated_at=timezone.now(),
+    )
+    return rating_avg, rating_count
+
+
+def rebuild_product_ratings(batch_size=1000):
+    """
+    بازسازی امتیاز همه محصولات به صورت دسته‌ای.
+    یک کوئری GROUP BY روی نظرات، صفر کردن بقیه و bulk_update در دسته‌های batch_size.
+    برمی‌گرداند: تعداد محصولاتی که نظر تایید شده دارند
+    """
+    stats = ProductReview.objects.filter(is_approved=True).values('product_id').annotate(
+        avg=Avg('rating'),
+        count=Count('id'),
+    ).order_by()
+
+    products = [
+        Product(pk=row['product_id'], rating_avg=_rating_value(row['avg']), rating_count=row['count'])
+        for row in stats
+    ]
+
+    with transaction.atomic():
+        Product.objects.exclude(rating_count=0, rating_avg=0).update(rating_avg=0, rating_count=0)
+        Product.objects.bulk_update(products, ['rating_avg', 'rating_count'], batch_size=batch_size)
+    fragments.invalidate_fragment('product_card')
+
+    return len(products)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# نظرات تایید شده (صفحه جزئیات محصول)
+# ─────────────────────────────────────────────────────────────────────────────
+
+def load_approved_reviews(product_id):
+    return list(ProductReview.objects.filter(product_id=product_id, is_approved=True).order_by('-created_at'))
+
+
+def approved_reviews(product_id):
+    """نظرات تایید شده یک محصول - کش شده؛ سیگنال ذخیره/حذف نظر آن را باطل می‌کند"""
+    return cache_fill.get_or_build(cache_keys.product_reviews_key(product_id), lambda: load_approved_reviews(product_id))
@@ -0,0 +1,120 @@
+"""
+سیگنال‌های ابطال کش کاتالوگ و کارت محصولات، به‌روزرسانی امتیاز محصول،
+همگام‌سازی ایندکس‌های جستجو و فیلتر (facet) و ساخت و حذف نسخه‌های واکنش‌گرای تصاویر
+
+با ذخیره یا حذف محصول، دسته‌بندی، برند، تصویر یا نظر فقط کلیدهای کش
+وابسته (طبق cache_keys.KEY_DEPENDENCIES) پاک می‌شوند.
+به‌روزرسانی‌های QuerySet.update (مثل شمارنده بازدید) سیگنال ندارند و کش را پاک نمی‌کنند.
+"""
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import cache_keys, facets, fragments, image_variants, search_index
+from .models import Brand, Category, Product, ProductColor, ProductImage, ProductReview, ProductSize
+from .services import refresh_product_rating
+
+
+@receiver([post_save, post_delete], sender=ProductImage, dispatch_uid='product_card_image')
+@receiver([post_save, post_delete], sender=ProductColor, dispatch_uid='product_card_color')
+def touch_product_card(sender, instance, **kwargs):
+    """
+    تصویر یا رنگ روی کارت محصول دیده می‌شود: کنار گذاشتن کارت کش شده آن.
+    قبل از ابطال کش کاتالوگ وصل می‌شود تا لیست‌های دوباره ساخته شده updated_at جدید را ببینند.
+    """
+    fragments.touch_products([instance.product_id])
+
+
+@receiver([post_save, post_delete], sender=Product, dispatch_uid='catalog_cache_product')
+@receiver([post_save, post_delete], sender=Category, dispatch_uid='catalog_cache_category')
+@receiver([post_save, post_delete], sender=Brand, dispatch_uid='catalog_cache_brand')
+@receiver([post_save, post_delete], sender=ProductImage, dispatch_uid='catalog_cache_product_image')
+@receiver([post_save, post_delete], sender=ProductSize, dispatch_uid='catalog_cache_product_size')
+@receiver([post_save, post_delete], sender=ProductColor, dispatch_uid='catalog_cache_product_color')
+def invalidate_catalog_cache(sender, **kwargs):
+    cache_keys.invalidate_model(sender.__name__)
+
+
+@receiver([post_save, post_delete], sender=ProductReview, dispatch_uid='catalog_cache_product_review')
+def update_product_rating(sender, instance, **kwargs):
+    """تایید، ویرایش یا حذف نظر: بازمحاسبه امتیاز محصول و پاک کردن کش‌های وابسته"""
+    refresh_product_rating(instance.product_id)
+    cache.delete(cache_keys.product_reviews_key(instance.product_id))
+    cache_keys.invalidate_model('ProductReview')
+
+
+@receiver([post_save, post_delete], sender=Category, dispatch_uid='category_tree_version')
+def invalidate_category_tree(sender, **kwargs):
+    """درخت دسته‌ها در همه پروسه‌ها در اولین استفاده بازسازی می‌شود"""
+    cache_keys.bump_version(cache_keys.CATEGORY_TREE_VERSION)
+
+
+@receiver(post_save, sender=Product, dispatch_uid='search_index_product_save')
+def index_product(sender, instance, **kwargs):
+    """همگام‌سازی ایندکس جستجو با محصول (محصول غیرفعال از ایندکس حذف می‌شود)"""
+    search_index.index_products([instance])
+
+
+@receiver(post_delete, sender=Product, dispatch_uid='search_index_product_delete')
+def unindex_product(sender, instance, **kwargs):
+    search_index.remove_products([instance.pk])
+
+
+@receiver(post_save, sender=Category, dispatch_uid='search_index_category_save')
+@receiver(post_save, sender=Brand, dispatch_uid='search_index_brand_save')
+def reindex_related_products(sender, instance, created, **kwargs):
+    """تغییر نام دسته یا برند: بازایندکس محصولات آن"""
+    if created:
+        return
+    search_index.index_products(instance.products.select_related('category', 'brand'))
+
+
+@receiver(post_save, sender=Product, dispatch_uid='facet_index_product_save')
+def facet_index_product(sender, instance, **kwargs):
+    facets.reindex_products([instance.pk])
+
+
+@receiver(post_delete, sender=Product, dispatch_uid='facet_index_product_delete')
+def facet_unindex_product(sender, instance, **kwargs):
+    facets.remove_products([instance.pk])
+
+
+@receiver([post_save, post_delete], sender=ProductSize, dispatch_uid='facet_index_product_size')
+@receiver([post_save, post_delete], sender=ProductColor, dispatch_uid='facet_index_product_color')
+def facet_index_variant(sender, instance, **kwargs):
+    """افزودن/حذف سایز یا رنگ: بازخوانی فیلترهای همان محصول"""
+    facets.reindex_products([instance.product_id])
+
+
+@receiver(post_save, sender=Brand, dispatch_uid='facet_index_brand_save')
+def facet_reindex_brand_products(sender, instance, created, **kwargs):
+    """فیلتر برند با slug است؛ تغییر slug برند محصولاتش را بازخوانی می‌کند"""
+    if created:
+        return
+    facets.reindex_products(instance.products.values_list('pk', flat=True))
+
+
+def _image_field(sender):
+    return 'logo' if sender is Brand else 'image'
+
+
+@receiver(pre_save, sender=ProductImage, dispatch_uid='image_variants_replaced_product_image')
+@receiver(pre_save, sender=Category, dispatch_uid='image_variants_replaced_category')
+@receiver(pre_save, sender=Brand, dispatch_uid='image_variants_replaced_brand')
+def note_replaced_image(sender, instance, update_fields=None, **kwargs):
+    image_variants.note_replaced_files(instance, [_image_field(sender)], update_fields)
+
+
+@receiver(post_save, sender=ProductImage, dispatch_uid='image_variants_product_image')
+@receiver(post_save, sender=Category, dispatch_uid='image_variants_category')
+@receiver(post_save, sender=Brand, dispatch_uid='image_variants_brand')
+def generate_image_variants(sender, instance, **kwargs):
+    """ساخت نسخه‌های WebP/JPEG تصویر آپلود شده (فقط اگر هنوز ساخته نشده باشند یا فایل عوض شده باشد)"""
+    image_variants.schedule_variants(instance, _image_field(sender))
+
+
+@receiver(post_delete, sender=ProductImage, dispatch_uid='image_variants_delete_product_image')
+@receiver(post_delete, sender=Category, dispatch_uid='image_variants_delete_category')
+@receiver(post_delete, sender=Brand, dispatch_uid='image_variants_delete_brand')
+def delete_image_variants(sender, instance, **kwargs):
+    image_variants.schedule_cleanup(instance, _image_field(sender))
@@ -0,0 +1,35 @@
+from django import template
+
+from Products_Module.fragments import render_fragment
+
+register = template.Library()
+
+
+class FragmentNode(template.Node):
+    def __init__(self, nodelist, name, vary_on):
+        self.nodelist = nodelist
+        self.name = name
+        self.vary_on = vary_on
+
+    def render(self, context):
+        name = self.name.resolve(context)
+        vary_on = [value.resolve(context) for value in self.vary_on]
+        return render_fragment(name, vary_on, lambda: self.nodelist.render(context))
+
+
+@register.tag('fragment')
+def do_fragment(parser, token):
+    """
+    کش HTML یک قطعه قالب تا تغییر مدل‌های وابسته آن (cache_keys.FRAGMENT_DEPENDENCIES):
+
+        {% fragment "navbar" "desktop" %} ... {% endfragment %}
+
+    آرگومان اول نام قطعه و بقیه مقادیری هستند که کلید کش بر اساس آن‌ها جدا می‌شود.
+    محتوای قطعه نباید به کاربر یا درخواست وابسته باشد.
+    """
+    bits = token.split_contents()
+    if len(bits) < 2:
+        raise template.TemplateSyntaxError(f"'{bits[0]}' tag requires at least one argument (fragment name)")
+    nodelist = parser.parse(('endfragment',))
+    parser.delete_first_token()
+    return FragmentNode(nodelist, parser.compile_filter(bits[1]), [parser.compile_filter(bit) for bit in bits[2:]])
@@ -0,0 +1,30 @@
+from django import template
+
+from Products_Module import image_variants
+
+register = template.Library()
+
+
+@register.simple_tag
+def srcset(image, fmt='webp'):
+    """srcset نسخه‌های یک تصویر (ImageFieldFile) در یک فرمت؛ بدون نسخه: رشته خالی"""
+    if not image or not image.name or not image_variants.has_variants(image.name, image.storage):
+        return ''
+    return image_variants.srcset(image.name, fmt, image.storage)
+
+
+@register.inclusion_tag('images/picture.html')
+def picture(image, alt='', css_class='', sizes='100vw', fallback='', loading='lazy'):
+    """
+    <picture> با منبع WebP/JPEG برای هر عرض؛ img همیشه فایل اصلی را به عنوان src دارد.
+    fallback: آدرس تصویر جایگزین وقتی image خالی است.
+    """
+    has_file = bool(image and image.name)
+    return {
+        'sources': image_variants.sources(image.name, image.storage) if has_file else [],
+        'src': image.url if has_file else fallback,
+        'alt': alt,
+        'css_class': css_class,
+        'sizes': sizes,
+        'loading': loading,
+    }
@@ -0,0 +1,11 @@
+from django import template
+
+from Products_Module.fragments import render_product_cards
+
+register = template.Library()
+
+
+@register.simple_tag
+def product_cards(products, variant='list'):
+    """کارت محصولات از کش HTML (کلید: شناسه و updated_at هر محصول)"""
+    return render_product_cards(products, variant)
@@ -0,0 +1,62 @@
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from Products_Module import benchmarks
+from Products_Module.management.commands.run_benchmarks import ISOLATED_MAX_ENTRIES, isolated_caches
+
+
+class PercentileTests(TestCase):
+    def test_nearest_rank(self):
+        values = list(range(1, 101))
+        self.assertEqual(benchmarks.percentile(values, 50), 50)
+        self.assertEqual(benchmarks.percentile(values, 95), 95)
+        self.assertEqual(benchmarks.percentile([7], 99), 7)
+        self.assertEqual(benchmarks.percentile([], 50), 0.0)
+
+
+class CompareTests(TestCase):
+    def _results(self, p95=10.0, queries=5, peak_kb=1000.0):
+        return {'views': {'index': {'p95_ms': p95, 'queries': queries, 'peak_kb': peak_kb}}}
+
+    def test_within_threshold(self):
+        self.assertEqual(benchmarks.compare(self._results(p95=12.0, peak_kb=1200), self._results()), [])
+
+    def test_small_latency_delta_is_noise(self):
+        self.assertEqual(benchmarks.compare(self._results(p95=1.5), self._results(p95=1.0)), [])
+
+    def test_regressions(self):
+        regressions = benchmarks.compare(self._results(p95=20.0, queries=6, peak_kb=2000), self._results())
+
+        self.assertEqual(len(regressions), 3)
+
+    def test_new_view_is_ignored(self):
+        self.assertEqual(benchmarks.compare(self._results(), {'views': {}}), [])
+
+
+@override_settings(RATELIMIT_ENABLE=False)
+class RunSuiteTests(TestCase):
+    def test_all_scenarios_run(self):
+        call_command('populate_db', products=60, reviews_per_product=1, stdout=StringIO())
+
+        results = benchmarks.run_suite(iterations=2, warmup=0)
+
+        self.assertEqual(set(results['views']), {
+            'index', 'product_list', 'product_detail', 'search_products', 'cart_detail', 'checkout_view', 'cart_add',
+        })
+        for row in results['views'].values():
+            self.assertGreater(row['queries'], 0)
+            self.assertLessEqual(row['p50_ms'], row['p99_ms'])
+
+
+class IsolatedCacheTests(TestCase):
+    def test_tiers_are_kept_on_large_local_memory_caches(self):
+        caches = isolated_caches()
+
+        self.assertEqual(caches['default'], settings.CACHES['default'])
+        self.assertEqual(caches['local']['OPTIONS'], settings.CACHES['local']['OPTIONS'])
+        for alias in ('shared', 'persistent'):
+            self.assertEqual(caches[alias]['BACKEND'], 'django.core.cache.backends.locmem.LocMemCache')
+            self.assertEqual(caches[alias]['OPTIONS'], {'MAX_ENTRIES': ISOLATED_MAX_ENTRIES})
@@ -0,0 +1,94 @@
+import threading
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from Products_Module import cache_fill
+
+
+class Builder:
+    def __init__(self, value='fresh'):
+        self.value = value
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.value
+
+
+class CacheFillTests(SimpleTestCase):
+    key = 'home_test_list'
+
+    def setUp(self):
+        cache.clear()
+
+    def _store(self, value, expires_in, delta=0.01):
+        cache.set(self.key, (value, delta, time.time() + expires_in), 3600)
+
+    def test_cold_key_is_built_once_and_cached(self):
+        build = Builder()
+
+        self.assertEqual(cache_fill.get_or_build(self.key, build), 'fresh')
+        self.assertEqual(cache_fill.get_or_build(self.key, build), 'fresh')
+        self.assertEqual(build.calls, 1)
+
+    def test_expired_value_is_rebuilt_by_lock_winner(self):
+        self._store('old', expires_in=-1)
+        build = Builder()
+
+        self.assertEqual(cache_fill.get_or_build(self.key, build), 'fresh')
+        self.assertEqual(build.calls, 1)
+        self.assertIsNone(cache.get(cache_fill.lock_key(self.key)))
+
+    def test_stale_value_is_served_while_another_request_rebuilds(self):
+        self._store('old', expires_in=-1)
+        cache.add(cache_fill.lock_key(self.key), 1)
+        build = Builder()
+
+        self.assertEqual(cache_fill.get_or_build(self.key, build), 'old')
+        self.assertEqual(build.calls, 0)
+
+    def test_xfetch_refreshes_expensive_values_early(self):
+        build = Builder()
+        with mock.patch.object(cache_fill.random, 'random', return_value=0.5):
+            self._store('cheap', expires_in=60, delta=0.001)
+            self.assertEqual(cache_fill.get_or_build(self.key, build), 'cheap')
+
+            # -delta * ln(0.5) ≈ 0.69 * delta > 60s left
+            self._store('expensive', expires_in=60, delta=100)
+            self.assertEqual(cache_fill.get_or_build(self.key, build), 'fresh')
+
+        self.assertEqual(build.calls, 1)
+
+    def test_cold_reader_waits_for_lock_winner(self):
+        cache.add(cache_fill.lock_key(self.key), 1)
+        timer = threading.Timer(0.1, lambda: self._store('built elsewhere', expires_in=60))
+        timer.start()
+        build = Builder()
+
+        value = cache_fill.get_or_build(self.key, build)
+
+        timer.join()
+        self.assertEqual(value, 'built elsewhere')
+        self.assertEqual(build.calls, 0)
+
+    @override_settings(CACHE_FILL_WAIT=0)
+    def test_cold_reader_builds_when_winner_is_too_slow(self):
+        cache.add(cache_fill.lock_key(self.key), 1)
+        build = Builder()
+
+        self.assertEqual(cache_fill.get_or_build(self.key, build), 'fresh')
+        self.assertEqual(build.calls, 1)
+
+    def test_many_keys_are_read_with_one_round_trip(self):
+        first, second = Builder('a'), Builder('b')
+        cache_fill.get_or_build_many({'home_a': first, 'home_b': second})
+
+        with mock.patch.object(cache, 'get_many', wraps=cache.get_many) as get_many:
+            values = cache_fill.get_or_build_many({'home_a': first, 'home_b': second})
+
+        get_many.assert_called_once()
+        self.assertEqual(values, {'home_a': 'a', 'home_b': 'b'})
+        self.assertEqual((first.calls, second.calls), (1, 1))
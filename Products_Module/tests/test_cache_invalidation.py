@@ -0,0 +1,119 @@
+import time
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from Home_Module.views import HOME_DATA
+from Menu_Module.models import MenuItem
+from Products_Module import cache_fill, cache_keys
+from Products_Module.models import Brand, Category, Product, ProductImage, ProductReview
+
+
+class CatalogCacheInvalidationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.category = Category.objects.create(name='Category', slug='category')
+        self.product = Product.objects.create(
+            name='Product',
+            slug='product',
+            category=self.category,
+            description='Test product',
+            price=Decimal('1000'),
+            stock=5,
+        )
+        cache.clear()
+
+    def _fill_cache(self):
+        for key in cache_keys.KEY_DEPENDENCIES:
+            cache.set(key, 'cached')
+        cache.set(cache_keys.product_reviews_key(self.product.id), 'cached')
+
+    def _cached_keys(self):
+        keys = list(cache_keys.KEY_DEPENDENCIES) + [cache_keys.product_reviews_key(self.product.id)]
+        return set(cache.get_many(keys))
+
+    def test_product_save_invalidates_only_product_dependent_keys(self):
+        self._fill_cache()
+
+        self.product.price = Decimal('2000')
+        self.product.save()
+
+        self.assertEqual(self._cached_keys(), {
+            cache_keys.NAVBAR_CATEGORIES,
+            cache_keys.MAIN_MENU_ITEMS,
+            cache_keys.FOOTER_MENU_ITEMS,
+            cache_keys.product_reviews_key(self.product.id),
+        })
+
+    def test_category_delete_invalidates_navbar_keys(self):
+        other = Category.objects.create(name='Other', slug='other')
+        self._fill_cache()
+
+        other.delete()
+
+        cached = self._cached_keys()
+        self.assertNotIn(cache_keys.NAVBAR_CATEGORIES, cached)
+        self.assertIn(cache_keys.PRICE_RANGE, cached)
+
+    def test_brand_and_image_changes_invalidate_home_lists(self):
+        self._fill_cache()
+        Brand.objects.create(name='Brand', slug='brand')
+        self.assertNotIn(cache_keys.BRANDS_WITH_COUNT, self._cached_keys())
+
+        self._fill_cache()
+        ProductImage.objects.create(product=self.product, image='products/a.jpg')
+        cached = self._cached_keys()
+        self.assertNotIn(cache_keys.HOME_NEW_PRODUCTS, cached)
+        self.assertIn(cache_keys.BRANDS_WITH_COUNT, cached)
+
+    def test_review_change_invalidates_product_reviews_key(self):
+        self._fill_cache()
+
+        ProductReview.objects.create(
+            product=self.product,
+            name='Reviewer',
+            email='reviewer@example.com',
+            rating=5,
+            title='Great',
+            comment='Great product',
+            is_approved=True,
+        )
+
+        cached = self._cached_keys()
+        self.assertNotIn(cache_keys.product_reviews_key(self.product.id), cached)
+        self.assertNotIn(cache_keys.HOME_NEW_PRODUCTS, cached)
+        self.assertIn(cache_keys.PRICE_RANGE, cached)
+
+    def test_menu_item_save_invalidates_main_menu(self):
+        self._fill_cache()
+
+        MenuItem.objects.create(title='Menu', url='/shop/')
+
+        self.assertNotIn(cache_keys.MAIN_MENU_ITEMS, self._cached_keys())
+
+    def test_view_counter_update_keeps_cache(self):
+        self._fill_cache()
+
+        Product.objects.filter(pk=self.product.pk).update(views_count=10)
+
+        self.assertIn(cache_keys.HOME_TRENDING_PRODUCTS, self._cached_keys())
+
+    def test_trending_products_expire_sooner_than_catalog_keys(self):
+        cache_fill.get_or_build_many(HOME_DATA)
+
+        _, _, expires = cache.get(cache_keys.HOME_TRENDING_PRODUCTS)
+        self.assertLessEqual(expires - time.time(), cache_keys.TRENDING_CACHE_TIMEOUT)
+        _, _, expires = cache.get(cache_keys.HOME_NEW_PRODUCTS)
+        self.assertGreater(expires - time.time(), cache_keys.TRENDING_CACHE_TIMEOUT)
+
+    def test_evicted_version_does_not_restart_at_one(self):
+        old_versions = {0}
+        for _ in range(3):
+            cache_keys.bump_listing_version()
+            old_versions.add(cache_keys.listing_version())
+
+        cache.delete(cache_keys.LISTING_VERSION)
+        cache_keys.bump_listing_version()
+
+        self.assertNotIn(cache_keys.listing_version(), old_versions | {1, 2, 3})
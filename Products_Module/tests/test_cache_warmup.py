@@ -0,0 +1,86 @@
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.module_loading import import_string
+
+from Products_Module import cache_keys, cache_warmup
+from Products_Module.models import Category, Product, ProductReview
+
+
+class CacheWarmupTests(TestCase):
+    def setUp(self):
+        category = Category.objects.create(name='Category', slug='category')
+        self.products = [
+            Product.objects.create(
+                name=f'Product {index}', slug=f'product-{index}', category=category,
+                description='desc', price=Decimal('1000'), stock=5, views_count=index,
+            )
+            for index in range(3)
+        ]
+        ProductReview.objects.create(
+            product=self.products[-1], name='Ali', email='a@example.com', rating=5,
+            title='Good', comment='Nice', is_approved=True,
+        )
+        cache.clear()
+
+    def test_every_catalog_key_has_a_builder(self):
+        self.assertEqual(set(cache_keys.KEY_BUILDERS), set(cache_keys.KEY_DEPENDENCIES))
+        for path in cache_keys.KEY_BUILDERS.values():
+            self.assertTrue(callable(import_string(path)))
+
+    def test_warm_fills_catalog_keys_and_top_products(self):
+        results = cache_warmup.warm(top_products=1, workers=1)
+
+        self.assertEqual([result.error for result in results if result.error], [])
+        self.assertEqual(set(cache.get_many(cache_keys.KEY_BUILDERS)), set(cache_keys.KEY_BUILDERS))
+        self.assertIsNotNone(cache.get(cache_keys.product_reviews_key(self.products[-1].pk)))
+        self.assertIsNone(cache.get(cache_keys.product_reviews_key(self.products[0].pk)))
+
+    def test_first_request_after_warm_is_served_hot(self):
+        cache_warmup.warm(workers=1)
+
+        with CaptureQueriesContext(connection) as first:
+            self.client.get(reverse('index'))
+        with CaptureQueriesContext(connection) as second:
+            self.client.get(reverse('index'))
+
+        self.assertEqual(len(first), len(second))
+
+    def test_failed_task_does_not_stop_the_others(self):
+        with mock.patch('Menu_Module.menu_tree.load_footer_menu', side_effect=RuntimeError('boom')), \
+                self.assertLogs('Products_Module.cache_warmup', 'ERROR'):
+            results = cache_warmup.warm(top_products=0, workers=1)
+
+        errors = {result.name: result.error for result in results}
+        self.assertEqual(errors.pop(cache_keys.FOOTER_MENU_ITEMS), 'RuntimeError: boom')
+        self.assertFalse(any(errors.values()))
+        self.assertIsNotNone(cache.get(cache_keys.NAVBAR_CATEGORIES))
+
+    def test_command_reports_failures(self):
+        out = StringIO()
+        call_command('warm_caches', workers=1, stdout=out)
+        self.assertIn(cache_keys.HOME_NEW_PRODUCTS, out.getvalue())
+
+        with mock.patch('Menu_Module.menu_tree.load_footer_menu', side_effect=RuntimeError('boom')), \
+                self.assertLogs('Products_Module.cache_warmup', 'ERROR'):
+            with self.assertRaises(CommandError):
+                call_command('warm_caches', workers=1, force=True, stdout=StringIO())
+
+    def test_startup_hook_is_opt_in(self):
+        # close_all اتصال دیتابیس تست و تراکنش آن را می‌بندد
+        with mock.patch.object(cache_warmup, 'warm', return_value=[]) as warm, \
+                mock.patch.object(cache_warmup.connections, 'close_all'):
+            cache_warmup.warm_on_startup()
+            warm.assert_not_called()
+
+            with override_settings(CACHE_WARM_ON_STARTUP=True):
+                cache_warmup.warm_on_startup()
+            warm.assert_called_once()
@@ -0,0 +1,97 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.test import TestCase
+from django.urls import reverse
+
+from Products_Module import category_tree, facets
+from Products_Module.models import Category, Product
+
+
+class CategoryTreeTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.root = Category.objects.create(name='Clothing', slug='clothing')
+        self.men = Category.objects.create(name='Men', slug='men', parent=self.root)
+        self.shirts = Category.objects.create(name='Shirts', slug='shirts', parent=self.men)
+        self.hidden = Category.objects.create(name='Hidden', slug='hidden', parent=self.root, is_active=False)
+        self.other = Category.objects.create(name='Other', slug='other')
+
+    def _product(self, slug, category):
+        return Product.objects.create(
+            name=slug, slug=slug, category=category, description='desc', price=Decimal('1000'), stock=5,
+        )
+
+    def test_paths_are_materialized_on_save(self):
+        self.shirts.refresh_from_db()
+        self.assertEqual(self.shirts.path, f'{self.root.pk:06d}/{self.men.pk:06d}/{self.shirts.pk:06d}/')
+        self.assertEqual(self.shirts.depth, 2)
+        self.assertEqual(
+            set(self.root.get_descendants().values_list('pk', flat=True)),
+            {self.root.pk, self.men.pk, self.shirts.pk, self.hidden.pk},
+        )
+
+    def test_moving_a_category_rewrites_its_subtree(self):
+        self.men.parent = self.other
+        self.men.save()
+
+        self.shirts.refresh_from_db()
+        self.assertEqual(self.shirts.path, f'{self.other.pk:06d}/{self.men.pk:06d}/{self.shirts.pk:06d}/')
+        self.assertEqual(self.shirts.depth, 2)
+        self.assertEqual(category_tree.descendant_ids(self.other.pk), {self.other.pk, self.men.pk, self.shirts.pk})
+
+    def test_parent_cannot_be_a_descendant(self):
+        self.root.refresh_from_db()
+        self.root.parent = self.shirts
+        with self.assertRaises(ValidationError):
+            self.root.full_clean()
+
+    def test_descendant_lookups_are_cached_in_memory(self):
+        category_tree.get_tree()
+
+        with self.assertNumQueries(0):
+            ids = category_tree.descendant_ids(self.root.pk)
+
+        self.assertEqual(ids, {self.root.pk, self.men.pk, self.shirts.pk})
+        self.assertIn(self.hidden.pk, category_tree.descendant_ids(self.root.pk, active_only=False))
+
+    def test_products_count_is_a_cached_rollup(self):
+        self._product('shirt', self.shirts)
+        self._product('jacket', self.men)
+        self._product('misc', self.other)
+        self.assertEqual(self.root.products_count, 2)
+
+        with self.assertNumQueries(0):
+            counts = [category.products_count for category in (self.root, self.men, self.shirts, self.other)]
+        self.assertEqual(counts, [2, 2, 1, 1])
+
+    def test_category_page_includes_subcategory_products(self):
+        shirt = self._product('shirt', self.shirts)
+        jacket = self._product('jacket', self.men)
+        self._product('misc', self.other)
+        facets.rebuild()
+
+        response = self.client.get(reverse('products:category', args=['clothing']), {'sort': 'date'})
+
+        self.assertEqual({p.id for p in response.context['products']}, {shirt.id, jacket.id})
+        counts = {c.slug: c.product_count for c in response.context['categories']}
+        self.assertEqual(counts['clothing'], 2)
+        self.assertEqual(counts['men'], 2)
+
+    def test_navbar_loads_whole_tree_in_one_query(self):
+        with self.assertNumQueries(1):
+            roots = category_tree.load_navbar_categories()
+            names = [(root.name, [child.name for child in root.subcategories]) for root in roots]
+
+        self.assertEqual(names, [('Clothing', ['Men']), ('Other', [])])
+        self.assertEqual([c.name for c in roots[0].subcategories[0].subcategories], ['Shirts'])
+
+    def test_rebuild_paths_repairs_raw_loaded_rows(self):
+        Category.objects.filter(pk__in=[self.men.pk, self.shirts.pk]).update(path='', depth=0)
+
+        self.assertEqual(category_tree.rebuild_paths(), 2)
+
+        self.shirts.refresh_from_db()
+        self.assertEqual(self.shirts.path, f'{self.root.pk:06d}/{self.men.pk:06d}/{self.shirts.pk:06d}/')
+        self.assertEqual(self.shirts.depth, 2)
@@ -0,0 +1,148 @@
+import threading
+from decimal import Decimal
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connections
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from Products_Module import facets
+from Products_Module.models import Brand, Category, Product, ProductColor, ProductSize
+
+
+class FacetFixtureMixin:
+    def setUp(self):
+        cache.clear()
+        self.shoes = Category.objects.create(name='Shoes', slug='shoes')
+        self.bags = Category.objects.create(name='Bags', slug='bags')
+        self.ario = Brand.objects.create(name='Ario', slug='ario')
+        self.other = Brand.objects.create(name='Other', slug='other')
+        self.runner = self._product('runner', self.shoes, self.ario, '800000', sizes=['m', 'l'], colors=['#000000'])
+        self.sneaker = self._product('sneaker', self.shoes, self.other, '1500000', sizes=['m'], colors=['#FFFFFF'])
+        self.tote = self._product('tote', self.bags, self.ario, '300000', stock=0)
+        facets.rebuild()
+
+    def _product(self, slug, category, brand, price, stock=5, sizes=(), colors=()):
+        product = Product.objects.create(
+            name=slug, slug=slug, category=category, brand=brand,
+            description='desc', price=Decimal(price), stock=stock,
+        )
+        for size in sizes:
+            ProductSize.objects.create(product=product, size=size)
+        for code in colors:
+            ProductColor.objects.create(product=product, name=code, code=code)
+        return product
+
+
+class FacetIndexTests(FacetFixtureMixin, TestCase):
+    def test_filters_intersect_across_facets_and_union_within(self):
+        result = facets.query(category=[self.shoes.id], size=['m'], color=['#000000', '#FFFFFF'])
+        self.assertEqual(result.ids, {self.runner.id, self.sneaker.id})
+
+        result = facets.query(brand=['ario'], size=['m'])
+        self.assertEqual(result.ids, {self.runner.id})
+
+    def test_price_range_and_availability(self):
+        result = facets.query(min_price=Decimal('300000'), max_price=Decimal('800000'))
+        self.assertEqual(result.ids, {self.runner.id, self.tote.id})
+
+        result = facets.query(available=True)
+        self.assertEqual(result.ids, {self.runner.id, self.sneaker.id})
+
+    def test_counts_ignore_own_facet_but_apply_others(self):
+        result = facets.query(brand=['ario'])
+
+        # تعداد برندها با انتخاب برند تغییر نمی‌کند
+        self.assertEqual(result.counts['brand'], {'ario': 2, 'other': 1})
+        # بقیه فیلترها به برند انتخاب شده محدود می‌شوند
+        self.assertEqual(result.counts['category'], {self.shoes.id: 1, self.bags.id: 1})
+        self.assertEqual(result.counts['size'], {'m': 1, 'l': 1})
+        self.assertEqual(result.counts['available'], {True: 1})
+
+    def test_price_buckets(self):
+        counts = facets.query().counts['price']
+        self.assertEqual(counts, {0: 1, 1: 1, 2: 1})
+
+    def test_model_saves_update_index_incrementally(self):
+        ProductSize.objects.create(product=self.tote, size='xl')
+        self.assertEqual(facets.query(size=['xl']).ids, {self.tote.id})
+
+        self.sneaker.is_active = False
+        self.sneaker.save()
+        self.assertEqual(facets.query(category=[self.shoes.id]).ids, {self.runner.id})
+
+        self.other.slug = 'renamed'
+        self.other.save()
+        self.sneaker.is_active = True
+        self.sneaker.save()
+        self.assertEqual(facets.query(brand=['renamed']).ids, {self.sneaker.id})
+
+        self.runner.delete()
+        self.assertEqual(facets.query(color=['#000000']).ids, set())
+
+    def test_query_does_not_touch_database_when_fresh(self):
+        with self.assertNumQueries(0):
+            facets.query(category=[self.shoes.id], brand=['ario'], size=['m'])
+
+    def test_change_missed_between_read_and_bump_is_loaded(self):
+        # موجودی که پروسه دیگری همزمان تغییر داده (سیگنالی در این پروسه نیست)
+        Product.objects.filter(pk=self.tote.pk).update(stock=3)
+        incr = cache.incr
+
+        def concurrent_incr(key, delta=1):
+            incr(key)
+            return incr(key, delta)
+
+        with mock.patch.object(cache, 'incr', side_effect=concurrent_incr):
+            facets.reindex_products([self.runner.pk])
+
+        self.assertIn(self.tote.id, facets.query(available=True).ids)
+
+    def test_stale_index_answers_while_rebuilding_in_background(self):
+        loading, release = threading.Event(), threading.Event()
+
+        def slow_load():
+            loading.set()
+            release.wait(5)
+            return {facet: {} for facet in facets.FACETS}, {}, {}
+
+        cache.incr(facets.VERSION_CACHE_KEY)
+        everything = {self.runner.id, self.sneaker.id, self.tote.id}
+        with mock.patch.object(connections['default'], 'in_atomic_block', False), \
+                mock.patch.object(facets.facet_index, '_load_state', slow_load):
+            self.assertEqual(facets.query().ids, everything)
+            self.assertTrue(loading.wait(5))
+            self.assertEqual(facets.query().ids, everything)
+            rebuild = facets.facet_index._rebuild_thread
+            release.set()
+            rebuild.join(5)
+
+        self.assertEqual(facets.query().ids, set())
+
+
+class ProductListFacetViewTests(FacetFixtureMixin, TestCase):
+    def test_filtered_list_uses_index_ids_and_live_counts(self):
+        response = self.client.get(reverse('products:list'), {'brand': 'ario', 'size': 'm'})
+
+        self.assertEqual([product.id for product in response.context['products']], [self.runner.id])
+        self.assertEqual(response.context['total_products'], 1)
+        brand_counts = {brand.slug: brand.product_count for brand in response.context['brands']}
+        self.assertEqual(brand_counts, {'ario': 1, 'other': 1})
+        sizes = {size['value']: size['count'] for size in response.context['size_facets']}
+        self.assertEqual((sizes['m'], sizes['l'], sizes['xl']), (1, 1, 0))
+
+    @override_settings(PRODUCT_FACET_MAX_IDS=1)
+    def test_large_results_fall_back_to_database_filters(self):
+        response = self.client.get(reverse('products:list'), {'category': 'shoes', 'size': 'm'})
+
+        self.assertEqual(
+            {product.id for product in response.context['products']},
+            {self.runner.id, self.sneaker.id},
+        )
+
+    def test_invalid_price_is_ignored(self):
+        response = self.client.get(reverse('products:list'), {'min_price': 'abc'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['total_products'], 3)
@@ -0,0 +1,116 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.template import Context, Template
+from django.test import TestCase
+
+from Products_Module import fragments
+from Products_Module.models import Category, Product, ProductColor, ProductImage, ProductReview
+from Products_Module.services import rebuild_product_ratings
+
+
+class ProductCardCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.category = Category.objects.create(name='کفش', slug='shoes')
+        self.product = Product.objects.create(
+            name='کفش ورزشی', slug='runner', category=self.category,
+            description='desc', price=Decimal('2000'), stock=5,
+        )
+
+    def _products(self):
+        return list(Product.objects.select_related('category').prefetch_related('images'))
+
+    def _render(self, products):
+        return fragments.render_product_cards(products, 'list')
+
+    def test_cached_cards_render_without_queries(self):
+        products = self._products()
+        html = self._render(products)
+
+        with self.assertNumQueries(0):
+            cached = self._render(products)
+
+        self.assertEqual(cached, html)
+        self.assertIn('کفش ورزشی', html)
+
+    def test_product_save_changes_card_key(self):
+        self._render(self._products())
+        self.product.name = 'کفش دویدن'
+        self.product.save()
+
+        self.assertIn('کفش دویدن', self._render(self._products()))
+
+    def test_color_change_touches_product(self):
+        before = self._products()[0].updated_at
+        ProductColor.objects.create(product=self.product, name='قرمز', code='#ff0000')
+
+        products = self._products()
+        self.assertGreater(products[0].updated_at, before)
+        self.assertIn('#ff0000', self._render(products))
+
+    def test_review_rating_refreshes_card(self):
+        self._render(self._products())
+        ProductReview.objects.create(
+            product=self.product, name='علی', email='a@example.com', rating=5, title='خوب', comment='عالی', is_approved=True,
+        )
+
+        self.assertIn('width: 100%', self._render(self._products()))
+
+    def test_category_rename_and_rating_rebuild_bump_card_version(self):
+        version = fragments.fragment_version('product_card')
+        self.category.name = 'پوشاک'
+        self.category.save()
+        self.assertGreater(fragments.fragment_version('product_card'), version)
+
+        version = fragments.fragment_version('product_card')
+        rebuild_product_ratings()
+        self.assertGreater(fragments.fragment_version('product_card'), version)
+
+
+class FragmentTagTests(TestCase):
+    template = Template('{% load fragment_tags %}{% fragment "navbar" part %}{{ value }}{% endfragment %}')
+
+    def setUp(self):
+        cache.clear()
+
+    def _render(self, **context):
+        return self.template.render(Context(context))
+
+    def test_fragment_is_cached_per_vary_value(self):
+        self.assertEqual(self._render(part='desktop', value='a'), 'a')
+        self.assertEqual(self._render(part='desktop', value='b'), 'a')
+        self.assertEqual(self._render(part='mobile', value='b'), 'b')
+
+    def test_dependent_model_change_invalidates_fragment(self):
+        self._render(part='desktop', value='a')
+        Category.objects.create(name='کیف', slug='bags')
+
+        self.assertEqual(self._render(part='desktop', value='b'), 'b')
+
+
+class CardProductsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        category = Category.objects.create(name='کفش', slug='shoes')
+        self.product = Product.objects.create(
+            name='کفش ورزشی', slug='runner', category=category,
+            description='desc', price=Decimal('2000'), stock=5,
+        )
+        for order, name in enumerate(('b.jpg', 'a.jpg', 'c.jpg', 'd.jpg')):
+            ProductImage.objects.create(product=self.product, image=f'products/{name}', order=order)
+
+    def test_card_images_are_annotated_in_order(self):
+        with self.assertNumQueries(2):
+            product = fragments.card_products(Product.objects.all()).get()
+            images = product.card_images
+
+        self.assertEqual([image.name for image in images], ['products/b.jpg', 'products/a.jpg', 'products/c.jpg'])
+        self.assertEqual(images, self.product.card_images)
+
+    def test_card_columns_only(self):
+        product = fragments.card_products(Product.objects.all()).get()
+
+        self.assertIn('full_description', product.get_deferred_fields())
+        with self.assertNumQueries(0):
+            fragments.render_product_cards([product], 'home')
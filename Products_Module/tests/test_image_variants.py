@@ -0,0 +1,116 @@
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.template import Context, Template
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from Products_Module import image_variants
+from Products_Module.models import Category, Product, ProductImage
+
+
+def _image(width, height, fmt='JPEG'):
+    buffer = BytesIO()
+    Image.new('RGB', (width, height), (200, 40, 40)).save(buffer, fmt)
+    return ContentFile(buffer.getvalue())
+
+
+@override_settings(IMAGE_VARIANT_WIDTHS=(300, 600), IMAGE_VARIANT_FORMATS=('webp', 'jpeg'))
+class ImageVariantTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        media = override_settings(MEDIA_ROOT=self.media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+        self.name = default_storage.save('products/shoe.jpg', _image(800, 400))
+
+    def _size(self, width, fmt):
+        with default_storage.open(image_variants.variant_name(self.name, width, fmt)) as variant:
+            return Image.open(variant).size
+
+    def test_generates_every_width_and_format(self):
+        self.assertEqual(image_variants.generate_variants(self.name), 4)
+
+        self.assertEqual(self._size(300, 'webp'), (300, 150))
+        self.assertEqual(self._size(600, 'jpeg'), (600, 300))
+        self.assertTrue(image_variants.has_variants(self.name))
+        self.assertEqual(image_variants.generate_variants(self.name), 0)
+
+    def test_small_images_are_not_upscaled(self):
+        name = default_storage.save('products/icon.jpg', _image(200, 100))
+        image_variants.generate_variants(name)
+
+        with default_storage.open(image_variants.variant_name(name, 600, 'webp')) as variant:
+            self.assertEqual(Image.open(variant).size, (200, 100))
+
+    def test_picture_tag_falls_back_to_original(self):
+        template = Template('{% load image_tags %}{% picture image "shoe" "product-image" %}')
+        image = ProductImage(image=self.name).image
+
+        html = template.render(Context({'image': image}))
+        self.assertNotIn('<source', html)
+        self.assertIn(f'src="{image.url}"', html)
+
+        image_variants.generate_variants(self.name)
+        html = template.render(Context({'image': image}))
+        self.assertIn('type="image/webp"', html)
+        self.assertIn('shoe-300w.webp 300w', html)
+        self.assertIn('class="product-image"', html)
+
+    def _product(self):
+        category = Category.objects.create(name='کفش', slug='shoes')
+        return Product.objects.create(
+            name='کفش', slug='shoe', category=category, description='desc', price=1000, stock=1,
+        )
+
+    def _variant_names(self, name):
+        return [image_variants.variant_name(name, width, fmt) for width in (300, 600) for fmt in ('webp', 'jpeg')]
+
+    def test_upload_generates_variants_after_commit(self):
+        product = self._product()
+        with self.captureOnCommitCallbacks(execute=True):
+            ProductImage.objects.create(product=product, image=self.name)
+
+        self.assertTrue(image_variants.has_variants(self.name))
+
+    def test_replaced_file_variants_are_removed(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            image = ProductImage.objects.create(product=self._product(), image=self.name)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            image.image = SimpleUploadedFile('boot.jpg', _image(400, 400).read())
+            image.save()
+
+        self.assertFalse(any(default_storage.exists(name) for name in self._variant_names(self.name)))
+        self.assertTrue(image_variants.has_variants(image.image.name))
+
+    def test_delete_removes_variants_unless_file_is_shared(self):
+        product = self._product()
+        with self.captureOnCommitCallbacks(execute=True):
+            first = ProductImage.objects.create(product=product, image=self.name)
+            second = ProductImage.objects.create(product=product, image=self.name)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertTrue(image_variants.has_variants(self.name))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        self.assertFalse(any(default_storage.exists(name) for name in self._variant_names(self.name)))
+        self.assertTrue(default_storage.exists(self.name))
+
+    def test_backfill_command_skips_variant_directories(self):
+        default_storage.save('products/more/boot.png', _image(400, 400, 'PNG'))
+        out = StringIO()
+        call_command('generate_image_variants', 'products', '--workers', '2', stdout=out)
+
+        self.assertIn('2 تصویر', out.getvalue())
+        self.assertTrue(image_variants.has_variants(self.name))
+        self.assertTrue(image_variants.has_variants('products/more/boot.png'))
+        self.assertEqual(sorted(image_variants.iter_sources('products')), ['products/more/boot.png', 'products/shoe.jpg'])
@@ -0,0 +1,89 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+
+from Products_Module import facets
+from Products_Module.listing import ProductListingQuery
+from Products_Module.models import Brand, Category, Product, ProductSize
+
+
+class ListingFixtureMixin:
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+        self.category = Category.objects.create(name='کفش', slug='shoes')
+        self.brand = Brand.objects.create(name='Ario', slug='ario')
+        self.runner = Product.objects.create(
+            name='کفش ورزشی', slug='runner', category=self.category, brand=self.brand,
+            description='desc', price=Decimal('2000'), stock=5,
+        )
+        self.boot = Product.objects.create(
+            name='کفش چرمی', slug='boot', category=self.category,
+            description='desc', price=Decimal('1000'), stock=5,
+        )
+        ProductSize.objects.create(product=self.runner, size='m')
+        facets.rebuild()
+
+
+class ProductListingQueryTests(ListingFixtureMixin, TestCase):
+    def _spec(self, query_string, **kwargs):
+        return ProductListingQuery.from_request(self.factory.get(f'/?{query_string}'), **kwargs)
+
+    def test_spec_is_hashable_and_independent_of_param_order(self):
+        first = self._spec('brand=b&brand=a&size=m&sort=price_low')
+        second = self._spec('size=m&sort=price_low&brand=a&brand=b&brand=a')
+
+        self.assertEqual(first, second)
+        self.assertEqual(hash(first), hash(second))
+        self.assertEqual(first.cache_key(), second.cache_key())
+        self.assertEqual(first.brands, ('a', 'b'))
+
+    def test_invalid_sort_and_relevance_without_query_fall_back(self):
+        self.assertEqual(self._spec('sort=bogus').sort, 'popularity')
+        self.assertEqual(self._spec('sort=relevance').sort, 'popularity')
+        self.assertEqual(self._spec('', query='کفش').sort, 'relevance')
+
+    def test_execute_is_served_from_cache(self):
+        spec = self._spec('sort=price_low', category=self.category)
+        result = spec.execute()
+
+        with self.assertNumQueries(0):
+            cached = spec.execute()
+
+        self.assertEqual([p.id for p in cached.page], [self.boot.id, self.runner.id])
+        self.assertEqual([p.id for p in result.page], [self.boot.id, self.runner.id])
+
+    def test_product_change_invalidates_cached_pages(self):
+        spec = self._spec('sort=price_low')
+        spec.execute()
+
+        self.boot.price = Decimal('3000')
+        self.boot.save()
+
+        self.assertEqual([p.id for p in spec.execute().page], [self.runner.id, self.boot.id])
+
+    def test_search_results_respect_filters_and_sidebar_counts(self):
+        spec = self._spec('size=m', query='کفش')
+        result = spec.execute()
+
+        self.assertEqual([p.id for p in result.page], [self.runner.id])
+        self.assertEqual(result.facet_counts['brand'], {'ario': 1})
+        sizes = {size['value']: size['count'] for size in result.sizes}
+        self.assertEqual(sizes['m'], 1)
+
+
+class ListingViewsTests(ListingFixtureMixin, TestCase):
+    def test_all_listing_views_render_through_the_shared_query(self):
+        urls = [
+            (reverse('products:list'), {'category': 'shoes', 'sort': 'price_high'}),
+            (reverse('products:category', args=['shoes']), {'sort': 'price_high'}),
+            (reverse('products:search'), {'q': 'کفش', 'sort': 'price_high'}),
+        ]
+        for url, params in urls:
+            with self.subTest(url=url):
+                response = self.client.get(url, params)
+                self.assertEqual([p.id for p in response.context['products']], [self.runner.id, self.boot.id])
+                counts = {c.slug: c.product_count for c in response.context['categories']}
+                self.assertEqual(counts, {'shoes': 2})
@@ -0,0 +1,109 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from Products_Module.models import Category, Product
+from Products_Module.pagination import CursorPaginator, decode_cursor, encode_cursor
+
+
+class CursorPaginatorTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.category = Category.objects.create(name='Category', slug='category')
+        now = timezone.now()
+        self.products = []
+        for index in range(7):
+            product = Product.objects.create(
+                name=f'Product {index}',
+                slug=f'product-{index}',
+                category=self.category,
+                description='desc',
+                # قیمت‌ها و بازدیدهای تکراری: ترتیب با id شکسته می‌شود
+                price=Decimal('1000') * (index // 2 + 1),
+                stock=5,
+                views_count=index % 3,
+            )
+            Product.objects.filter(pk=product.pk).update(created_at=now - timedelta(days=index))
+            self.products.append(product)
+
+    def _walk(self, sort, per_page=3):
+        paginator = CursorPaginator(Product.objects.all(), sort, per_page=per_page)
+        pages = [paginator.get_page()]
+        while pages[-1].has_next():
+            pages.append(paginator.get_page(pages[-1].next_cursor))
+        return paginator, pages
+
+    def test_forward_walk_matches_ordered_queryset_for_every_sort(self):
+        expected_orderings = {
+            'popularity': ('-views_count', 'id'),
+            'date': ('-created_at', 'id'),
+            'price_low': ('price', 'id'),
+            'price_high': ('-price', 'id'),
+            'rating': ('-rating_avg', '-rating_count', 'id'),
+        }
+        for sort, ordering in expected_orderings.items():
+            with self.subTest(sort=sort):
+                _, pages = self._walk(sort)
+                walked = [product.id for page in pages for product in page]
+                self.assertEqual(walked, list(Product.objects.order_by(*ordering).values_list('id', flat=True)))
+                self.assertEqual([page.number for page in pages], [1, 2, 3])
+
+    def test_previous_cursor_returns_the_same_page(self):
+        paginator, pages = self._walk('price_low')
+
+        back = paginator.get_page(pages[2].previous_cursor)
+
+        self.assertEqual([p.id for p in back], [p.id for p in pages[1]])
+        self.assertEqual(back.number, 2)
+        first = paginator.get_page(back.previous_cursor)
+        self.assertEqual([p.id for p in first], [p.id for p in pages[0]])
+        self.assertFalse(first.has_previous())
+
+    def test_count_is_cached(self):
+        paginator = CursorPaginator(Product.objects.filter(price__gt=1000), 'date', per_page=3)
+        self.assertEqual(paginator.count, 5)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(CursorPaginator(Product.objects.filter(price__gt=1000), 'date').count, 5)
+
+    def test_tampered_or_foreign_cursor_falls_back_to_first_page(self):
+        token = encode_cursor('price_low', 3, [Decimal('2000'), self.products[3].id])
+
+        self.assertIsNone(decode_cursor(token + 'x', 'price_low'))
+        self.assertIsNone(decode_cursor(token, 'date'))
+        self.assertEqual(decode_cursor(token, 'price_low')['k'], [Decimal('2000'), self.products[3].id])
+
+
+class ListingCursorViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        category = Category.objects.create(name='Category', slug='category')
+        for index in range(14):
+            Product.objects.create(
+                name=f'Product {index}', slug=f'product-{index}', category=category,
+                description='desc', price=Decimal('1000') + index, stock=5,
+            )
+
+    def test_product_list_next_cursor_and_query_string(self):
+        url = reverse('products:list')
+        first = self.client.get(url, {'sort': 'price_low', 'page': 3})
+
+        self.assertEqual(first.context['query_string'], 'sort=price_low')
+        self.assertEqual(first.context['total_products'], 14)
+        page = first.context['page_obj']
+        second = self.client.get(url, {'sort': 'price_low', 'cursor': page.next_cursor})
+
+        self.assertEqual([p.price for p in second.context['products']], [Decimal('1012'), Decimal('1013')])
+        self.assertEqual(second.context['page_obj'].start_index(), 13)
+
+    def test_category_page_paginates_with_cursor(self):
+        url = reverse('products:category', args=['category'])
+        first = self.client.get(url, {'sort': 'date'})
+        second = self.client.get(url, {'sort': 'date', 'cursor': first.context['page_obj'].next_cursor})
+
+        ids = [p.id for p in first.context['products']] + [p.id for p in second.context['products']]
+        self.assertEqual(len(set(ids)), 14)
@@ -0,0 +1,63 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from Products_Module import facets, search_index
+from Cart_Module.models import DiscountCode
+from Products_Module.models import Product, ProductImage, ProductReview
+from Products_Module.services import refresh_product_rating
+
+
+class PopulateDbBulkTests(TestCase):
+    def _populate(self, **options):
+        options = {'products': 25, 'reviews_per_product': 3, 'seed': 7, 'batch_size': 10, **options}
+        call_command('populate_db', stdout=StringIO(), **options)
+        return list(Product.objects.order_by('slug').values_list('slug', 'name', 'price', 'stock', 'rating_avg'))
+
+    def test_creates_requested_volume(self):
+        self._populate()
+
+        self.assertEqual(Product.objects.count(), 25)
+        self.assertEqual(ProductReview.objects.count(), 75)
+        self.assertTrue(ProductImage.objects.exists())
+        self.assertEqual(len(facets.query()), Product.objects.filter(is_active=True).count())
+        self.assertTrue(search_index.search(Product.objects.first().name.split()[0]))
+
+    def test_generation_is_deterministic_across_workers(self):
+        first = self._populate()
+        second = self._populate(workers=2)
+        other_seed = self._populate(seed=8)
+
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, other_seed)
+
+    def test_rating_summary_matches_reviews(self):
+        self._populate()
+
+        for product in Product.objects.all()[:5]:
+            stored = (product.rating_avg, product.rating_count)
+            self.assertEqual(refresh_product_rating(product.pk), stored)
+
+    def test_reseed_query_count_does_not_grow_with_existing_data(self):
+        self._populate(products=5)
+        with CaptureQueriesContext(connection) as small:
+            self._populate(products=5)
+        self._populate(products=60)
+        with CaptureQueriesContext(connection) as large:
+            self._populate(products=5)
+
+        self.assertEqual(len(large), len(small))
+        self.assertEqual(Product.objects.count(), 5)
+        self.assertEqual(len(facets.query()), Product.objects.filter(is_active=True).count())
+
+    def test_reseed_keeps_discount_codes(self):
+        self._populate()
+        code = DiscountCode.objects.create(code='OFF10', value=10, product=Product.objects.first())
+
+        self._populate()
+
+        code.refresh_from_db()
+        self.assertIsNone(code.product_id)
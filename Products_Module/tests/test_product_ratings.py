@@ -0,0 +1,98 @@
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from Products_Module.models import Category, Product, ProductReview
+
+
+class ProductRatingAggregateTests(TestCase):
+    def setUp(self):
+        self.category = Category.objects.create(name='Category', slug='category')
+        self.product = self._create_product('first')
+
+    def _create_product(self, slug):
+        return Product.objects.create(
+            name=slug,
+            slug=slug,
+            category=self.category,
+            description='Test product',
+            price=Decimal('1000'),
+            stock=5,
+        )
+
+    def _review(self, product, rating, approved=True):
+        return ProductReview.objects.create(
+            product=product,
+            name='Reviewer',
+            email='reviewer@example.com',
+            rating=rating,
+            title='Title',
+            comment='Comment',
+            is_approved=approved,
+        )
+
+    def test_aggregates_follow_review_approval_edit_and_delete(self):
+        pending = self._review(self.product, 2, approved=False)
+        self._review(self.product, 5)
+        self.product.refresh_from_db()
+        self.assertEqual((self.product.rating_avg, self.product.rating_count), (Decimal('5.00'), 1))
+
+        pending.is_approved = True
+        pending.save()
+        self.product.refresh_from_db()
+        self.assertEqual((self.product.rating_avg, self.product.rating_count), (Decimal('3.50'), 2))
+
+        pending.rating = 4
+        pending.save()
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.rating_avg, Decimal('4.50'))
+
+        pending.delete()
+        self.product.refresh_from_db()
+        self.assertEqual((self.product.rating_avg, self.product.rating_count), (Decimal('5.00'), 1))
+        self.assertEqual(self.product.get_rating_percentage(), 100)
+
+    def test_unchanged_rating_keeps_updated_at(self):
+        self._review(self.product, 5)
+        self.product.refresh_from_db()
+        updated_at = self.product.updated_at
+
+        self._review(self.product, 1, approved=False)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.updated_at, updated_at)
+
+        self._review(self.product, 1)
+        self.product.refresh_from_db()
+        self.assertGreater(self.product.updated_at, updated_at)
+
+    def test_rating_percentage_needs_no_query(self):
+        self._review(self.product, 4)
+        product = Product.objects.get(pk=self.product.pk)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(product.get_rating_percentage(), 80)
+
+    def test_rebuild_command_recomputes_stale_columns(self):
+        other = self._create_product('second')
+        self._review(self.product, 3)
+        self._review(other, 5)
+        Product.objects.update(rating_avg=Decimal('1.00'), rating_count=9)
+
+        call_command('rebuild_product_ratings', stdout=StringIO())
+
+        self.product.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual((self.product.rating_avg, self.product.rating_count), (Decimal('3.00'), 1))
+        self.assertEqual((other.rating_avg, other.rating_count), (Decimal('5.00'), 1))
+
+    def test_rating_sort_orders_by_average(self):
+        other = self._create_product('second')
+        self._review(self.product, 3)
+        self._review(other, 5)
+
+        response = self.client.get(reverse('products:list'), {'sort': 'rating'})
+
+        self.assertEqual([p.pk for p in response.context['products']], [other.pk, self.product.pk])
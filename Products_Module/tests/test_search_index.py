@@ -0,0 +1,144 @@
+import threading
+from collections import defaultdict
+from decimal import Decimal
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connections
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from Products_Module import search_index
+from Products_Module.models import Brand, Category, Product
+
+
+class PersianNormalizationTests(TestCase):
+    def test_arabic_letters_and_zwnj_are_normalized(self):
+        self.assertEqual(search_index.normalize_text('كيف‌ها'), search_index.normalize_text('کیف ها'))
+        self.assertEqual(search_index.tokenize('گوشي ۱۲۸ گيگ'), ['گوشی', '128', 'گیگ'])
+        self.assertEqual(search_index.normalize_text('کتابِ'), 'کتاب')
+
+
+class SearchIndexTestMixin:
+    backend_name = None
+
+    def setUp(self):
+        search_index.reset_backend()
+        self.category = Category.objects.create(name='کیف و کفش', slug='bags')
+        self.brand = Brand.objects.create(name='Ario', slug='ario')
+        self.bag = self._product('کیف چرمی مردانه', 'کیف دستی', slug='bag')
+        self.shoe = self._product('کفش ورزشی', 'مناسب پیاده روی با کیف', slug='shoe', brand=self.brand)
+
+    def tearDown(self):
+        search_index.reset_backend()
+
+    def _product(self, name, description, slug, **extra):
+        return Product.objects.create(
+            name=name,
+            slug=slug,
+            category=self.category,
+            description=description,
+            price=Decimal('1000'),
+            stock=5,
+            **extra,
+        )
+
+    def test_backend_selection(self):
+        self.assertEqual(search_index.get_backend().name, self.backend_name)
+
+    def test_name_match_ranks_above_description_match(self):
+        self.assertEqual(search_index.search('كيف'), [self.bag.pk, self.shoe.pk])
+
+    def test_prefix_and_multi_token_queries(self):
+        self.assertEqual(search_index.search('چرم'), [self.bag.pk])
+        self.assertEqual(search_index.search('کفش ario'), [self.shoe.pk])
+        self.assertEqual(search_index.search('ورزشی چرمی'), [])
+
+    def test_index_follows_product_and_brand_changes(self):
+        self.bag.is_active = False
+        self.bag.save()
+        self.assertEqual(search_index.search('کیف'), [self.shoe.pk])
+
+        self.brand.name = 'Molla'
+        self.brand.save()
+        self.assertEqual(search_index.search('molla'), [self.shoe.pk])
+        self.assertEqual(search_index.search('ario'), [])
+
+        self.shoe.delete()
+        self.assertEqual(search_index.search('کفش'), [])
+
+    def test_rebuild_restores_index(self):
+        search_index.get_backend().clear()
+        self.assertEqual(search_index.search('کیف'), [])
+
+        self.assertEqual(search_index.rebuild(), 2)
+        self.assertEqual(search_index.search('کیف'), [self.bag.pk, self.shoe.pk])
+
+    def test_search_view_returns_ranked_results(self):
+        response = self.client.get(reverse('products:search'), {'q': 'کيف'})
+
+        self.assertEqual(response.context['current_sort'], 'relevance')
+        self.assertEqual([p.pk for p in response.context['products']], [self.bag.pk, self.shoe.pk])
+        self.assertEqual(response.context['total_products'], 2)
+
+
+@override_settings(PRODUCT_SEARCH_BACKEND='auto')
+class FTS5SearchIndexTests(SearchIndexTestMixin, TestCase):
+    backend_name = 'fts5'
+
+
+@override_settings(PRODUCT_SEARCH_BACKEND='python')
+class InvertedIndexSearchTests(SearchIndexTestMixin, TestCase):
+    backend_name = 'python'
+
+    def test_change_missed_between_read_and_bump_is_loaded(self):
+        search_index.warm()
+        # محصولی که پروسه دیگری همزمان ثبت کرده (سیگنالی در این پروسه نیست)
+        wallet, = Product.objects.bulk_create([Product(
+            name='کیف پول', slug='wallet', category=self.category, description='', price=Decimal('1000'), stock=5,
+        )])
+        incr = cache.incr
+
+        def concurrent_incr(key, delta=1):
+            incr(key)
+            return incr(key, delta)
+
+        with mock.patch.object(cache, 'incr', side_effect=concurrent_incr):
+            self.shoe.save()
+
+        self.assertIn(wallet.pk, search_index.search('پول'))
+
+    def test_evicted_version_is_not_reused(self):
+        cache.delete(search_index.VERSION_CACHE_KEY)
+        search_index.warm()
+        self.shoe.save()
+        cache.delete(search_index.VERSION_CACHE_KEY)
+        # پروسه دیگری که پس از حذف کلید نسخه محصولی را ایندکس می‌کند
+        wallet, = Product.objects.bulk_create([Product(
+            name='کیف پول', slug='wallet', category=self.category, description='', price=Decimal('1000'), stock=5,
+        )])
+        search_index.InvertedIndexBackend().index_products([wallet])
+
+        self.assertIn(wallet.pk, search_index.search('پول'))
+
+    def test_stale_index_answers_while_rebuilding_in_background(self):
+        backend = search_index.get_backend()
+        backend.warm()
+        loading, release = threading.Event(), threading.Event()
+
+        def slow_load():
+            loading.set()
+            release.wait(5)
+            return defaultdict(dict), {}
+
+        cache.set(search_index.VERSION_CACHE_KEY, cache.get(search_index.VERSION_CACHE_KEY, 0) + 1, None)
+        with mock.patch.object(connections['default'], 'in_atomic_block', False), \
+                mock.patch.object(backend, '_load_state', slow_load):
+            self.assertEqual(search_index.search('کیف'), [self.bag.pk, self.shoe.pk])
+            self.assertTrue(loading.wait(5))
+            self.assertEqual(search_index.search('کیف'), [self.bag.pk, self.shoe.pk])
+            rebuild = backend._rebuild_thread
+            release.set()
+            rebuild.join(5)
+
+        self.assertEqual(search_index.search('کیف'), [])
@@ -0,0 +1,74 @@
+from decimal import Decimal
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from Products_Module.models import Category, Product
+from Products_Module.view_counter import ViewCounterBuffer, view_counter
+
+
+@override_settings(PRODUCT_VIEWS_FLUSH_INTERVAL=3600, PRODUCT_VIEWS_MAX_PENDING=1000)
+class BufferedViewCounterTests(TestCase):
+    def setUp(self):
+        self.category = Category.objects.create(name='Category', slug='category')
+        self.products = [
+            Product.objects.create(
+                name=f'Product {index}',
+                slug=f'product-{index}',
+                category=self.category,
+                description='Test product',
+                price=Decimal('1000'),
+                stock=5,
+                views_count=10,
+            )
+            for index in range(3)
+        ]
+        self.buffer = ViewCounterBuffer()
+
+    def tearDown(self):
+        self.buffer.flush()
+        view_counter.flush()
+
+    def _views(self):
+        return list(Product.objects.order_by('pk').values_list('views_count', flat=True))
+
+    def test_views_are_buffered_until_flush(self):
+        for _ in range(3):
+            self.buffer.record(self.products[0].pk)
+        self.buffer.record(self.products[2].pk)
+
+        self.assertEqual(self._views(), [10, 10, 10])
+        self.assertEqual(self.buffer.pending(), {self.products[0].pk: 3, self.products[2].pk: 1})
+
+        with self.assertNumQueries(1):
+            self.assertEqual(self.buffer.flush(), 2)
+
+        self.assertEqual(self._views(), [13, 10, 11])
+        self.assertEqual(self.buffer.pending(), {})
+
+    @override_settings(PRODUCT_VIEWS_MAX_PENDING=2)
+    def test_max_pending_forces_flush(self):
+        self.buffer.record(self.products[1].pk)
+        self.assertEqual(self._views(), [10, 10, 10])
+
+        self.buffer.record(self.products[1].pk)
+
+        self.assertEqual(self._views(), [10, 12, 10])
+
+    @override_settings(PRODUCT_VIEWS_FLUSH_INTERVAL=0)
+    def test_zero_interval_writes_through(self):
+        self.buffer.record(self.products[0].pk)
+
+        self.assertEqual(self._views(), [11, 10, 10])
+
+    def test_product_detail_does_not_write_views_count(self):
+        product = self.products[0]
+
+        self.client.get(reverse('products:detail', kwargs={'slug': product.slug}))
+
+        product.refresh_from_db()
+        self.assertEqual(product.views_count, 10)
+        self.assertEqual(view_counter.pending(), {product.pk: 1})
+        view_counter.flush()
+        product.refresh_from_db()
+        self.assertEqual(product.views_count, 11)
@@ -0,0 +1,140 @@
+"""
+شمارنده بافر شده بازدید محصولات
+
+به جای یک UPDATE در هر بازدید صفحه محصول (که در SQLite قفل نوشتن کل دیتابیس
+را می‌گیرد)، بازدیدها در حافظه هر پروسه جمع می‌شوند و یک تایمر پس‌زمینه آن‌ها را
+به صورت دوره‌ای با یک UPDATE ... CASE برای همه محصولات در دیتابیس اعمال می‌کند.
+
+تنظیمات (settings.py):
+    PRODUCT_VIEWS_FLUSH_INTERVAL: حداکثر فاصله بین دو flush به ثانیه (0 = بدون بافر)
+    PRODUCT_VIEWS_MAX_PENDING: حداکثر بازدید بافر شده قبل از flush اجباری؛
+        سقف بازدیدهایی که با کرش پروسه از دست می‌روند
+
+در پروسه‌های سرور (wsgi.py/asgi.py با flush_on_exit) خروج عادی پروسه (ری‌استارت
+یا دیپلوی) بافر را با atexit در دیتابیس می‌نویسد؛ تست‌ها و دستورهای manage.py
+این هوک را ندارند. اجرای atexit در workerهای fork شده به سرور بستگی دارد (مثلاً
+با os._exit اجرا نمی‌شود)؛ برای gunicorn هوک worker_exit را هم در
+gunicorn.conf.py اضافه کنید:
+
+    def worker_exit(server, worker):
+        from Products_Module.view_counter import flush_views
+        flush_views()
+"""
+import atexit
+import logging
+import threading
+from collections import Counter
+
+from django.conf import settings
+from django.db import DatabaseError, connection
+from django.db.models import Case, F, IntegerField, Value, When
+
+from .models import Product
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FLUSH_INTERVAL = 30
+DEFAULT_MAX_PENDING = 500
+# تعداد محصول در هر UPDATE ... CASE (محدودیت تعداد پارامتر SQLite)
+FLUSH_BATCH_SIZE = 300
+
+
+class ViewCounterBuffer:
+    """بافر thread-safe بازدیدها: {product_id: تعداد بازدید flush نشده}"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = Counter()
+        self._pending_total = 0
+        self._timer = None
+
+    @property
+    def flush_interval(self):
+        return getattr(settings, 'PRODUCT_VIEWS_FLUSH_INTERVAL', DEFAULT_FLUSH_INTERVAL)
+
+    @property
+    def max_pending(self):
+        return getattr(settings, 'PRODUCT_VIEWS_MAX_PENDING', DEFAULT_MAX_PENDING)
+
+    def pending(self):
+        """کپی بازدیدهای flush نشده"""
+        with self._lock:
+            return dict(self._pending)
+
+    def record(self, product_id, count=1):
+        """ثبت بازدید؛ با پر شدن بافر flush فوری، در غیر این صورت زمان‌بندی flush"""
+        interval = self.flush_interval
+        with self._lock:
+            self._pending[product_id] += count
+            self._pending_total += count
+            due = interval <= 0 or self._pending_total >= self.max_pending
+            if not due and self._timer is None:
+                self._timer = threading.Timer(interval, self._flush_from_timer)
+                self._timer.daemon = True
+                self._timer.start()
+        if due:
+            self.flush()
+
+    def _flush_from_timer(self):
+        try:
+            self.flush()
+        finally:
+            # اتصال دیتابیس مخصوص همین thread است
+            connection.close()
+
+    def flush(self):
+        """
+        اعمال همه بازدیدهای بافر شده با یک UPDATE ... CASE.
+        برمی‌گرداند: تعداد محصولات به‌روز شده
+        """
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+            self._pending_total = 0
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+        updated = 0
+        items = list(pending.items())
+        for start in range(0, len(items), FLUSH_BATCH_SIZE):
+            batch = dict(items[start:start + FLUSH_BATCH_SIZE])
+            try:
+                updated += self._apply(batch)
+            except DatabaseError:
+                # بازگرداندن بازدیدها به بافر تا در flush بعدی دوباره تلاش شود
+                logger.exception('Flushing %d buffered product views failed', len(batch))
+                with self._lock:
+                    self._pending.update(batch)
+                    self._pending_total += sum(batch.values())
+        return updated
+
+    @staticmethod
+    def _apply(batch):
+        """یک UPDATE views_count = views_count + CASE ... برای یک دسته محصول"""
+        increments = Case(
+            *[When(pk=product_id, then=Value(count)) for product_id, count in batch.items()],
+            default=Value(0),
+            output_field=IntegerField(),
+        )
+        return Product.objects.filter(pk__in=list(batch)).update(
+            views_count=F('views_count') + increments,
+        )
+
+
+view_counter = ViewCounterBuffer()
+
+
+def record_view(product_id):
+    """ثبت یک بازدید برای محصول"""
+    view_counter.record(product_id)
+
+
+def flush_views():
+    """flush دستی بازدیدهای بافر شده این پروسه"""
+    return view_counter.flush()
+
+
+def flush_on_exit():
+    """هوک wsgi.py/asgi.py: flush بازدیدهای بافر شده هنگام خروج عادی پروسه"""
+    atexit.unregister(flush_views)
+    atexit.register(flush_views)
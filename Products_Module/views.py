@@ -1,120 +1,48 @@
 from django.shortcuts import render, get_object_or_404, redirect
-from django.core.paginator import Paginator
-from django.db.models import Q, Count, Min, Max, F
 from django.contrib import messages
 from django.urls import reverse
 from django.core.cache import cache
 from django_ratelimit.decorators import ratelimit
-from .models import Product, Category, Brand, ProductReview
+from .models import Product, Category, ProductReview
 from .forms import ProductReviewForm
+from .listing import ProductListingQuery
+from .pagination import listing_query_string
+from .services import approved_reviews
+from .view_counter import record_view
+
+
+def _render_listing(request, listing, **extra):
+    """رندر صفحه لیست از نتیجه ProductListingQuery"""
+    result = listing.execute()
+    context = {
+        'page_obj': result.page,
+        'products': result.page.object_list,
+        'categories': result.categories,
+        'brands': result.brands,
+        'selected_brands': listing.brands,
+        'size_facets': result.sizes,
+        'facet_counts': result.facet_counts,
+        'price_range': result.price_range,
+        'current_sort': listing.sort,
+        'total_products': result.total,
+        # حفظ پارامترهای GET برای pagination و sort
+        'query_string': listing_query_string(request.GET),
+        **extra,
+    }
+    return render(request, 'products/product_list.html', context)
 
 
 def product_list(request):
     """نمایش لیست محصولات با فیلترینگ - بهینه شده"""
 
-    products = Product.objects.filter(is_active=True).select_related('category', 'brand').prefetch_related('images')
-
     # فیلتر دسته‌بندی
     category_slug = request.GET.get('category')
     selected_category = None
     if category_slug:
         selected_category = get_object_or_404(Category, slug=category_slug, is_active=True)
-        products = products.filter(category=selected_category)
-
-    # فیلتر برند
-    brand_slugs = request.GET.getlist('brand')
-    if brand_slugs:
-        products = products.filter(brand__slug__in=brand_slugs)
-
-    # فیلتر سایز
-    sizes = request.GET.getlist('size')
-    if sizes:
-        products = products.filter(sizes__size__in=sizes).distinct()
-
-    # فیلتر رنگ
-    colors = request.GET.getlist('color')
-    if colors:
-        products = products.filter(colors__code__in=colors).distinct()
-
-    # فیلتر قیمت
-    min_price = request.GET.get('min_price')
-    max_price = request.GET.get('max_price')
-    if min_price:
-        products = products.filter(price__gte=min_price)
-    if max_price:
-        products = products.filter(price__lte=max_price)
-
-    # فیلتر موجودی
-    only_available = request.GET.get('available')
-    if only_available:
-        products = products.filter(is_available=True, stock__gt=0)
-
-    # مرتب‌سازی
-    sort = request.GET.get('sort', 'popularity')
-    if sort == 'popularity':
-        products = products.order_by('-views_count')
-    elif sort == 'date':
-        products = products.order_by('-created_at')
-    elif sort == 'price_low':
-        products = products.order_by('price')
-    elif sort == 'price_high':
-        products = products.order_by('-price')
-    elif sort == 'rating':
-        products = products.order_by('-views_count')  # می‌توانید بعداً با rating واقعی جایگزین کنید
 
-    # Pagination
-    paginator = Paginator(products, 12)
-    page_number = request.GET.get('page', 1)
-    page_obj = paginator.get_page(page_number)
-
-    # دریافت تمام دسته‌بندی‌ها برای سایدبار - با کشینگ
-    from django.core.cache import cache
-    categories_cache_key = 'all_active_categories_with_count'
-    categories = cache.get(categories_cache_key)
-    if categories is None:
-        categories = list(Category.objects.filter(is_active=True).annotate(
-            product_count=Count('products', filter=Q(products__is_active=True))
-        ))
-        cache.set(categories_cache_key, categories, 60 * 15)
-
-    # دریافت تمام برندها برای سایدبار - با کشینگ
-    brands_cache_key = 'all_active_brands_with_count'
-    brands = cache.get(brands_cache_key)
-    if brands is None:
-        brands = list(Brand.objects.filter(is_active=True).annotate(
-            product_count=Count('products', filter=Q(products__is_active=True))
-        ))
-        cache.set(brands_cache_key, brands, 60 * 15)
-
-    # محاسبه محدوده قیمت - با کشینگ
-    price_range_cache_key = 'active_products_price_range'
-    price_range = cache.get(price_range_cache_key)
-    if price_range is None:
-        price_range = Product.objects.filter(is_active=True).aggregate(
-            min_price=Min('price'),
-            max_price=Max('price')
-        )
-        cache.set(price_range_cache_key, price_range, 60 * 15)
-
-    # حفظ پارامترهای GET برای pagination و sort
-    get_params = request.GET.copy()
-    if 'page' in get_params:
-        del get_params['page']
-    query_string = get_params.urlencode()
-
-    context = {
-        'page_obj': page_obj,
-        'products': page_obj.object_list,
-        'categories': categories,
-        'brands': brands,
-        'selected_category': selected_category,
-        'price_range': price_range,
-        'current_sort': sort,
-        'total_products': paginator.count,
-        'query_string': query_string,
-    }
-
-    return render(request, 'products/product_list.html', context)
+    listing = ProductListingQuery.from_request(request, category=selected_category)
+    return _render_listing(request, listing, selected_category=selected_category)
 
 
 def product_detail(request, slug):
@@ -126,15 +54,11 @@ def product_detail(request, slug):
         is_active=True
     )
 
-    # افزایش تعداد بازدید به صورت اتمیک (atomic)
-    Product.objects.filter(pk=product.pk).update(views_count=F('views_count') + 1)
+    # ثبت بازدید در بافر حافظه - به صورت دسته‌ای در دیتابیس flush می‌شود
+    record_view(product.pk)
 
     # دریافت نظرات تایید شده - با کشینگ
-    reviews_cache_key = f'product_{product.id}_approved_reviews'
-    reviews = cache.get(reviews_cache_key)
-    if reviews is None:
-        reviews = list(product.reviews.filter(is_approved=True).order_by('-created_at'))
-        cache.set(reviews_cache_key, reviews, 60 * 5)  # Cache for 5 minutes
+    reviews = approved_reviews(product.id)
 
     # فرم نظر و پردازش POST
     initial = {}
@@ -209,113 +133,14 @@ def category_products(request, slug):
 
     category = get_object_or_404(Category, slug=slug, is_active=True)
 
-    products = Product.objects.filter(
-        category=category,
-        is_active=True
-    ).select_related('category', 'brand').prefetch_related('images')
-
-    # مرتب‌سازی
-    sort = request.GET.get('sort', 'popularity')
-    if sort == 'popularity':
-        products = products.order_by('-views_count')
-    elif sort == 'date':
-        products = products.order_by('-created_at')
-    elif sort == 'price_low':
-        products = products.order_by('price')
-    elif sort == 'price_high':
-        products = products.order_by('-price')
-
-    # Pagination
-    paginator = Paginator(products, 12)
-    page_number = request.GET.get('page', 1)
-    page_obj = paginator.get_page(page_number)
-
-    # دریافت تمام دسته‌بندی‌ها
-    categories = Category.objects.filter(is_active=True).annotate(
-        product_count=Count('products', filter=Q(products__is_active=True))
-    )
-
-    # دریافت برندها
-    brands = Brand.objects.filter(is_active=True, products__category=category).distinct().annotate(
-        product_count=Count('products', filter=Q(products__is_active=True, products__category=category))
-    )
-
-    # حفظ پارامترهای GET برای pagination و sort
-    get_params = request.GET.copy()
-    if 'page' in get_params:
-        del get_params['page']
-    query_string = get_params.urlencode()
-
-    context = {
-        'category': category,
-        'selected_category': category,
-        'page_obj': page_obj,
-        'products': page_obj.object_list,
-        'categories': categories,
-        'brands': brands,
-        'current_sort': sort,
-        'total_products': paginator.count,
-        'query_string': query_string,
-    }
-
-    return render(request, 'products/product_list.html', context)
+    listing = ProductListingQuery.from_request(request, category=category)
+    return _render_listing(request, listing, category=category, selected_category=category)
 
 
 def search_products(request):
     """جستجوی محصولات"""
 
-    query = request.GET.get('q', '')
-
-    products = Product.objects.filter(is_active=True)
-
-    if query:
-        products = products.filter(
-            Q(name__icontains=query) |
-            Q(description__icontains=query) |
-            Q(category__name__icontains=query) |
-            Q(brand__name__icontains=query)
-        ).select_related('category', 'brand').prefetch_related('images').distinct()
-
-    # مرتب‌سازی
-    sort = request.GET.get('sort', 'popularity')
-    if sort == 'popularity':
-        products = products.order_by('-views_count')
-    elif sort == 'date':
-        products = products.order_by('-created_at')
-    elif sort == 'price_low':
-        products = products.order_by('price')
-    elif sort == 'price_high':
-        products = products.order_by('-price')
-
-    # Pagination
-    paginator = Paginator(products, 12)
-    page_number = request.GET.get('page', 1)
-    page_obj = paginator.get_page(page_number)
-
-    # دریافت دسته‌بندی‌ها و برندها برای سایدبار
-    categories = Category.objects.filter(is_active=True).annotate(
-        product_count=Count('products', filter=Q(products__is_active=True))
-    )
-    brands = Brand.objects.filter(is_active=True).annotate(
-        product_count=Count('products', filter=Q(products__is_active=True))
-    )
-
-    # حفظ پارامترهای GET برای pagination و sort
-    get_params = request.GET.copy()
-    if 'page' in get_params:
-        del get_params['page']
-    query_string = get_params.urlencode()
-
-    context = {
-        'query': query,
-        'page_obj': page_obj,
-        'products': page_obj.object_list,
-        'categories': categories,
-        'brands': brands,
-        'selected_category': None,
-        'current_sort': sort,
-        'total_products': paginator.count,
-        'query_string': query_string,
-    }
+    query = request.GET.get('q', '').strip()
 
-    return render(request, 'products/product_list.html', context)
\ No newline at end of file
+    listing = ProductListingQuery.from_request(request, query=query)
+    return _render_listing(request, listing, query=query, selected_category=None)